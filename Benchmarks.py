@@ -0,0 +1,407 @@
+# Microbenchmarks for the unit_of_measure hot paths.
+#
+# Run from the Engineering folder:
+#   python Benchmarks.py
+#
+# Each benchmark prints the cost per operation in nanoseconds.  Where a
+# benchmark compares against an earlier implementation, the earlier code is
+# reproduced here so the before/after numbers come from the same run.
+
+import sys
+import timeit
+
+import numpy as np
+
+import unit_of_measure as um
+
+
+def TimePerOp(stmt, number = 200000, repeat = 5, globals = None) -> float:
+    # best-of-repeat time per operation, in nanoseconds
+    times = timeit.repeat(stmt, number=number, repeat=repeat, globals=globals)
+    return min(times) / number * 1.0e9
+
+
+def Report(label : str, ns : float):
+    print(f'  {label:<40} {ns:10.1f} ns/op')
+
+
+# Dimension as it was implemented before the packed-integer representation:
+# 8 int8 exponents in an ndarray, a new array for every product and quotient
+class NdarrayDimension:
+    def __init__(self, exp):
+        self._exp = np.zeros(um.BaseQuantity._Count.value, dtype=np.int8)
+        if type(exp) == np.ndarray:
+            self._exp = exp
+        else:
+            for d in range(um.BaseQuantity._Count.value):
+                self._exp[d] = exp[d]
+
+    def __eq__(self, other) -> bool:
+        return (self._exp == other._exp).all()
+
+    def __mul__(self, other):
+        return NdarrayDimension(self._exp + other._exp)
+
+    def __truediv__(self, other):
+        return NdarrayDimension(self._exp - other._exp)
+
+    def power(self, numer : int, denom : int = 1):
+        _result = self._exp * numer
+        if denom != 1:
+            if any(_result % denom):
+                raise TypeError("not supported: pow() arguments would result in non-integer exponents")
+            else:
+                _result = _result // denom
+        return NdarrayDimension(_result)
+
+
+def BenchDimension():
+    print('Dimension operations (ndarray before, packed integer after)')
+    force = [1, 1, -2, 0, 0, 0, 0, 0]
+    area = [0, 2, 0, 0, 0, 0, 0, 0]
+
+    for label, cls in (('ndarray', NdarrayDimension), ('packed', um.Dimension)):
+        env = {'f': cls(force), 'a': cls(area)}
+        Report(f'{label}: f * a', TimePerOp('f * a', globals=env))
+        Report(f'{label}: f / a', TimePerOp('f / a', globals=env))
+        Report(f'{label}: f == a', TimePerOp('f == a', globals=env))
+        Report(f'{label}: a.power(1, 2)', TimePerOp('a.power(1, 2)', globals=env))
+
+
+def BenchQuantityConstruction():
+    print('Quantity construction and size')
+    dim = um.Dimension([0, 1, 0, 0, 0, 0, 0, 0])
+    unit = um.Unit.Create('m', dim, 1.0)
+    env = {'um': um, 'dim': dim, 'unit': unit}
+    Report('Quantity.Create(1.0, dim)', TimePerOp('um.Quantity.Create(1.0, dim)', globals=env))
+    Report('2.0 * unit', TimePerOp('2.0 * unit', globals=env))
+    Report('Unit.Create(...)', TimePerOp("um.Unit.Create('x', dim, 2.0)", number=50000, globals=env))
+    qty = 2.0 * unit
+    has_dict = hasattr(qty, '__dict__')
+    print(f'  Quantity has __dict__: {has_dict}, sizeof = {sys.getsizeof(qty)} bytes')
+
+
+def BenchQuantityOps():
+    print('Quantity arithmetic')
+    length = um.Unit.Create('m', um.Dimension([0, 1, 0, 0, 0, 0, 0, 0]), 1.0)
+    force = um.Unit.Create('N', um.Dimension([1, 1, -2, 0, 0, 0, 0, 0]), 1.0)
+    env = {'a': 2.0 * length, 'b': 3.0 * length, 'f': 4.0 * force, 'x': 1.5, 'n': np.float64(1.5)}
+    Report('Quantity * float', TimePerOp('a * x', globals=env))
+    Report('Quantity * np.float64', TimePerOp('a * n', globals=env))
+    Report('float * Quantity', TimePerOp('x * a', globals=env))
+    Report('Quantity * Quantity', TimePerOp('f * a', globals=env))
+    Report('Quantity / Quantity', TimePerOp('f / a', globals=env))
+    Report('Quantity + Quantity', TimePerOp('a + b', globals=env))
+    Report('Quantity.Similar(Quantity)', TimePerOp('a.Similar(b)', globals=env))
+
+
+def BenchConverter():
+    print('psig -> MPa conversion of a 10000 element column')
+    dim = um.Dimension([1, -1, -2, 0, 0, 0, 0, 0])
+    pa = um.Unit.Create('Pa', dim, 1.0)
+    psig = um.Unit('psig', 6894.75729317 * pa, 101325.0 * pa)
+    mpa = um.Unit('MPa', 1.0e6 * pa)
+    column = np.linspace(0.0, 1500.0, 10000)
+    values = column.tolist()
+    env = {'um': um, 'psig': psig, 'mpa': mpa, 'column': column, 'values': values}
+    Report('per-element Quantity round trip', TimePerOp('[(v * psig).Value(mpa) for v in values]', number=20, globals=env))
+    Report('converter(psig, mpa)(column)', TimePerOp('um.converter(psig, mpa)(column)', number=2000, globals=env))
+    env['qty'] = 150.0 * psig
+    Report('qty.Value(mpa) on one value', TimePerOp('qty.Value(mpa)', globals=env))
+    Report('converter(psig, mpa)(150.0)', TimePerOp('um.converter(psig, mpa)(150.0)', globals=env))
+
+
+def BenchLoadUnits(filename = 'UnitsOfMeasure.xml'):
+    print(f'LoadUnits({filename})')
+    Report('parse .xml', TimePerOp(f'um.LoadUnits({filename!r}, use_snapshot=False)', number=20, globals={'um': um}))
+    um.LoadUnits(filename)
+    Report('load snapshot', TimePerOp(f'um.LoadUnits({filename!r})', number=20, globals={'um': um}))
+
+
+def BenchFormat():
+    print('Formatting a 10000 element column in MPa')
+    dim = um.Dimension([1, -1, -2, 0, 0, 0, 0, 0])
+    pa = um.Unit.Create('Pa', dim, 1.0)
+    psig = um.Unit('psig', 6894.75729317 * pa, 101325.0 * pa)
+    mpa = um.Unit('MPa', 1.0e6 * pa)
+    column = np.linspace(0.0, 1500.0, 10000) * psig
+    qtys = list(column)
+    env = {'um': um, 'mpa': mpa, 'column': column, 'qtys': qtys}
+    Report('[q.Format(mpa, "0.3f") for q in qtys]', TimePerOp('[q.Format(mpa, "0.3f") for q in qtys]', number=20, globals=env))
+    Report('FormatColumn(qtys, mpa, "0.3f")', TimePerOp('um.FormatColumn(qtys, mpa, "0.3f")', number=20, globals=env))
+    Report('FormatColumn(QuantityArray, mpa, "0.3f")', TimePerOp('um.FormatColumn(column, mpa, "0.3f")', number=20, globals=env))
+
+
+def BenchNumPy():
+    print('NumPy functions on a 10000 element column')
+    area = um.Unit.Create('m^2', um.Dimension([0, 2, 0, 0, 0, 0, 0, 0]), 1.0)
+    column = np.linspace(1.0, 100.0, 10000) * area
+    qtys = list(column)
+    env = {'np': np, 'column': column, 'qtys': qtys}
+    Report('[q.sqrt() for q in qtys]', TimePerOp('[q.sqrt() for q in qtys]', number=20, globals=env))
+    Report('np.sqrt(column)', TimePerOp('np.sqrt(column)', number=2000, globals=env))
+    Report('sum(qtys[1:], qtys[0])', TimePerOp('sum(qtys[1:], qtys[0])', number=20, globals=env))
+    Report('np.sum(column)', TimePerOp('np.sum(column)', number=2000, globals=env))
+
+
+def BenchTraceOnce():
+    print('Flat head thickness d * sqrt(C * P / S / E)')
+    length = um.Unit.Create('m', um.Dimension([0, 1, 0, 0, 0, 0, 0, 0]), 1.0)
+    pressure = um.Unit.Create('Pa', um.Dimension([1, -1, -2, 0, 0, 0, 0, 0]), 1.0)
+    none = um.Unit.Create(' ', um.Dimensionless, 1.0)
+
+    def Thickness(d, P, S, C, E):
+        return d * np.sqrt(C * P / S / E)
+
+    traced = um.TraceOnce(Thickness)
+    env = {'checked': Thickness, 'traced': traced,
+           'args': (0.25 * length, 2.0e6 * pressure, 1.4e8 * pressure, 0.3 * none, 1.0 * none)}
+    traced(*env['args'])
+    Report('checked(d, P, S, C, E)', TimePerOp('checked(*args)', globals=env))
+    Report('TraceOnce(...)(d, P, S, C, E)', TimePerOp('traced(*args)', globals=env))
+
+
+# Unchecked() only changes what a dimension mismatch does, so the two rows
+# should agree to within run-to-run noise
+def BenchUnchecked():
+    print('Code_Rules.B16_34_Bolted_Cover_Joint, verbose = False, checked vs Unchecked()')
+    import Code_Rules
+    import NIST330 as un
+    import Threads
+
+    Code_Rules.verbose = False
+    env = {'cr': Code_Rules, 'thd': Threads.ThreadUN(0.5, 13, 'UNC', 2),
+           'Pc': 300.0 * un.Pressure.psi, 'Dg': 4.0 * un.Length.inch, 'Sa': 25.0 * un.Stress.ksi}
+    stmt = 'cr.B16_34_Bolted_Cover_Joint(Pc, Dg, thd, 8, Sa)'
+    Report('checked', TimePerOp(stmt, number=5000, repeat=15, globals=env))
+    with um.Unchecked():
+        Report('Unchecked()', TimePerOp(stmt, number=5000, repeat=15, globals=env))
+
+
+def BenchLazy():
+    print('Region 1 style property expression, eager Quantities vs lazy Expression')
+    kelvin = um.Unit.Create('K', um.Dimension([0, 0, 0, 0, 1, 0, 0, 0]), 1.0)
+    Rc = um.Quantity.Create(461.526, um.Dimension([0, 2, -2, 0, -1, 0, 0, 0]))
+    tau, pi, gammaPi, gammaPiPi, gammaTauTau, gammaPiTau = 2.4, 0.18, 0.126, -0.0063, -1.05, 0.071
+
+    def Eager(temp):
+        numer = gammaPi ** 2
+        denom = (gammaPi - tau * gammaPiTau) ** 2 / (tau ** 2 * gammaTauTau) - gammaPiPi
+        return (Rc * temp * numer / denom + Rc * temp * (tau * gammaPi - pi * gammaPi)).sqrt()
+
+    temp = um.Variable('temp', kelvin)
+    kernel = Eager(temp).Compile(temp)
+    temps = np.linspace(300.0, 600.0, 10000)
+    env = {'Eager': Eager, 'kernel': kernel, 't': 300.0 * kelvin, 'ts': list(temps * kelvin), 'column': temps * kelvin}
+    Report('eager Quantities', TimePerOp('Eager(t)', number=50000, globals=env))
+    Report('compiled kernel', TimePerOp('kernel(t)', number=50000, globals=env))
+    Report('eager, 10000 Quantities', TimePerOp('[Eager(t) for t in ts]', number=10, globals=env))
+    Report('compiled kernel, 10000 element array', TimePerOp('kernel(column)', number=1000, globals=env))
+
+
+def BenchDual():
+    print('B31_3_Para304_1_2 dt/dP and dt/dS, central differences vs DualQuantity')
+    import Code_Rules
+    import NIST330 as un
+
+    Code_Rules.verbose = False
+    psi, inch, ksi, none = un.Pressure.psi, un.Length.inch, un.Stress.ksi, un.Dimensionless.none
+    env = {'cr': Code_Rules, 'um': um, 'P': 1000.0 * psi, 'S': 20.0 * ksi, 'D': 6.625 * inch, 'd': 5.761 * inch,
+           'c': 0.0625 * inch, 'E': 1.0 * none, 'W': 1.0 * none, 'h': 1.0e-6}
+    differences = ('(cr.B31_3_Para304_1_2(P * (1 + h), D, d, c, S, E, W) - cr.B31_3_Para304_1_2(P * (1 - h), D, d, c, S, E, W)) / (P * 2 * h),'
+                   '(cr.B31_3_Para304_1_2(P, D, d, c, S * (1 + h), E, W) - cr.B31_3_Para304_1_2(P, D, d, c, S * (1 - h), E, W)) / (S * 2 * h)')
+    Report('4 evaluations', TimePerOp(differences, number=5000, globals=env))
+    Report('1 evaluation with Seed(P), Seed(S)',
+           TimePerOp("cr.B31_3_Para304_1_2(um.Seed(P, 'P'), D, d, c, um.Seed(S, 'S'), E, W).Gradient", number=5000, globals=env))
+
+
+def BenchSolve():
+    print('Invert x^3 + x^2 * 1 m for 1000 volumes')
+    m = um.Quantity.Create(1.0, um.Dimension([0, 1, 0, 0, 0, 0, 0, 0]))
+    volumes = np.linspace(1.0, 1000.0, 1000) * (m * m * m)
+    env = {'um': um, 'm': m, 'volumes': volumes, 'each': list(volumes),
+           'f': lambda x: x * x * x + x * x * m}
+    Report('Solve() per element', TimePerOp('[um.Solve(f, v, 0.0 * m, 20.0 * m) for v in each]', number=2, globals=env))
+    Report('Solve() on the QuantityArray', TimePerOp('um.Solve(f, volumes, 0.0 * m, 20.0 * m)', number=20, globals=env))
+
+
+def BenchTable():
+    print('Look up 10000 points in a 100 row table')
+    m = um.Quantity.Create(1.0, um.Dimension([0, 1, 0, 0, 0, 0, 0, 0]))
+    axis = np.linspace(1.0, 100.0, 100)
+    rows = [[x, np.sqrt(x)] for x in axis]
+    points = np.linspace(1.0, 100.0, 10000)
+    table = um.QuantityTable(axis * m, np.sqrt(axis) * m)
+    cubic = um.QuantityTable(axis * m, np.sqrt(axis) * m, 'cubic')
+
+    def scan(x):
+        # the hand-written row scan the code rules use
+        for row in range(len(rows) - 1):
+            if x < rows[row + 1][0]:
+                break
+        x0, y0 = rows[row]
+        x1, y1 = rows[row + 1]
+        return y0 + (x - x0) * (y1 - y0) / (x1 - x0)
+
+    env = {'scan': scan, 'table': table, 'cubic': cubic, 'm': m,
+           'each': points.tolist(), 'qtys': [x * m for x in points], 'points': points * m}
+    Report('row scan per point', TimePerOp('[scan(x) for x in each]', number=2, globals=env))
+    Report('QuantityTable per Quantity', TimePerOp('[table(q) for q in qtys]', number=2, globals=env))
+    Report('QuantityTable on the QuantityArray', TimePerOp('table(points)', number=200, globals=env))
+    Report('cubic QuantityTable on the QuantityArray', TimePerOp('cubic(points)', number=200, globals=env))
+
+
+def BenchColumns():
+    print('Read and write 100000 rows of a unit-annotated CSV file')
+    import io
+    rows = ''.join(f'{i},{100.0 + i * 0.001},{70.0 + i * 0.0001},0.5\n' for i in range(100000))
+    text = 'n,P1 [psig],T1 [°F],dia [in]\n' + rows
+    chunk = next(um.ReadColumns(io.StringIO(text), chunk_rows=100000))
+    units = {'P1': um.parse_unit('psig'), 'T1': um.parse_unit('°F'), 'dia': um.parse_unit('in')}
+    env = {'um': um, 'io': io, 'text': text, 'chunk': chunk, 'units': units}
+    Report('ReadColumns() in 10000 row chunks', TimePerOp('for c in um.ReadColumns(io.StringIO(text), chunk_rows=10000): pass', number=5, globals=env))
+    Report('WriteColumns()', TimePerOp("um.WriteColumns(io.StringIO(), chunk, units, '.4f')", number=5, globals=env))
+
+
+def BenchBinary():
+    print('Save and load 1000000 SI values')
+    import os
+    import pickle
+    import tempfile
+    m = um.Quantity.Create(1.0, um.Dimension([0, 1, 0, 0, 0, 0, 0, 0]))
+    qa = np.linspace(0.0, 1.0, 1000000) * m
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, 'bench.uoq')
+    env = {'um': um, 'pickle': pickle, 'qa': qa, 'path': path, 'data': pickle.dumps(qa)}
+    Report('pickle.dumps()', TimePerOp('pickle.dumps(qa)', number=20, globals=env))
+    Report('pickle.loads()', TimePerOp('pickle.loads(data)', number=20, globals=env))
+    Report('SaveQuantity()', TimePerOp('um.SaveQuantity(path, qa)', number=20, globals=env))
+    Report('LoadQuantity() with mmap', TimePerOp('um.LoadQuantity(path)', number=20, globals=env))
+    Report('LoadQuantity() without mmap', TimePerOp('um.LoadQuantity(path, mmap=False)', number=20, globals=env))
+    os.remove(path)
+    os.rmdir(folder)
+
+
+def BenchPandas():
+    try:
+        import pandas as pd
+        import unit_of_measure_pandas as ump
+    except ImportError:
+        print('pandas is not installed, skipping the DataFrame benchmarks')
+        return
+    print('Group 100000 pressures into 100 runs')
+    pa = um.Quantity.Create(1.0, um.Dimension([1, -1, -2, 0, 0, 0, 0, 0]))
+    values = np.linspace(1.0e5, 2.0e5, 100000)
+    runs = np.arange(100000) % 100
+    objects = pd.DataFrame({'run': runs, 'p': pd.Series([v * pa for v in values], dtype=object)})
+    columns = pd.DataFrame({'run': runs, 'p': ump.QuantitySeries(values * pa)})
+    env = {'objects': objects, 'columns': columns}
+    Report('object column groupby sum', TimePerOp("objects.groupby('run').p.sum()", number=2, globals=env))
+    Report('Quantity column groupby sum', TimePerOp("columns.groupby('run').p.sum()", number=20, globals=env))
+    Report('object column p + p', TimePerOp('objects.p + objects.p', number=2, globals=env))
+    Report('Quantity column p + p', TimePerOp('columns.p + columns.p', number=20, globals=env))
+
+
+def BenchConvert():
+    print('Convert psig values to kPa')
+    import NIST330 as un
+    P = un.Pressure
+    column = np.linspace(0.0, 1500.0, 10000)
+    env = {'converter': um.converter, 'convert': P.convert, 'psig': P.psig, 'kPa': P.kPa,
+           'column': column, 'qty': 150.0 * P.psig}
+    Report('qty.Value(kPa)', TimePerOp('qty.Value(kPa)', repeat=9, globals=env))
+    Report('converter(psig, kPa)(150.0)', TimePerOp('converter(psig, kPa)(150.0)', repeat=9, globals=env))
+    Report('P.convert(150.0, psig, kPa)', TimePerOp('convert(150.0, psig, kPa)', repeat=9, globals=env))
+    Report("P.convert(150.0, 'psig', 'kPa')", TimePerOp("convert(150.0, 'psig', 'kPa')", repeat=9, globals=env))
+    Report('converter() on 10000 values', TimePerOp('converter(psig, kPa)(column)', number=2000, repeat=9, globals=env))
+    Report('P.convert() on 10000 values', TimePerOp('convert(column, psig, kPa)', number=2000, repeat=9, globals=env))
+
+
+def BenchUnitSystem():
+    print('Format with a display unit system')
+    import NIST330 as un
+    env = {'un': un, 'q': 0.25 * un.Length.inch, 'S': 20.0 * un.Stress.ksi}
+    un.Shop.Format(env['q'])
+    Report("q.Format(un.Length.inch, '0.3f')", TimePerOp("q.Format(un.Length.inch, '0.3f')", globals=env))
+    Report('un.Shop.Format(q)', TimePerOp('un.Shop.Format(q)', globals=env))
+    Report("un.Shop.Format(S, 'Stress')", TimePerOp("un.Shop.Format(S, 'Stress')", globals=env))
+
+
+def BenchWaterRegion1():
+    print('IAPWS-97 Region 1 properties on a 100000 point (p, T) grid')
+    import NIST330 as un
+    import Water
+    p = np.linspace(1.0, 80.0, 400)[:, np.newaxis] * un.Pressure.MPa
+    t = np.linspace(280.0, 500.0, 250)[np.newaxis, :] * un.Temperature.degK
+    env = {'Water': Water, 'un': un, 'p': p, 't': t,
+           'P': 3.0 * un.Pressure.MPa, 'T': 300.0 * un.Temperature.degK}
+    Report('Region1().Eval() per state', TimePerOp('Water.Region1().Eval(P, T)', number=200, globals=env))
+    Report('Region1().EvalArray() on the grid', TimePerOp('Water.Region1().EvalArray(p, t)', number=5, globals=env))
+
+
+
+def BenchWaterRegion2():
+    print('IAPWS-97 Region 2 properties on a 100000 point (p, T) grid')
+    import NIST330 as un
+    import Water
+    p = np.linspace(0.01, 10.0, 400)[:, np.newaxis] * un.Pressure.MPa
+    t = np.linspace(650.0, 1000.0, 250)[np.newaxis, :] * un.Temperature.degK
+    env = {'Water': Water, 'un': un, 'p': p, 't': t,
+           'P': 1.0 * un.Pressure.MPa, 'T': 700.0 * un.Temperature.degK}
+    Report('Region2().Eval() per state', TimePerOp('Water.Region2().Eval(P, T)', number=200, globals=env))
+    Report('Region2().EvalArray() on the grid', TimePerOp('Water.Region2().EvalArray(p, t)', number=5, globals=env))
+
+# run in a fresh interpreter so the import is not already cached; numpy and
+# unit_of_measure are imported first and not counted
+_import_script = '''
+import time
+import unit_of_measure
+t0 = time.perf_counter()
+import NIST330
+t1 = time.perf_counter()
+x = NIST330.Pressure.psig, NIST330.Length.inch
+t2 = time.perf_counter()
+for name in NIST330.__all__:
+    getattr(NIST330, name)
+t3 = time.perf_counter()
+print(t1 - t0, t2 - t1, t3 - t2)
+'''
+
+def BenchImport(runs = 10):
+    print('import NIST330 in a new interpreter')
+    import subprocess
+    best = [float('inf')] * 3
+    for run in range(runs):
+        output = subprocess.run([sys.executable, '-c', _import_script], capture_output=True, text=True, check=True).stdout
+        best = [min(b, float(t)) for b, t in zip(best, output.split())]
+    Report('import NIST330', best[0] * 1.0e9)
+    Report('first use of Pressure and Length', best[1] * 1.0e9)
+    Report('build the rest of the catalog', best[2] * 1.0e9)
+
+
+if __name__ == '__main__':
+
+    def main():
+        BenchDimension()
+        BenchQuantityConstruction()
+        BenchQuantityOps()
+        BenchConverter()
+        BenchLoadUnits()
+        BenchFormat()
+        BenchNumPy()
+        BenchTraceOnce()
+        BenchUnchecked()
+        BenchLazy()
+        BenchDual()
+        BenchSolve()
+        BenchTable()
+        BenchColumns()
+        BenchBinary()
+        BenchPandas()
+        BenchConvert()
+        BenchUnitSystem()
+        BenchWaterRegion1()
+        BenchWaterRegion2()
+        BenchImport()
+
+    main()
@@ -21,6 +21,11 @@
 #   t_act: actual thickness to be compared with calculated required thickness
 #   returns: required head thickness
 #
+# UG34_C_2_Eq1_t(d, P, S, C, E)
+#   the arithmetic of UG34_C_2_Eq1 without the report; dimensions are checked on the first call only,
+#   so it can be used for sweeps over many designs or over QuantityArrays
+#   returns: required head thickness
+#
 # AppII_Dims(bo, od_contact_face, bolt_cir_dia)
 #   bo: basic gasket seating width (from Table 2-5.2)
 #   od_contact_face: outer diameter of the contact face between the gasket and the flange
@@ -128,6 +133,7 @@ eng_path = 'D:/SpringMountTech/Technical/Code Python/Engineering'
 if not eng_path in sys.path:
     sys.path.append(eng_path)
 
+import unit_of_measure as um
 import NIST330 as un
 import Threads as Threads
 
@@ -229,12 +235,16 @@ def B31_3_Para304_1_2(P, D, d, c, S, E, W, t_act = (0.0 * uin)):
 
 
 
+@um.TraceOnce
+def UG34_C_2_Eq1_t(d, P, S, C, E):
+    return d * np.sqrt(C * P / S / E)
+
 def UG34_C_2_Eq1(d, P, S, C, E, t_act = (0.0 * uin)):
 
     if (verbose):
         print(f'Calculate required flat head thickness per Sec VII, Div 1, UG-34(c)(2) eqn (1) - no edge moments')
 
-    t = d * (C * P / S / E).sqrt()
+    t = UG34_C_2_Eq1_t(d, P, S, C, E)
     f_str = '  t = d * sqrt((C*P) / (S*E))'
 
     if (verbose):
@@ -1,352 +1,634 @@
+import math
+
 import numpy as np
-import sys
-eng_path = 'D:/SpringMountTech/Technical/Code Python/Engineering'
-if not eng_path in sys.path:
-    sys.path.insert(0, eng_path)
 from unit_of_measure import *
 
-class Acceleration:
-    #                   'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([0,    1,  -2,   0,   0,   0,     0,    0])
-    g = Unit.Create('g', _dim, 9.80665)
-    Gal = Unit.Create('Gal', _dim, 1.0)
-
-class AbsorbedDose:
-    #                   'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([0,    2,  -2,   0,   0,   0,     0,    0])
-    Gray = Unit.Create('Gy', _dim, 1.0)
-
-class Activity:
-    #                   'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([0,    0,  -1,   0,   0,   0,     0,    0])
-    Becquerel = Unit.Create('Bq', _dim, 1.0)
-
-class Amount:
-    #                   'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([0,    0,   0,   0,   0,   1,     0,    0])
-    Mol = Unit.Create('Mol', _dim, 1.0)
-    kMol = Unit('kMol', 1000.0 * Mol)
-
-class Angle:
-    #                   'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([0,    0,   0,   0,   0,   0,     0,    0])
-    Radian = Unit.Create('rad', _dim, 1.0)
-    rev = Unit('r', Radian * 2.0 * np.pi)
-    deg = Unit('°', rev / 360.0)
-    grad = Unit('grad', rev / 400.0)
-    gon = Unit('gon', 1.0 * grad)
-    mil = Unit('mil', rev / 6400.0)
-    min = Unit("'", deg / 60.0)
-    sec = Unit('"', min / 60.0)
-    Steradian = Unit('sr', 1.0 * Radian)
-    
-
-class Area:
-    #                   'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([0,    2,   0,   0,   0,   0,     0,    0])
-    meterSq = Unit.Create('m^2', _dim, 1.0)
-    mmSq = Unit('mm^2', 0.001 ** 2 * meterSq)
-    acre = Unit('acre', 4046.87260987 * meterSq)
-    are = Unit('a', 100.0 * meterSq)
-    barn = Unit('b', 1.0E-28 * meterSq)
-    cmil = Unit('cmil', 5.06707479097498e-10 * meterSq)
-    hectare = Unit('ha', 10000.0 * meterSq)
-    ftSq = Unit('ft^2', 0.3048 ** 2 * meterSq)
-    inSq = Unit('in^2', 0.0254 ** 2 * meterSq)
-    mileSq = Unit('mi^2', 1609.344 ** 2 * meterSq)
-    mileUSSq = Unit('miUS^2', 1609.34721869 ** 2 * meterSq)
-    yardSq = Unit('yd^2', 0.9144 ** 2 * meterSq)
-
-class Capacitance:
-    #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([-1,   -2,   4,   2,   0,   0,     0,    0])
-    Farad = Unit.Create('F', _dim, 1.0)
-    milliFarad = Unit('mF', 0.001 * Farad)
-    microFarad = Unit('µF', 0.000001 * Farad)
-    pico = Unit('pF', 0.000000001 * Farad)
-
-class Charge:
-    #                   'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([0,    0,   1,   1,   0,   0,     0,    0])
-    Coulomb = Unit.Create('C', _dim, 1.0)
-    
-class Conductance:
-    #                   'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([1,    2,   3,   2,   0,   0,     0,    0])
-    Siemens = Unit.Create('S', _dim, 1.0)
-
-class Density:
-    #                   'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([1,   -3,   0,   0,   0,   0,     0,    0])
-    kg_m3 = Unit.Create('kg/m^3', _dim, 1.0)
-    g_cm3 = Unit('g/cm^3', 1000.0 * kg_m3)
-    lbm_ft3 = Unit('lbm/ft^3', 16.018463373960138 * kg_m3)
-    lbm_in3 = Unit('lbm/in^3', 27679.904710203125 * kg_m3)
-
-class Dimensionless:
-    #                   'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([0,    0,   0,   0,   0,   0,     0,    0])
-    none = Unit.Create('', _dim, 1.0)
-    pct = Unit('%', none / 100.0)
-    ppm = Unit('ppm', none / 1.0e6)
-
-class Energy:
-   #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([1,    2,  -2,   0,   0,   0,     0,    0])
-    J = Unit.Create('J', _dim, 1.0)
-    kJ = Unit('kJ', 1000.0 * J)   
-    Btu = Unit('Btu', 1055.05585262 * J)
-    cal = Unit('cal', 4.184 * J)  # based on the thermochemical calorie, not the International Table calorie
-
-class EquivalentDose:
-   #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([0,    2,  -2,   0,   0,   0,     0,    0])
-    Sievert = Unit.Create('Sv', _dim, 1.0)
-
-class Force:
-   #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([1,    1,  -2,   0,   0,   0,     0,    0])
-    N = Unit.Create('N', _dim, 1.0)
-    kN = Unit('kN', 1000.0 * N)
-    gf =  Unit('gf', 0.00980665 * N) 
-    kip = Unit('kip', 4448.22161526 * N)
-    pdl = Unit('pdl', 0.138254954376 * N)
-    lbf = Unit('lbf', 4.4482216152605 * N)
-    ozf = Unit('ozf', 0.278013850953781 * N)
-
-class Frequency:
-   #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([0,    0,  -1,   0,   0,   0,     0,    0])
-    Hz = Unit.Create('Hz', _dim, 1.0)
-    kHz = Unit('kHz', 1000.0 * Hz)
-    MHz = Unit('MHz', 1.0e6 * Hz)
-    GHz = Unit('GHz', 1.0e9 * Hz)
-
-class Illuminance:
-   #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([0,    2,   0,   0,   0,   0,     1,    0])
-    Lux = Unit.Create('lx', _dim, 1.0)             
-
-class Inductance:
-   #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([1,    2,  -2,   -2,   0,   0,     0,    0])
-    Henry = Unit.Create('H', _dim, 1.0)            
-    milliHenry = Unit('mH', Henry / 1000.0)            
-    microHenry = Unit('mH', Henry / 1.0e6)            
-    picoHenry = Unit('pH', Henry / 1.0e9)            
-
-class Length:
-    #                   'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([0,    1,   0,   0,   0,   0,     0,    0])
-    m = Unit.Create('m', _dim, 1.0)
-    cm = Unit('cm', 0.01 * m)
-    mm = Unit('mm', 0.001 * m)
-    micron = Unit('um', m / 1.0e6)
-    Km = Unit('Km', 1000.0 * m)
-
-    ft = Unit('ft', 0.3048 * m)
-    ftUS = Unit('ftUS', 0.304800609601 * m)
-    inch = Unit('in', ft / 12.0)
-    mil = Unit('mil', 0.001 * inch)
-    mile = Unit('mi', 5280.0 * ft)
-    miUS = Unit('miUS', 1609.34721869 * m)
-    nmi = Unit('nmi', 1852.0 * m)
-    yd = Unit('yd', 3.0 * ft)
-
-class LuminousFlux:
-   #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([0,    0,   0,   0,   0,   0,     1,    0])
-    Lumen = Unit.Create('lm', _dim, 1.0)             
-
-class MagneticFlux:
-   #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([1,    2,  -2,  -1,   0,   0,     0,    0])
-    Weber = Unit.Create('Wb', _dim, 1.0)             
-
-class MagneticFluxDensity:
-   #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([1,    0,  -2,  -1,   0,   0,     0,    0])
-    Tesla = Unit.Create('T', _dim, 1.0)
-
-class Mass:
-    #                   'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([1,    0,   0,   0,   0,   0,     0,    0])
-    Kg = Unit.Create('Kg', _dim, 1.0)
-    g = Unit('g', 0.001 * Kg)
-    mg = Unit('mg', Kg / 1.0e6)
-    oz = Unit('oz', 0.028349523125 * Kg)
-    lbm = Unit('lbm', 0.45359237 * Kg)
-    slug = Unit('slug', 14.5939029372 * Kg)
-    ton = Unit('ton', 907.18474 * Kg)
-    tonUK = Unit('tonUK', 1016.0469088 * Kg)
-
-class Power:
-   #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([1,    2,  -3,   0,   0,   0,     0,    0])
-    Watt = Unit.Create('W', _dim, 1.0)
-    hp = Unit('hp', 745.699871582 * Watt)
-    mW = Unit('mW', 0.001 * Watt)
-    kW = Unit('kW', 1000.0 * Watt)
-    MW = Unit('kW', 1.0e6 * Watt)
-    GW = Unit('kW', 1.0e9 * Watt)
-
-class Pressure:
-   #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([1,   -1,  -2,   0,   0,   0,     0,    0])
-    Pa = Unit.Create('Pa', _dim, 1.0)
-    atm = Unit('atm', 101325.0 * Pa)
-    bar = Unit('bar', 100000.0 * Pa)
-    mbar = Unit('mbar', 0.001 * bar)
-    kPa = Unit('kPa', 1000.0 * Pa)
-    MPa = Unit('MPa', 1000.0 * kPa)
-    inHg = Unit('inHg', 3386.38815789 * Pa)
-    inH2O = Unit('inH2O', 248.84 * Pa)
-    mmHg = Unit('mmHg', 133.322368421 * Pa)
-    mmH2O = Unit('mmH2O', 9.796850394 * Pa)
-    psi = Unit('psi', 6894.75729317 * Pa)
-    psia = Unit('psia', 1.0 * psi)
-    psig = Unit('psig', 6894.75729317 * Pa, 1.0 * atm)
-    Torr = Unit('torr', 1.0 * mmHg)
- 
-class Resistance:
-   #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([1,    2,  -3,   -2,   0,   0,     0,    0])
-    Ohm = Unit.Create('Ω', _dim, 1.0)
-    kOhm = Unit('kΩ', 1000.0 * Ohm)
-    MOhm = Unit('MΩ', 1.0e6 * Ohm)
-    mOhm = Unit('mΩ', 0.001 * Ohm)
-    µOhm = Unit('µΩ', Ohm / 1.0e6)
-
-class SpEnergy:
-   #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([0,    2,  -2,   0,   0,   0,     0,    0])
-    J_g = Unit.Create('J/g', _dim, 1000.0)
-    kJ_kg = Unit('kJ/Kg', 1.0 * J_g)   
-    Btu_lbm = Unit('Btu/lbm', 2.324444 * J_g)  # based on the thermochemical calorie, not the International Table calorie
-    cal_g = Unit('cal/g', 4.184 * J_g)         # based on the thermochemical calorie, not the International Table calorie
-
-class SpHeatCap:
-   #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([0,    2,  -2,   0,  -1,   0,     0,    0])
-    J_gK = Unit.Create('J/g·°K', _dim, 1000.0)
-    kJ_kgK = Unit('kJ/kg·°K', 1.0 * J_gK)   
-    Btu_lbmF = Unit('Btu/lbm·°F', 4.184 * J_gK)  # based on the thermochemical calorie, not the International Table calorie
-    cal_gC = Unit('cal/g·°C', 4.184 * J_gK)      # based on the thermochemical calorie, not the International Table calorie
-
-class SpVolume:
-    #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([-1,    3,   0,   0,   0,   0,     0,    0])
-    m3_kg = Unit.Create('m^3/kg', _dim, 1.0)
-    cm3_g = Unit('cm^3/g', 0.001 * m3_kg)
-    ft3_lbm = Unit('ft^3/lbm', m3_kg / 16.0184633739601)
-    in3_lbm = Unit('in^3/lbm', m3_kg / 27679.9047102031)
-
-class Stress:
-   #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([1,   -1,  -2,   0,   0,   0,     0,    0])
-    Pa = Unit.Create('Pa', _dim, 1.0)
-    kPa = Unit('kPa', 1000.0 * Pa)
-    MPa = Unit('MPa', 1.0e6 * Pa)
-    psi = Unit('psi', 6894.75729317 * Pa)
-    ksi = Unit('ksi', 1000.0 * psi)
-    msi = Unit('msi', 1.0e6 * psi)
-
-class Temperature:
-    #                   'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([0,    0,   0,   0,   1,   0,     0,    0])
-    degK = Unit.Create('K', _dim, 1.0)
-    degR = Unit('°R', 5.0 / 9.0 * degK)
-    degC = Unit('°C', 1.0 * degK, 273.15 * degK)
-    deltaC = Unit('▲°C', 1.0 * degK)
-    degF = Unit('°F', 1.0 * degR, 459.67 * degR)
-    deltaF = Unit('▲°F', 1.0 * degR)
-
-class Time:
-    #                   'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([0,    0,   1,   0,   0,   0,     0,    0])
-    s = Unit.Create('s', _dim, 1.0)
-    min = Unit('min', 60.0 * s)
-    hr = Unit('h', 60.0 * min)
-    d = Unit('d', 24.0 * hr)
-    yr = Unit('yr', 365.0 * d)
-
-class Velocity:
-   #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([0,    1,  -1,   0,   0,   0,     0,    0])
-    mps = Unit.Create('mps', _dim, 1.0)
-    mph = Unit('mph', mps / 3600.0)
-    kph = Unit('kph', 1000.0 * mph)
-
-    fps = Unit('fps', 0.3048 * mps)
-    fpm = Unit('fpm', fps / 60.0)
-    knot = Unit('knot', 0.514444444444 * mps)
-
-class Viscosity:
-   #                       'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dimAbs = Dimension([1,   -1,  -1,   0,   0,   0,     0,    0])
-    Pa_s = Unit.Create('Pa·s', _dimAbs, 1.0)
-    Poise = Unit('P', 0.01 * Pa_s)
-    cP = Unit('cP', 0.01 * Poise)
-
-   #                       'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dimKin = Dimension([0,    2,  -1,   0,   0,   0,     0,    0])
-    m2ps = Unit.Create('m^2/s', _dimKin, 1.0)
-    Stoke = Unit('St', m2ps / 1.0e4)
-    cSt = Unit('cSt', 0.01 * Stoke)
-
-class Voltage:
-   #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([1,    2,  -3,  -1,   0,   0,     0,    0])
-    Volt = Unit.Create('V', _dim, 1.0)
-    kV = Unit('kV', 1000.0 * Volt)
-    MV = Unit('MV', 1.0e6 * Volt)
-    mV = Unit('mV', 0.001 * Volt)
-    µV = Unit('µV', Volt / 1.0e6)
-
-class Volume:
-   #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([0,    3,   0,   0,   0,   0,     0,    0])
-    meterCu = Unit.Create('m^3', _dim, 1.0)
-    liter = Unit('l', 0.001 * meterCu)
-    ml = Unit('ml', liter / 1000.0)
-    cc = Unit('cc', 1.0 * ml)
-
-    inCu = Unit('in^3', meterCu * 0.0254 ** 3)
-    ftCu = Unit('ft^3', inCu / 12.0 ** 3)
-    ydCu = Unit('ft^3', ftCu / 3.0 ** 3)
-    bbl = Unit('bbl', 0.158987294928 * meterCu)
-    cup = Unit('cu', 2.365882365E-04 * meterCu)
-    gal = Unit('gal', 0.003785411784 * meterCu)
-    galCdn = Unit('galC', 0.00454609 * meterCu)
-    galUK = Unit('galUK', 0.004546092 * meterCu)
-    ozfl = Unit('m^3', 2.95735295625E-05 * meterCu)
-    ozUK = Unit('ozUK', 0.000028413075 * meterCu)
-    pt = Unit('pt', 0.000473176473 * meterCu)
-    qt = Unit('qt', 0.000946352946 * meterCu)
-    tbsp = Unit('tbsp', 1.47867647813E-05 * meterCu)
-    tsp = Unit('tsp', 4.92892159375E-06 * meterCu)
-
-class VolFlowRate:
-   #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
-    _dim = Dimension([0,    3,  -1,   0,   0,   0,     0,    0])
-    m3_s = Unit.Create('m^3/s', _dim, 1.0)
-    lpm = Unit('lpm', 1.0 * Volume.liter / Time.min)
-
-    gpm = Unit('gpm', 1.0 * Volume.gal / Time.min)
-    gph = Unit('gph', 1.0 * Volume.gal / Time.hr)
-    ccm = Unit('ccm', 1.0 * Volume.cc / Time.min)
-    ml_m = Unit('ml/min', 1.0 * Volume.ml / Time.min)
-    cfm = Unit('cfm', 1.0 * Volume.ftCu / Time.min)
-    cfh = Unit('cfh', Volume.ftCu / Time.hr)
-
-class Work:
-    Btu = Energy.Btu
-    cal = Energy.cal
-    J = Energy.J
-    kJ = Energy.kJ
+# The catalog is built on demand: each category below is a function that
+# defines and returns the category class.  The first NIST330.Pressure (or
+# 'from NIST330 import Pressure') calls it through the module __getattr__
+# and keeps the class, so an import only pays for the categories it uses.
+# Categories that use another category's units fetch it with _Category().
+# Each category also gets a ConversionMatrix between its units:
+#   Pressure.convert(values, Pressure.psig, Pressure.kPa)
+
+# the NIST330.Dimensionless category, not the Dimension
+del Dimensionless
+
+_builders = dict()
+
+def _category(build):
+    _builders[build.__name__[1:]] = build
+    return build
+
+
+def _Category(name : str):
+    category = globals().get(name)
+    if category is None:
+        category = _builders[name]()
+        category.convert = ConversionMatrix.FromCategory(category)
+        globals()[name] = category
+    return category
+
+
+def __getattr__(name : str):
+    if name in _builders:
+        return _Category(name)
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_builders))
+
+
+@_category
+def _Acceleration():
+    class Acceleration:
+        #                   'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([0,    1,  -2,   0,   0,   0,     0,    0])
+        g = Unit.Create('g', _dim, 9.80665)
+        Gal = Unit.Create('Gal', _dim, 1.0)
+    return Acceleration
+
+
+@_category
+def _AbsorbedDose():
+    class AbsorbedDose:
+        #                   'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([0,    2,  -2,   0,   0,   0,     0,    0])
+        Gray = Unit.Create('Gy', _dim, 1.0)
+    return AbsorbedDose
+
+
+@_category
+def _Activity():
+    class Activity:
+        #                   'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([0,    0,  -1,   0,   0,   0,     0,    0])
+        Becquerel = Unit.Create('Bq', _dim, 1.0)
+    return Activity
+
+
+@_category
+def _Amount():
+    class Amount:
+        #                   'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([0,    0,   0,   0,   0,   1,     0,    0])
+        Mol = Unit.Create('Mol', _dim, 1.0)
+        kMol = Unit('kMol', 1000.0 * Mol)
+    return Amount
+
+
+@_category
+def _Angle():
+    class Angle:
+        #                   'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([0,    0,   0,   0,   0,   0,     0,    0])
+        Radian = Unit.Create('rad', _dim, 1.0)
+        rev = Unit('r', Radian * 2.0 * np.pi)
+        deg = Unit('°', rev / 360.0)
+        grad = Unit('grad', rev / 400.0)
+        gon = Unit('gon', 1.0 * grad)
+        mil = Unit('mil', rev / 6400.0)
+        min = Unit("'", deg / 60.0)
+        sec = Unit('"', min / 60.0)
+        Steradian = Unit('sr', 1.0 * Radian)
+    return Angle
+
+
+@_category
+def _Area():
+    class Area:
+        #                   'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([0,    2,   0,   0,   0,   0,     0,    0])
+        meterSq = Unit.Create('m^2', _dim, 1.0)
+        mmSq = Unit('mm^2', 0.001 ** 2 * meterSq)
+        acre = Unit('acre', 4046.87260987 * meterSq)
+        are = Unit('a', 100.0 * meterSq)
+        barn = Unit('b', 1.0E-28 * meterSq)
+        cmil = Unit('cmil', 5.06707479097498e-10 * meterSq)
+        hectare = Unit('ha', 10000.0 * meterSq)
+        ftSq = Unit('ft^2', 0.3048 ** 2 * meterSq)
+        inSq = Unit('in^2', 0.0254 ** 2 * meterSq)
+        mileSq = Unit('mi^2', 1609.344 ** 2 * meterSq)
+        mileUSSq = Unit('miUS^2', 1609.34721869 ** 2 * meterSq)
+        yardSq = Unit('yd^2', 0.9144 ** 2 * meterSq)
+    return Area
+
+
+@_category
+def _Capacitance():
+    class Capacitance:
+        #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([-1,   -2,   4,   2,   0,   0,     0,    0])
+        Farad = Unit.Create('F', _dim, 1.0)
+        milliFarad = Unit('mF', 0.001 * Farad)
+        microFarad = Unit('µF', 0.000001 * Farad)
+        pico = Unit('pF', 0.000000001 * Farad)
+    return Capacitance
+
+
+@_category
+def _Charge():
+    class Charge:
+        #                   'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([0,    0,   1,   1,   0,   0,     0,    0])
+        Coulomb = Unit.Create('C', _dim, 1.0)
+    return Charge
+
+
+@_category
+def _Conductance():
+    class Conductance:
+        #                   'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([1,    2,   3,   2,   0,   0,     0,    0])
+        Siemens = Unit.Create('S', _dim, 1.0)
+    return Conductance
+
+
+@_category
+def _Density():
+    class Density:
+        #                   'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([1,   -3,   0,   0,   0,   0,     0,    0])
+        kg_m3 = Unit.Create('kg/m^3', _dim, 1.0)
+        g_cm3 = Unit('g/cm^3', 1000.0 * kg_m3)
+        lbm_ft3 = Unit('lbm/ft^3', 16.018463373960138 * kg_m3)
+        lbm_in3 = Unit('lbm/in^3', 27679.904710203125 * kg_m3)
+    return Density
+
+
+@_category
+def _Dimensionless():
+    class Dimensionless:
+        #                   'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([0,    0,   0,   0,   0,   0,     0,    0])
+        none = Unit.Create('', _dim, 1.0)
+        pct = Unit('%', none / 100.0)
+        ppm = Unit('ppm', none / 1.0e6)
+    return Dimensionless
+
+
+@_category
+def _Energy():
+    class Energy:
+       #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([1,    2,  -2,   0,   0,   0,     0,    0])
+        J = Unit.Create('J', _dim, 1.0)
+        kJ = Unit('kJ', 1000.0 * J)   
+        Btu = Unit('Btu', 1055.05585262 * J)
+        cal = Unit('cal', 4.184 * J)  # based on the thermochemical calorie, not the International Table calorie
+    return Energy
+
+
+@_category
+def _EquivalentDose():
+    class EquivalentDose:
+       #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([0,    2,  -2,   0,   0,   0,     0,    0])
+        Sievert = Unit.Create('Sv', _dim, 1.0)
+    return EquivalentDose
+
+
+@_category
+def _Force():
+    class Force:
+       #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([1,    1,  -2,   0,   0,   0,     0,    0])
+        N = Unit.Create('N', _dim, 1.0)
+        kN = Unit('kN', 1000.0 * N)
+        gf =  Unit('gf', 0.00980665 * N) 
+        kip = Unit('kip', 4448.22161526 * N)
+        pdl = Unit('pdl', 0.138254954376 * N)
+        lbf = Unit('lbf', 4.4482216152605 * N)
+        ozf = Unit('ozf', 0.278013850953781 * N)
+    return Force
+
+
+@_category
+def _Frequency():
+    class Frequency:
+       #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([0,    0,  -1,   0,   0,   0,     0,    0])
+        Hz = Unit.Create('Hz', _dim, 1.0)
+        kHz = Unit('kHz', 1000.0 * Hz)
+        MHz = Unit('MHz', 1.0e6 * Hz)
+        GHz = Unit('GHz', 1.0e9 * Hz)
+    return Frequency
+
+
+@_category
+def _Illuminance():
+    class Illuminance:
+       #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([0,    2,   0,   0,   0,   0,     1,    0])
+        Lux = Unit.Create('lx', _dim, 1.0)             
+    return Illuminance
+
+
+@_category
+def _Inductance():
+    class Inductance:
+       #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([1,    2,  -2,   -2,   0,   0,     0,    0])
+        Henry = Unit.Create('H', _dim, 1.0)            
+        milliHenry = Unit('mH', Henry / 1000.0)            
+        microHenry = Unit('µH', Henry / 1.0e6)            
+        picoHenry = Unit('pH', Henry / 1.0e9)            
+    return Inductance
+
+
+@_category
+def _Length():
+    class Length:
+        #                   'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([0,    1,   0,   0,   0,   0,     0,    0])
+        m = Unit.Create('m', _dim, 1.0)
+        cm = Unit('cm', 0.01 * m)
+        mm = Unit('mm', 0.001 * m)
+        micron = Unit('um', m / 1.0e6)
+        Km = Unit('Km', 1000.0 * m)
+
+        ft = Unit('ft', 0.3048 * m)
+        ftUS = Unit('ftUS', 0.304800609601 * m)
+        inch = Unit('in', ft / 12.0)
+        mil = Unit('mil', 0.001 * inch)
+        mile = Unit('mi', 5280.0 * ft)
+        miUS = Unit('miUS', 1609.34721869 * m)
+        nmi = Unit('nmi', 1852.0 * m)
+        yd = Unit('yd', 3.0 * ft)
+    return Length
+
+
+@_category
+def _LuminousFlux():
+    class LuminousFlux:
+       #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([0,    0,   0,   0,   0,   0,     1,    0])
+        Lumen = Unit.Create('lm', _dim, 1.0)             
+    return LuminousFlux
+
+
+@_category
+def _MagneticFlux():
+    class MagneticFlux:
+       #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([1,    2,  -2,  -1,   0,   0,     0,    0])
+        Weber = Unit.Create('Wb', _dim, 1.0)             
+    return MagneticFlux
+
+
+@_category
+def _MagneticFluxDensity():
+    class MagneticFluxDensity:
+       #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([1,    0,  -2,  -1,   0,   0,     0,    0])
+        Tesla = Unit.Create('T', _dim, 1.0)
+    return MagneticFluxDensity
+
+
+@_category
+def _Mass():
+    class Mass:
+        #                   'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([1,    0,   0,   0,   0,   0,     0,    0])
+        Kg = Unit.Create('Kg', _dim, 1.0)
+        g = Unit('g', 0.001 * Kg)
+        mg = Unit('mg', Kg / 1.0e6)
+        oz = Unit('oz', 0.028349523125 * Kg)
+        lbm = Unit('lbm', 0.45359237 * Kg)
+        slug = Unit('slug', 14.5939029372 * Kg)
+        ton = Unit('ton', 907.18474 * Kg)
+        tonUK = Unit('tonUK', 1016.0469088 * Kg)
+    return Mass
+
+
+@_category
+def _Power():
+    class Power:
+       #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([1,    2,  -3,   0,   0,   0,     0,    0])
+        Watt = Unit.Create('W', _dim, 1.0)
+        hp = Unit('hp', 745.699871582 * Watt)
+        mW = Unit('mW', 0.001 * Watt)
+        kW = Unit('kW', 1000.0 * Watt)
+        MW = Unit('MW', 1.0e6 * Watt)
+        GW = Unit('GW', 1.0e9 * Watt)
+    return Power
+
+
+@_category
+def _Pressure():
+    class Pressure:
+       #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([1,   -1,  -2,   0,   0,   0,     0,    0])
+        Pa = Unit.Create('Pa', _dim, 1.0)
+        atm = Unit('atm', 101325.0 * Pa)
+        bar = Unit('bar', 100000.0 * Pa)
+        mbar = Unit('mbar', 0.001 * bar)
+        kPa = Unit('kPa', 1000.0 * Pa)
+        MPa = Unit('MPa', 1000.0 * kPa)
+        inHg = Unit('inHg', 3386.38815789 * Pa)
+        inH2O = Unit('inH2O', 248.84 * Pa)
+        mmHg = Unit('mmHg', 133.322368421 * Pa)
+        mmH2O = Unit('mmH2O', 9.796850394 * Pa)
+        psi = Unit('psi', 6894.75729317 * Pa)
+        psia = Unit('psia', 1.0 * psi)
+        psig = Unit('psig', 6894.75729317 * Pa, 1.0 * atm)
+        Torr = Unit('torr', 1.0 * mmHg)
+    return Pressure
+
+
+@_category
+def _Resistance():
+    class Resistance:
+       #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([1,    2,  -3,   -2,   0,   0,     0,    0])
+        Ohm = Unit.Create('Ω', _dim, 1.0)
+        kOhm = Unit('kΩ', 1000.0 * Ohm)
+        MOhm = Unit('MΩ', 1.0e6 * Ohm)
+        mOhm = Unit('mΩ', 0.001 * Ohm)
+        µOhm = Unit('µΩ', Ohm / 1.0e6)
+    return Resistance
+
+
+@_category
+def _SpEnergy():
+    class SpEnergy:
+       #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([0,    2,  -2,   0,   0,   0,     0,    0])
+        J_g = Unit.Create('J/g', _dim, 1000.0)
+        kJ_kg = Unit('kJ/Kg', 1.0 * J_g)   
+        Btu_lbm = Unit('Btu/lbm', 2.324444 * J_g)  # based on the thermochemical calorie, not the International Table calorie
+        cal_g = Unit('cal/g', 4.184 * J_g)         # based on the thermochemical calorie, not the International Table calorie
+    return SpEnergy
+
+
+@_category
+def _SpHeatCap():
+    class SpHeatCap:
+       #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([0,    2,  -2,   0,  -1,   0,     0,    0])
+        J_gK = Unit.Create('J/g·°K', _dim, 1000.0)
+        kJ_kgK = Unit('kJ/kg·°K', 1.0 * J_gK)   
+        Btu_lbmF = Unit('Btu/lbm·°F', 4.184 * J_gK)  # based on the thermochemical calorie, not the International Table calorie
+        cal_gC = Unit('cal/g·°C', 4.184 * J_gK)      # based on the thermochemical calorie, not the International Table calorie
+    return SpHeatCap
+
+
+@_category
+def _SpVolume():
+    class SpVolume:
+        #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([-1,    3,   0,   0,   0,   0,     0,    0])
+        m3_kg = Unit.Create('m^3/kg', _dim, 1.0)
+        cm3_g = Unit('cm^3/g', 0.001 * m3_kg)
+        ft3_lbm = Unit('ft^3/lbm', m3_kg / 16.0184633739601)
+        in3_lbm = Unit('in^3/lbm', m3_kg / 27679.9047102031)
+    return SpVolume
+
+
+@_category
+def _Stress():
+    class Stress:
+       #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([1,   -1,  -2,   0,   0,   0,     0,    0])
+        Pa = Unit.Create('Pa', _dim, 1.0)
+        kPa = Unit('kPa', 1000.0 * Pa)
+        MPa = Unit('MPa', 1.0e6 * Pa)
+        psi = Unit('psi', 6894.75729317 * Pa)
+        ksi = Unit('ksi', 1000.0 * psi)
+        msi = Unit('msi', 1.0e6 * psi)
+    return Stress
+
+
+@_category
+def _Temperature():
+    class Temperature:
+        #                   'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([0,    0,   0,   0,   1,   0,     0,    0])
+        degK = Unit.Create('K', _dim, 1.0)
+        degR = Unit('°R', 5.0 / 9.0 * degK)
+        degC = Unit('°C', 1.0 * degK, 273.15 * degK)
+        deltaC = Unit('▲°C', 1.0 * degK)
+        degF = Unit('°F', 1.0 * degR, 459.67 * degR)
+        deltaF = Unit('▲°F', 1.0 * degR)
+    return Temperature
+
+
+@_category
+def _Time():
+    class Time:
+        #                   'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([0,    0,   1,   0,   0,   0,     0,    0])
+        s = Unit.Create('s', _dim, 1.0)
+        min = Unit('min', 60.0 * s)
+        hr = Unit('h', 60.0 * min)
+        d = Unit('d', 24.0 * hr)
+        yr = Unit('yr', 365.0 * d)
+    return Time
+
+
+@_category
+def _Velocity():
+    class Velocity:
+       #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([0,    1,  -1,   0,   0,   0,     0,    0])
+        mps = Unit.Create('mps', _dim, 1.0)
+        mph = Unit('mph', mps / 3600.0)
+        kph = Unit('kph', 1000.0 * mph)
+
+        fps = Unit('fps', 0.3048 * mps)
+        fpm = Unit('fpm', fps / 60.0)
+        knot = Unit('knot', 0.514444444444 * mps)
+    return Velocity
+
+
+@_category
+def _Viscosity():
+    class Viscosity:
+       #                       'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dimAbs = Dimension([1,   -1,  -1,   0,   0,   0,     0,    0])
+        Pa_s = Unit.Create('Pa·s', _dimAbs, 1.0)
+        Poise = Unit('P', 0.01 * Pa_s)
+        cP = Unit('cP', 0.01 * Poise)
+
+       #                       'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dimKin = Dimension([0,    2,  -1,   0,   0,   0,     0,    0])
+        m2ps = Unit.Create('m^2/s', _dimKin, 1.0)
+        Stoke = Unit('St', m2ps / 1.0e4)
+        cSt = Unit('cSt', 0.01 * Stoke)
+    return Viscosity
+
+
+@_category
+def _Voltage():
+    class Voltage:
+       #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([1,    2,  -3,  -1,   0,   0,     0,    0])
+        Volt = Unit.Create('V', _dim, 1.0)
+        kV = Unit('kV', 1000.0 * Volt)
+        MV = Unit('MV', 1.0e6 * Volt)
+        mV = Unit('mV', 0.001 * Volt)
+        µV = Unit('µV', Volt / 1.0e6)
+    return Voltage
+
+
+@_category
+def _Volume():
+    class Volume:
+       #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([0,    3,   0,   0,   0,   0,     0,    0])
+        meterCu = Unit.Create('m^3', _dim, 1.0)
+        liter = Unit('l', 0.001 * meterCu)
+        ml = Unit('ml', liter / 1000.0)
+        cc = Unit('cc', 1.0 * ml)
+
+        inCu = Unit('in^3', meterCu * 0.0254 ** 3)
+        ftCu = Unit('ft^3', inCu * 12.0 ** 3)
+        ydCu = Unit('yd^3', ftCu * 3.0 ** 3)
+        bbl = Unit('bbl', 0.158987294928 * meterCu)
+        cup = Unit('cu', 2.365882365E-04 * meterCu)
+        gal = Unit('gal', 0.003785411784 * meterCu)
+        galCdn = Unit('galC', 0.00454609 * meterCu)
+        galUK = Unit('galUK', 0.004546092 * meterCu)
+        ozfl = Unit('ozfl', 2.95735295625E-05 * meterCu)
+        ozUK = Unit('ozUK', 0.000028413075 * meterCu)
+        pt = Unit('pt', 0.000473176473 * meterCu)
+        qt = Unit('qt', 0.000946352946 * meterCu)
+        tbsp = Unit('tbsp', 1.47867647813E-05 * meterCu)
+        tsp = Unit('tsp', 4.92892159375E-06 * meterCu)
+    return Volume
+
+
+@_category
+def _VolFlowRate():
+    Time = _Category('Time')
+    Volume = _Category('Volume')
+    class VolFlowRate:
+       #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([0,    3,  -1,   0,   0,   0,     0,    0])
+        m3_s = Unit.Create('m^3/s', _dim, 1.0)
+        lpm = Unit('lpm', 1.0 * Volume.liter / Time.min)
+
+        gpm = Unit('gpm', 1.0 * Volume.gal / Time.min)
+        gph = Unit('gph', 1.0 * Volume.gal / Time.hr)
+        ccm = Unit('ccm', 1.0 * Volume.cc / Time.min)
+        ml_m = Unit('ml/min', 1.0 * Volume.ml / Time.min)
+        cfm = Unit('cfm', 1.0 * Volume.ftCu / Time.min)
+        cfh = Unit('cfh', Volume.ftCu / Time.hr)
+    return VolFlowRate
+
+
+@_category
+def _MassFlowRate():
+    Mass = _Category('Mass')
+    Time = _Category('Time')
+    class MassFlowRate:
+       #                    'kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$'
+        _dim = Dimension([1,    0,  -1,   0,   0,   0,     0,    0])
+        kg_s = Unit.Create('kg/s', _dim, 1.0)
+        kg_hr = Unit('kg/hr', 1.0 * Mass.Kg / Time.hr)
+
+        lbm_s = Unit('lbm/s', 1.0 * Mass.lbm / Time.s)
+        lbm_hr = Unit('lbm/hr', 1.0 * Mass.lbm / Time.hr)
+    return MassFlowRate
+
+
+@_category
+def _Work():
+    Energy = _Category('Energy')
+    class Work:
+        Btu = Energy.Btu
+        cal = Energy.cal
+        J = Energy.J
+        kJ = Energy.kJ
+    return Work
+
+
+# Display unit systems.  Shop is the set of print units the Code_Rules
+# reports use.  Pressure and Stress share a Dimension; Pressure is primary,
+# so a stress prints in the pressure unit unless category='Stress' is given.
+SI = UnitSystem('SI', {
+    'Length': ('mm', '0.2f'),
+    'Area': ('mmSq', '0.2f'),
+    'Volume': ('liter', '0.3f'),
+    'Mass': ('Kg', '0.3f'),
+    'Force': ('N', '0.1f'),
+    'Pressure': ('kPa', '0.1f'),
+    'Stress': ('MPa', '0.1f'),
+    'Temperature': ('degC', '0.1f'),
+    'Time': ('s', '0.2f'),
+    'Velocity': ('mps', '0.2f'),
+    'Density': ('kg_m3', '0.2f'),
+    'Energy': ('kJ', '0.3f'),
+    'Power': ('kW', '0.3f'),
+    'VolFlowRate': ('lpm', '0.2f'),
+    'MassFlowRate': ('kg_s', '0.4f'),
+    'SpEnergy': ('kJ_kg', '0.2f'),
+    'SpHeatCap': ('kJ_kgK', '0.4f'),
+    'SpVolume': ('m3_kg', '0.6f'),
+    'Dimensionless': ('none', '0.3f'),
+}, primary=('Pressure',))
+
+US = UnitSystem('US', {
+    'Length': ('inch', '0.3f'),
+    'Area': ('inSq', '0.3f'),
+    'Volume': ('gal', '0.3f'),
+    'Mass': ('lbm', '0.3f'),
+    'Force': ('lbf', '0.1f'),
+    'Pressure': ('psig', '0.1f'),
+    'Stress': ('ksi', '0.3f'),
+    'Temperature': ('degF', '0.1f'),
+    'Time': ('s', '0.2f'),
+    'Velocity': ('fps', '0.2f'),
+    'Density': ('lbm_ft3', '0.3f'),
+    'Energy': ('Btu', '0.3f'),
+    'Power': ('hp', '0.3f'),
+    'VolFlowRate': ('gpm', '0.2f'),
+    'MassFlowRate': ('lbm_hr', '0.1f'),
+    'SpEnergy': ('Btu_lbm', '0.2f'),
+    'SpHeatCap': ('Btu_lbmF', '0.4f'),
+    'SpVolume': ('ft3_lbm', '0.4f'),
+    'Dimensionless': ('none', '0.3f'),
+}, primary=('Pressure',))
+
+Shop = US.Derive('Shop', {
+    'Length': ('inch', '0.3f'),
+    'Area': ('inSq', '0.6f'),
+    'Force': ('lbf', '0.0f'),
+    'Pressure': ('psi', '0.0f'),
+    'Stress': ('ksi', '0.3f'),
+})
+
+
+# 'from NIST330 import *' builds every category
+__all__ = [name for name in globals() if not name.startswith('_')] + list(_builders)
 
 
 if __name__ == '__main__':
+    # the examples below use the categories as globals
+    for name in _builders:
+        _Category(name)
+
+    # catalog entries whose symbol or factor was corrected, checked against
+    # the exact definitions (1 ft = 0.3048 m, 1 fl oz = 29.5735295625 ml)
+    def check():
+        corrected = [
+            (Volume.ftCu,  'ft^3', 0.3048 ** 3),
+            (Volume.ydCu,  'yd^3', 0.9144 ** 3),
+            (Volume.ozfl,  'ozfl', 29.5735295625e-6),
+            (VolFlowRate.cfm, 'cfm', 0.3048 ** 3 / 60.0),
+            (VolFlowRate.cfh, 'cfh', 0.3048 ** 3 / 3600.0),
+            (Power.MW, 'MW', 1.0e6),
+            (Power.GW, 'GW', 1.0e9),
+            (Inductance.microHenry, 'µH', 1.0e-6),
+        ]
+        for unit, symbol, factor in corrected:
+            assert unit.Symbol == symbol, (unit, symbol)
+            assert math.isclose(unit.Factor.SIValue, factor, rel_tol=1.0e-12), (unit, factor)
+
+    check()
+
     # Dimension handles exponents
     # Quantity contains float and Dimension
     # Unit is (derived from) Quantity with symbol string and offset (pressure and temperature)
@@ -391,7 +673,7 @@ if __name__ == '__main__':
         print(f'd3 = {d3.Format(uft, "0.3f")}')
         print(f'd3 = {d3.Format(uyd, "0.4f")}')
 
-        q1 = 3.0 / squared()
+        q1 = 3.0 / um.squared()
         print(q1)
 
     main()
\ No newline at end of file
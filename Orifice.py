@@ -50,6 +50,13 @@ def OrificeDiaSteam(mdot, cd, p1, p2):
 
     return dia
 
+def OrificeP2Steam(mdot, dia, cd, p1):
+    # flow is not proportional to any power of p2, so solve for it; the root is nan
+    # when mdot is more than the orifice passes at critical flow
+    solution = um.Solve(lambda p2: OrificeSteamFlow(dia, cd, p1, p2), mdot, 0.0 * un.Pressure.psia, p1)
+
+    return solution.Root
+
 def OrificeWaterFlow(dia, cd, p1, p2, t1):
     water = h2o.WaterIAPWS97()
     fp = water.SetSaturation(h2o.SatType.SatTemp).SetQuality(0.0).SetCond(temp=t1).Eval()
@@ -1,5 +1,6 @@
 # Reference ASME B1.1-2003 Appendix B for the thread strength design formulas.
 
+import bisect
 import math
 
 class ThreadUN:
@@ -309,14 +310,17 @@ class ThreadM:
     table2_catS = [0.5, 0.6, 0.7, 0.5, 0.6, 0.8, 1.0, 1.3, 1.0, 1.5, 1.7, 2.0, 2.2, 2.5, 2.4, 3.0,  4.0,  5.0,  3.8,  4.5,  5.6,  6.0,  8.0, 10.0,  4.0,  6.3,  8.5, 12.0, 15.0, 18.0, 21.0,  7.5,  9.5, 15.0, 19.0, 24.0, 28.0, 32.0, 12.0, 18.0, 24.0,  36.0,  45.0, 20.0, 26.0,  40.0,  50.0]
     table2_catL = [1.4, 1.7, 2.0, 1.5, 1.9, 2.6, 3.0, 3.8, 3.0, 4.5, 5.0, 6.0, 6.7, 7.5, 7.1, 9.0, 12.0, 15.0, 11.0, 13.0, 16.0, 18.0, 24.0, 30.0, 12.0, 19.0, 25.0, 36.0, 45.0, 53.0, 63.0, 22.0, 28.0, 45.0, 56.0, 71.0, 85.0, 95.0, 36.0, 53.0, 71.0, 106.0, 132.0, 60.0, 80.0, 118.0, 150.0]
 
+    # index of the basic diameter range 'dia' falls in, -1 above the last range
+    def basic_dia_range(dia):
+        loc = bisect.bisect_right(ThreadM.basic_dia_list, dia)
+        if (loc == len(ThreadM.basic_dia_list)):
+            return -1
+        return loc
+
     def thread_engagement_cat(dia, pitch, le):
         if (dia < 0.99):
             return math.nan
-        loc = -1
-        for i in range(len(ThreadM.basic_dia_list)):
-            if (dia < ThreadM.basic_dia_list[i]):
-                loc = i
-                break
+        loc = ThreadM.basic_dia_range(dia)
         if (loc == -1):
             return math.nan
         
@@ -334,15 +338,11 @@ class ThreadM:
     def thread_engagement_normal(dia, pitch):
         if (dia < 0.99):
             return math.nan
-        loc = -1
-        for i in range(len(ThreadM.basic_dia_list)):
-            if (dia < ThreadM.basic_dia_list[i]):
-                loc = i
-                break
+        loc = ThreadM.basic_dia_range(dia)
         if (loc == -1):
             return math.nan
         
-        i_p = [i, pitch]
+        i_p = [loc, pitch]
         row = ThreadM.dia_pitch_list.index(i_p)
 
         #calculate the midpoint of the normal range
@@ -398,11 +398,7 @@ class ThreadM:
     def TD2(dia, pitch, tol_class):
         if (dia < 0.99):
             return math.nan
-        loc = -1
-        for i in range(len(ThreadM.basic_dia_list)):
-            if (dia < ThreadM.basic_dia_list[i]):
-                loc = i
-                break
+        loc = ThreadM.basic_dia_range(dia)
         if (loc == -1):
             return math.nan
         
@@ -434,11 +430,7 @@ class ThreadM:
     def Td2(dia, pitch, tol_class):
         if (dia < 0.99):
             return math.nan
-        loc = -1
-        for i in range(len(ThreadM.basic_dia_list)):
-            if (dia < ThreadM.basic_dia_list[i]):
-                loc = i
-                break
+        loc = ThreadM.basic_dia_range(dia)
         if (loc == -1):
             return math.nan
 
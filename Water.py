@@ -45,6 +45,62 @@ class Region:
 		return self.Properties
 		
 
+# Array evaluation of the IAPWS-97 power series
+# Each region's Gibbs free energy is a sum of n * x**I * y**J terms.  For
+# arrays of states the coefficient table is held as arrays (I, J, n) and the
+# powers x**I and y**J are computed once per chunk of states, as a
+# (states x terms) matrix; the series and its first and second derivatives
+# are then matrix-vector products over the same powers.  States are taken
+# 'chunk' at a time so the matrices stay in cache on large grids.
+
+def CoeffArrays(tbl):
+	# (I, J, n) arrays of the table rows after the unused row 0
+	I = np.array([c.I for c in tbl[1:]], dtype=np.float64)
+	J = np.array([c.J for c in tbl[1:]], dtype=np.float64)
+	n = np.array([c.n for c in tbl[1:]], dtype=np.float64)
+	return I, J, n
+
+
+def PowerSeries(x, y, coeff, chunk : int = 2048):
+	# g = sum(n * x**I * y**J) and its derivatives g_x, g_xx, g_y, g_yy, g_xy
+	# for 1-D arrays x and y
+	I, J, n = coeff
+	nI = n * I
+	nII = nI * (I - 1.0)
+	nJ = n * J
+	nJJ = nJ * (J - 1.0)
+	nIJ = nI * J
+
+	result = [np.empty(x.size) for k in range(6)]
+	for start in range(0, x.size, chunk):
+		xs = x[start:start + chunk, np.newaxis]
+		ys = y[start:start + chunk, np.newaxis]
+
+		xI = xs ** I
+		xI1 = xI / xs
+		xI2 = xI1 / xs
+		yJ = ys ** J
+		yJ1 = yJ / ys
+		yJ2 = yJ1 / ys
+
+		block = slice(start, start + chunk)
+		result[0][block] = (xI * yJ) @ n
+		result[1][block] = (xI1 * yJ) @ nI
+		result[2][block] = (xI2 * yJ) @ nII
+		result[3][block] = (xI * yJ1) @ nJ
+		result[4][block] = (xI * yJ2) @ nJJ
+		result[5][block] = (xI1 * yJ1) @ nIJ
+	return result
+
+
+def StateArrays(press: un.Quantity, temp: un.Quantity):
+	# broadcast p [MPa] and T [K] to flat arrays; also returns the shape
+	p = np.asarray(press.Value(un.Pressure.MPa), dtype=np.float64)
+	t = np.asarray(temp.Value(un.Temperature.degK), dtype=np.float64)
+	p, t = np.broadcast_arrays(p, t)
+	return p.ravel(), t.ravel(), p.shape
+
+
 class Boundary4:
 	tbl34 = []
 	tbl34.append(EqnCoeff(0, 0,  0.0000000000000E+00))
@@ -211,6 +267,8 @@ class Region1(Region):
 	tbl2.append(EqnCoeff(31,   -40,	 0.18228094581404e-23))
 	tbl2.append(EqnCoeff(32,   -41,	-0.93537087292458e-25))
 
+	coeff = CoeffArrays(tbl2)
+
 	def __init__(self):
 		Region.__init__(self)
 
@@ -269,6 +327,28 @@ class Region1(Region):
 			gammaTauTau += n * (pp ** I) * J * (J - 1) * (tt ** (J - 2))
 			gammaPiTau += -n * I * (pp ** (I - 1)) * J * (tt ** (J - 1))
 
+		return self.SetProperties(press, temp, pi, tau, gamma, gammaPi, gammaPiPi, gammaTau, gammaTauTau, gammaPiTau)
+
+	# press and temp are Quantities or QuantityArrays; the properties are
+	# QuantityArrays with the broadcast shape of press and temp
+	def EvalArray(self, press: un.Quantity, temp: un.Quantity, chunk : int = 2048):
+		pStar = 16.53
+		tStar = 1386.0
+
+		p, t, shape = StateArrays(press, temp)
+
+		pi = p / pStar
+		tau = tStar / t
+
+		# the series is in pp = 7.1 - pi, so its pi derivatives change sign
+		g, gx, gxx, gy, gyy, gxy = PowerSeries(7.1 - pi, tau - 1.222, Region1.coeff, chunk)
+
+		pi = pi.reshape(shape)
+		tau = tau.reshape(shape)
+		return self.SetProperties(press, temp, pi, tau, g.reshape(shape), -gx.reshape(shape), gxx.reshape(shape),
+								  gy.reshape(shape), gyy.reshape(shape), -gxy.reshape(shape))
+
+	def SetProperties(self, press, temp, pi, tau, gamma, gammaPi, gammaPiPi, gammaTau, gammaTauTau, gammaPiTau):
 		Rc = WaterIAPWS97.Rc
 
 		self.Properties.Press = press
@@ -353,6 +433,9 @@ class Region2(Region):
 	tbl11.append(EqnCoeff(24, 40,  5.5414715350778E-17))
 	tbl11.append(EqnCoeff(24, 58, -9.4369707241210E-07))
 
+	coeff10 = CoeffArrays(tbl10)
+	coeff11 = CoeffArrays(tbl11)
+
 	def __init__(self):
 		Region.__init__(self)
 
@@ -432,6 +515,35 @@ class Region2(Region):
 			gammaRtautau += n * (pi ** I) * J * (J-1) * (tt ** (J-2))
 			gammaRpitau += n * I * (pi ** (I-1)) * J * (tt ** (J-1))
 
+		return self.SetProperties(press, temp, pi, tau, gammaO, gammaOpi, gammaOpipi, gammaOtau, gammaOtautau, gammaOpitau,
+								  gammaR, gammaRpi, gammaRpipi, gammaRtau, gammaRtautau, gammaRpitau)
+
+	# press and temp are Quantities or QuantityArrays; the properties are
+	# QuantityArrays with the broadcast shape of press and temp
+	def EvalArray(self, press: un.Quantity, temp: un.Quantity, chunk : int = 2048):
+		pStar = 1.0
+		tStar = 540.0
+
+		p, t, shape = StateArrays(press, temp)
+
+		pi = p / pStar
+		tau = tStar / t
+
+		# ideal-gas part, equation 16: the tbl10 series in tau, plus ln(pi)
+		gO, gOpi, gOpipi, gOtau, gOtautau, gOpitau = PowerSeries(pi, tau, Region2.coeff10, chunk)
+		gO += np.log(pi)
+		gOpi = 1.0 / pi
+		gOpipi = -1.0 / (pi ** 2)
+
+		# residual part, equation 17: the tbl11 series in pi and tau - 0.5
+		gR, gRpi, gRpipi, gRtau, gRtautau, gRpitau = PowerSeries(pi, tau - 0.5, Region2.coeff11, chunk)
+
+		parts = [x.reshape(shape) for x in (pi, tau, gO, gOpi, gOpipi, gOtau, gOtautau, gOpitau,
+											gR, gRpi, gRpipi, gRtau, gRtautau, gRpitau)]
+		return self.SetProperties(press, temp, *parts)
+
+	def SetProperties(self, press, temp, pi, tau, gammaO, gammaOpi, gammaOpipi, gammaOtau, gammaOtautau, gammaOpitau,
+					  gammaR, gammaRpi, gammaRpipi, gammaRtau, gammaRtautau, gammaRpitau):
 		gamma = gammaO + gammaR
 		gammaPi = gammaOpi + gammaRpi
 		gammaPiPi = gammaOpipi + gammaRpipi
@@ -559,3 +671,44 @@ class WaterIAPWS97:
 
 def MixValues(quality, liq : un.Quantity, vap : un.Quantity):
 	return (vap * quality) + (liq * (1.0 - quality))
+
+
+if __name__ == '__main__':
+	# IAPWS-IF97 verification values: (T [K], p [MPa]) -> v [m^3/kg], h [kJ/kg],
+	# u [kJ/kg], s [kJ/kg K], cp [kJ/kg K], w [m/s], to 9 significant digits
+	props = ('SpVol', 'SpEnthalpy', 'SpIntEnergy', 'SpEntropy', 'SpHeatCp', 'AcousticVel')
+	units = (un.SpVolume.m3_kg, un.SpEnergy.kJ_kg, un.SpEnergy.kJ_kg, un.SpHeatCap.kJ_kgK, un.SpHeatCap.kJ_kgK, un.Velocity.mps)
+
+	# Table 5, Region 1
+	table5 = [
+		(300.0,  3.0, (0.100215168e-2, 0.115331273e3, 0.112324818e3, 0.392294792, 0.417301218e1, 0.150773921e4)),
+		(300.0, 80.0, (0.971180894e-3, 0.184142828e3, 0.106448356e3, 0.368563852, 0.401008987e1, 0.163469054e4)),
+		(500.0,  3.0, (0.120241800e-2, 0.975542239e3, 0.971934985e3, 0.258041912e1, 0.465580682e1, 0.124071337e4)),
+	]
+
+	# Table 15, Region 2
+	table15 = [
+		(300.0, 0.0035, (0.394913866e2, 0.254991145e4, 0.241169160e4, 0.852238967e1, 0.191300162e1, 0.427920172e3)),
+		(700.0, 0.0035, (0.923015898e2, 0.333568375e4, 0.301262819e4, 0.101749996e2, 0.208141274e1, 0.644289068e3)),
+		(700.0, 30.0,   (0.542946619e-2, 0.263149474e4, 0.246861076e4, 0.517540298e1, 0.103505092e2, 0.480386523e3)),
+	]
+
+	# each point through Eval(), against the table, and all points at once
+	# through EvalArray(), against Eval()
+	def check(region, table):
+		temps = np.array([t for t, p, values in table])
+		presss = np.array([p for t, p, values in table])
+		states = region().EvalArray(presss * un.Pressure.MPa, temps * un.Temperature.degK)
+		for k, (t, p, values) in enumerate(table):
+			state = region().Eval(p * un.Pressure.MPa, t * un.Temperature.degK)
+			for prop, unit, expected in zip(props, units, values):
+				value = getattr(state, prop).Value(unit)
+				assert abs(value / expected - 1.0) < 1.0e-8, (region.__name__, t, p, prop, value, expected)
+			for prop in props + ('SpHeatCv',):
+				scalar = getattr(state, prop).Value()
+				array = getattr(states, prop).Value()[k]
+				assert abs(array / scalar - 1.0) < 1.0e-12, (region.__name__, t, p, prop, array, scalar)
+
+	check(Region1, table5)
+	check(Region2, table15)
+	print('IAPWS-IF97 verification values reproduced')
@@ -1,7 +1,13 @@
 import numpy as np
 from enum import Enum
+import functools
 
+import bisect
 import cmath
+import contextlib
+import contextvars
+import fractions
+import math
 
 class BaseQuantity(Enum):
     Mass = 0
@@ -23,34 +29,102 @@ class Quantity:
 class Unit:
     pass
 
+class QuantityArray:
+    pass
+
+class Expression:
+    pass
+
+class CompiledExpression:
+    pass
+
+class DualQuantity:
+    pass
+
+class ConversionMatrix:
+    pass
+
+class UnitSystem:
+    pass
+
 class Dimension:
     symbol = ['kg', 'm', 's', 'A', 'K', 'mol', 'cd', '$']
 
-    def __init__(self, other):
-        self._exp = np.zeros(BaseQuantity._Count.value, dtype=np.int8)
+    # The exponents are packed into a single integer, one 8 bit field per
+    # BaseQuantity.  Each field holds (exponent + 64) in its low 7 bits, so
+    # exponents range from -64 to 63, and the high bit of each field is a
+    # guard bit that is set when a multiply or divide overflows the field.
+    # Multiplying dimensions adds the codes and dividing subtracts them.
+    _bits = 8
+    _bias = 64
+    _field = (1 << _bits) - 1
+    _bias_all = 0x4040404040404040   # _bias in each of the 8 fields
+    _guard_all = 0x8080808080808080  # guard bit of each of the 8 fields
+
+    # Dimensions are interned: each exponent vector maps to exactly one
+    # Dimension object.  Equality is an identity test, Dimensions can key
+    # dicts, and powers are memoized.
+    _interned = dict()
+    _powers = dict()
+
+    def __new__(cls, other):
+        exp = [0] * BaseQuantity._Count.value
 
         if type(other) == Dimension:
-            self._exp = other._exp
+            return other
         elif type(other) == np.ndarray:
             if len(other) == BaseQuantity._Count.value:
-                self._exp = other
+                exp = [int(x) for x in other]
         elif type(other) == list:
             if len(other) == BaseQuantity._Count.value:
-                for d in range(BaseQuantity._Count.value):
-                    self._exp[d] = other[d]        
+                exp = [int(x) for x in other]
         else:
             raise TypeError("Invalid argument: %s " % other)
-            return NotImplemented
+
+        code = 0
+        for d in range(BaseQuantity._Count.value):
+            if exp[d] < -cls._bias or exp[d] >= cls._bias:
+                raise ValueError("Dimension exponent out of range: %s " % exp[d])
+            code |= (exp[d] + cls._bias) << (cls._bits * d)
+        return cls.FromCode(code)
+
+    @classmethod
+    def FromCode(cls, code : int) -> Dimension:
+        dim = cls._interned.get(code)
+        if dim is None:
+            if code < 0 or (code & cls._guard_all):
+                raise ValueError("Dimension exponent out of range")
+            dim = object.__new__(cls)
+            dim._code = code
+            cls._interned[code] = dim
+        return dim
+
+    # re-intern on unpickling/copying instead of creating a duplicate object
+    def __reduce__(self):
+        return (Dimension, (list(self.Exponents),))
+
+    @property
+    def Code(self) -> int:
+        return self._code
+
+    @property
+    def Exponents(self) -> tuple:
+        code = self._code
+        exp = []
+        for d in range(BaseQuantity._Count.value):
+            exp.append(((code >> (Dimension._bits * d)) & Dimension._field) - Dimension._bias)
+        return tuple(exp)
             
     def __repr__(self):
-        return f'Dimension({self._exp}'
+        return f'Dimension({list(self.Exponents)})'
 
     def __str__(self):
         sep = '*'
         result = ''
+        exp = self.Exponents
         # scan thru the list to add exponents in the numerator
         for d in range(BaseQuantity._Count.value):
-            xp = self._exp[d]
+            xp = exp[d]
             if xp <= 0:
                 continue
             result += Dimension.symbol[d]
@@ -66,7 +140,7 @@ class Dimension:
         
         # scan thru the list to add exponents in the denominator
         for d in range(BaseQuantity._Count.value):
-            xp = self._exp[d]
+            xp = exp[d]
             if xp >= 0:
                 continue
             result += Dimension.symbol[d]
@@ -87,28 +161,40 @@ class Dimension:
         return True
 
     def __eq__(self, other) -> bool:
+        if self is other:
+            return True
         if not isinstance(other, Dimension):
             raise TypeError("Unable to convert %s to Dimension" % other)
             return NotImplemented
 
-        return (self._exp == other._exp).all()
+        return False
             
     def __ne__(self, other) -> bool:
         return not (self == other)
 
+    __hash__ = object.__hash__
+
     def __mul__(self, other) -> Dimension:
         if not isinstance(other, Dimension):
             raise TypeError("Unable to convert %s to Dimension" % other)
             return NotImplemented
 
-        return Dimension(self._exp + other._exp)
+        code = self._code + other._code - Dimension._bias_all
+        result = Dimension._interned.get(code)
+        if result is None:
+            result = Dimension.FromCode(code)
+        return result
         
     def __truediv__(self, other) -> Dimension:
         if not isinstance(other, Dimension):
             raise TypeError("Unable to convert %s to Dimension" % other)
             return NotImplemented
 
-        return Dimension(self._exp - other._exp)
+        code = self._code - other._code + Dimension._bias_all
+        result = Dimension._interned.get(code)
+        if result is None:
+            result = Dimension.FromCode(code)
+        return result
 
     # raises each exponent to the 'numer/denom' power.  'numer' and 'denom' must
     # be integers and the result of the exponentiation must be an integer.
@@ -121,14 +207,18 @@ class Dimension:
             raise TypeError("Only integer exponents are supported")
             return NotImplemented
 
-        _result = self._exp * numer
-        if denom != 1:
-            if any(_result % denom):
-                raise TypeError("not supported: pow() arguments would result in non-integer exponents")        
-            else:
-                _result = _result // denom
-
-        return Dimension(_result)
+        result = Dimension._powers.get((self, numer, denom))
+        if result is None:
+            _result = [xp * numer for xp in self.Exponents]
+            if denom != 1:
+                if any(xp % denom for xp in _result):
+                    raise TypeError("not supported: pow() arguments would result in non-integer exponents")        
+                else:
+                    _result = [xp // denom for xp in _result]
+
+            result = Dimension(_result)
+            Dimension._powers[(self, numer, denom)] = result
+        return result
 
     def sqrt(self) -> Dimension:
         return self.power(1, 2)
@@ -153,6 +243,11 @@ Currency_dimension          = Dimension([0, 0, 0, 0, 0, 0, 0, 1])
 
 
 class Quantity:
+    # Quantities are small, effectively immutable value objects: __slots__
+    # keeps the per-object footprint to the two references below, and the
+    # operators build results through _NewQuantity() rather than __init__.
+    __slots__ = ('_val', '_dimension')
+
     def __init__(self, qty = None):
         if qty is None:
             self._val = np.nan
@@ -172,15 +267,21 @@ class Quantity:
 
     @classmethod
     def Create(cls, val : float, dimension : Dimension) -> Quantity:
-        qty = Quantity()
-        qty._val = val
-        qty._dimension = dimension
-        return qty
+        return _NewQuantity(val, dimension)
 
 
     BaseTypeName = 'Quantity'
 
 
+    # NumPy protocols, see _ArrayUfunc() and _ArrayFunction()
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        return _ArrayUfunc(ufunc, method, inputs, kwargs)
+
+
+    def __array_function__(self, func, types, args, kwargs):
+        return _ArrayFunction(func, args, kwargs)
+
+
     @property
     def SIValue(self) -> float:
         return self._val
@@ -213,13 +314,12 @@ class Quantity:
         return self.Format(unit)
 
 
+    # Dimensions are interned, so similarity is a single identity test
     def Similar(self, other) -> bool:
-        if other.BaseTypeName == Quantity.BaseTypeName:
-            return self.Dimension == other.Dimension
-        if other.BaseTypeName == Unit.BaseTypeName:
-           return self.Dimension == other.Dimension
-        if other.BaseTypeName == Dimension.BaseTypeName:
-           return self.Dimension == other
+        if isinstance(other, _Dimensioned):
+            return self._dimension is other._dimension
+        if type(other) is Dimension:
+            return self._dimension is other
             
         raise TypeError("Argument type not supported: %s " % other)
 
@@ -233,6 +333,8 @@ class Quantity:
 
 
     def __gt__(self, other) -> bool:
+        if type(other) is Quantity and (self._dimension is other._dimension or _unchecked_mode.get()):
+            return self._val > other._val
         if self.Similar(other):
             if self._val > other._val:
                 return True
@@ -241,6 +343,8 @@ class Quantity:
 
 
     def __ge__(self, other) -> bool:
+        if type(other) is Quantity and (self._dimension is other._dimension or _unchecked_mode.get()):
+            return self._val >= other._val
         if self.Similar(other):
             if self._val >= other._val:
                 return True
@@ -249,6 +353,8 @@ class Quantity:
 
 
     def __lt__(self, other) -> bool:
+        if type(other) is Quantity and (self._dimension is other._dimension or _unchecked_mode.get()):
+            return self._val < other._val
         if self.Similar(other):
             if self._val < other._val:
                 return True
@@ -257,6 +363,8 @@ class Quantity:
 
 
     def __le__(self, other) -> bool:
+        if type(other) is Quantity and (self._dimension is other._dimension or _unchecked_mode.get()):
+            return self._val <= other._val
         if self.Similar(other):
             if self._val <= other._val:
                 return True
@@ -269,44 +377,77 @@ class Quantity:
 
 
     def __add__(self, other : Quantity) -> Quantity:
-        if other.BaseTypeName == Quantity.BaseTypeName:
-            if self.Similar(other):
-                return Quantity.Create(self._val + other._val, self._dimension)
-            else:
-                raise ValueError("Quantities must be dimensionally equal")
+        kind = _operand_kind[type(other)]
+        if kind == _QUANTITY:
+            if self._dimension is other._dimension or _unchecked_mode.get():
+                return _NewQuantity(self._val + other._val, self._dimension)
+            raise ValueError("Quantities must be dimensionally equal")
+        if kind == _ARRAY:
+            return other.__radd__(self)
+        if kind == _DEFER:
+            return NotImplemented
         raise TypeError("Unable to convert %s to Quantity" % other)
 
 
     def __radd__(self, other : Quantity) -> Quantity:
-        if other.BaseTypeName == Quantity.BaseTypeName:
-            if self._unit.Similar(other):
-                return Quantity.Create(self._val + other._val, self._dimension)
-            else:
-                raise ValueError("Quantities must be dimensionally equal")
+        kind = _operand_kind[type(other)]
+        if kind == _QUANTITY:
+            if self._dimension is other._dimension or _unchecked_mode.get():
+                return _NewQuantity(other._val + self._val, self._dimension)
+            raise ValueError("Quantities must be dimensionally equal")
+        if kind == _ARRAY:
+            return other.__add__(self)
+        if kind == _DEFER:
+            return NotImplemented
         raise TypeError("Unable to convert %s to Quantity" % other)
 
 
     def __sub__(self, other : Quantity) -> Quantity:
-        if other.BaseTypeName == Quantity.BaseTypeName:
-            if self.Similar(other):
-                return Quantity.Create(self._val - other._val, self._dimension)
-            else:
-                raise ValueError("Quantities must be dimensionally equal")
+        kind = _operand_kind[type(other)]
+        if kind == _QUANTITY:
+            if self._dimension is other._dimension or _unchecked_mode.get():
+                return _NewQuantity(self._val - other._val, self._dimension)
+            raise ValueError("Quantities must be dimensionally equal")
+        if kind == _ARRAY:
+            return other.__rsub__(self)
+        if kind == _DEFER:
+            return NotImplemented
+        raise TypeError("Unable to convert %s to Quantity" % other)
+
+
+    def __rsub__(self, other : Quantity) -> Quantity:
+        kind = _operand_kind[type(other)]
+        if kind == _QUANTITY:
+            if self._dimension is other._dimension or _unchecked_mode.get():
+                return _NewQuantity(other._val - self._val, self._dimension)
+            raise ValueError("Quantities must be dimensionally equal")
+        if kind == _ARRAY:
+            return other.__sub__(self)
+        if kind == _DEFER:
+            return NotImplemented
         raise TypeError("Unable to convert %s to Quantity" % other)
 
 
     def __mul__(self, other) -> Quantity:
-        if type(other) == float:
-            return Quantity.Create(self._val * other, self._dimension)
-        
-        if type(other) == np.double:
-            return Quantity.Create(self._val * other, self._dimension)
-        
-        if type(other) == int:
-            return Quantity.Create(self._val * float(other), self._dimension)
-        
-        if other.BaseTypeName == Quantity.BaseTypeName:
-            return Quantity.Create(self._val * other._val, self._dimension * other._dimension)
+        if type(other) is float:
+            return _NewQuantity(self._val * other, self._dimension)
+        kind = _operand_kind[type(other)]
+        if kind == _SCALAR:
+            return _NewQuantity(self._val * other, self._dimension)
+        if kind == _QUANTITY:
+            # an overflowed code is never interned, so it takes the checked Dimension product
+            dim = Dimension._interned.get(self._dimension._code + other._dimension._code - Dimension._bias_all)
+            if dim is None:
+                dim = self._dimension * other._dimension
+            return _NewQuantity(self._val * other._val, dim)
+        if kind == _NUMPY_SCALAR:
+            return _NewQuantity(self._val * float(other), self._dimension)
+        if kind == _ARRAY:
+            return other.__rmul__(self)
+        if kind == _VALUES:
+            return _NewQuantityArray(self._val * np.asarray(other, dtype=np.float64), self._dimension)
+        if kind == _DEFER:
+            return NotImplemented
         
         raise TypeError(f"***Unable to multiply type {type(other)} of {other} to Quantity")
             
@@ -316,29 +457,43 @@ class Quantity:
 
 
     def __truediv__(self, other) -> Quantity:
-        if type(other) == float:
-            return Quantity.Create(self._val / other, self._dimension)
-        
-        if type(other) == np.double:
-            return Quantity.Create(self._val / other, self._dimension)
-        
-        if type(other) == int:
-            return Quantity.Create(self._val / float(other), self._dimension)
-        
-        if other.BaseTypeName == Quantity.BaseTypeName:
-            return Quantity.Create(self._val / other._val, self._dimension / other._dimension)
+        if type(other) is float:
+            return _NewQuantity(self._val / other, self._dimension)
+        kind = _operand_kind[type(other)]
+        if kind == _SCALAR:
+            return _NewQuantity(self._val / other, self._dimension)
+        if kind == _QUANTITY:
+            dim = Dimension._interned.get(self._dimension._code - other._dimension._code + Dimension._bias_all)
+            if dim is None:
+                dim = self._dimension / other._dimension
+            return _NewQuantity(self._val / other._val, dim)
+        if kind == _NUMPY_SCALAR:
+            return _NewQuantity(self._val / float(other), self._dimension)
+        if kind == _ARRAY:
+            return other.__rtruediv__(self)
+        if kind == _VALUES:
+            return _NewQuantityArray(self._val / np.asarray(other, dtype=np.float64), self._dimension)
+        if kind == _DEFER:
+            return NotImplemented
         
         raise TypeError("Unable to divide Quantity by %s" % other)
 
 
     def __rtruediv__(self, other) -> Quantity:
+        kind = _operand_kind[type(other)]
+        if kind == _SCALAR:
+            return _NewQuantity(other / self._val, self._dimension.power(-1))
+        if kind == _NUMPY_SCALAR:
+            return _NewQuantity(float(other) / self._val, self._dimension.power(-1))
+        if kind == _VALUES:
+            return _NewQuantityArray(np.asarray(other, dtype=np.float64) / self._val, self._dimension.power(-1))
         return other * self.power(-1)
 
 
     def power(self, numer, denom = 1) -> Quantity:
         v = pow(self._val, numer / denom)
         d = self._dimension.power(int(numer), int(denom))
-        return Quantity.Create(v, d)
+        return _NewQuantity(v, d)
 
 
     def sqrt(self) -> Quantity:
@@ -367,18 +522,589 @@ class Quantity:
             else:
                 return f'{self._val}:{format_spec} {self.Dimension}'
 
-        if not self.Similar(unit.Factor):
+        if unit._dimension is not self._dimension and not _unchecked_mode.get():
             raise ValueError(f'invalid unit conversion: {unit.Symbol}')
 
+        value = (self._val - unit._offset) / unit._val
         if len(format_spec) == 0:
-            result = f'{self.Value(unit)} {unit.Symbol}'
+            result = f'{value} {unit._symbol}'
         else:
-            xxx = self.Value(unit)
-            result = f'{xxx:{format_spec}} {unit.Symbol}'
-            #result = f'{self.Value(unit):{format_spec}} {unit.Symbol}'
+            result = f'{value:{format_spec}} {unit._symbol}'
         return result
 
+class QuantityArray:
+    # A contiguous float64 array of SI values that share a single Dimension.
+    # QuantityArray mirrors the Quantity interface so array workloads can run
+    # at NumPy speed instead of looping over individual Quantity objects.
+    # qa = np.array([1.0, 2.0, 3.0]) * Unit
+    __slots__ = ('_val', '_dimension')
+
+    def __init__(self, qtys = None):
+        if qtys is None:
+            self._val = np.empty(0, dtype=np.float64)
+            self._dimension = None
+        elif type(qtys) == QuantityArray:
+            self._val = qtys._val
+            self._dimension = qtys._dimension
+        elif type(qtys) == np.ndarray:
+            self._val = np.ascontiguousarray(qtys, dtype=np.float64)
+            self._dimension = Dimensionless
+        elif type(qtys) == list or type(qtys) == tuple:
+            if len(qtys) > 0 and isinstance(qtys[0], Quantity):
+                dimension = qtys[0].Dimension
+                for qty in qtys:
+                    if not qty.Similar(dimension):
+                        raise ValueError("Quantities must be dimensionally equal")
+                self._val = np.array([qty.SIValue for qty in qtys], dtype=np.float64)
+                self._dimension = dimension
+            else:
+                self._val = np.array(qtys, dtype=np.float64)
+                self._dimension = Dimensionless
+        else:
+            raise TypeError("Invalid QuantityArray argument: %s " % qtys)
+
+
+    @classmethod
+    def Create(cls, val, dimension : Dimension) -> QuantityArray:
+        return _NewQuantityArray(np.ascontiguousarray(val, dtype=np.float64), dimension)
+
+
+    BaseTypeName = 'QuantityArray'
+
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        return _ArrayUfunc(ufunc, method, inputs, kwargs)
+
+
+    def __array_function__(self, func, types, args, kwargs):
+        return _ArrayFunction(func, args, kwargs)
+
+
+    @property
+    def SIValue(self) -> np.ndarray:
+        return self._val
+
+
+    @property
+    def SIValueStr(self) -> str:
+        return f'{self._val} {self.Dimension}'
+
+
+    @property
+    def HasDimension(self) -> bool:
+        return True
+
+
+    @property
+    def Dimension(self) -> Dimension:
+        return self._dimension
+
+
+    @property
+    def shape(self) -> tuple:
+        return self._val.shape
+
+
+    def __len__(self) -> int:
+        return len(self._val)
+
+
+    def __getitem__(self, index):
+        val = self._val[index]
+        if np.ndim(val) == 0:
+            return _NewQuantity(float(val), self._dimension)
+        return QuantityArray.Create(val, self._dimension)
+
+
+    def __iter__(self):
+        for val in self._val:
+            yield _NewQuantity(float(val), self._dimension)
+
+
+    def __repr__(self) -> str:
+        return f'QuantityArray({self._val}, Dim({self._dimension})'
+
+
+    def __str__(self) -> str:
+        return f'{self._val} {self._dimension}'
+
+
+    def __call__(self, unit: Unit) -> str:
+        return self.Format(unit)
+
+
+    # Dimensions are interned, so similarity is a single identity test
+    def Similar(self, other) -> bool:
+        if isinstance(other, _Dimensioned):
+            return self._dimension is other._dimension
+        if type(other) is Dimension:
+            return self._dimension is other
+            
+        raise TypeError("Argument type not supported: %s " % other)
+
+
+    # comparisons are element-wise and return boolean arrays
+    def __eq__(self, other) -> np.ndarray:
+        if self.Similar(other):
+            return self._val == other._val
+        return np.zeros(self._val.shape, dtype=bool)
+
+
+    def __gt__(self, other) -> np.ndarray:
+        if self.Similar(other):
+            return self._val > other._val
+        return np.zeros(self._val.shape, dtype=bool)
+
+
+    def __ge__(self, other) -> np.ndarray:
+        if self.Similar(other):
+            return self._val >= other._val
+        return np.zeros(self._val.shape, dtype=bool)
+
+
+    def __lt__(self, other) -> np.ndarray:
+        if self.Similar(other):
+            return self._val < other._val
+        return np.zeros(self._val.shape, dtype=bool)
+
+
+    def __le__(self, other) -> np.ndarray:
+        if self.Similar(other):
+            return self._val <= other._val
+        return np.zeros(self._val.shape, dtype=bool)
+
+
+    def __ne__(self, other) -> np.ndarray:
+        return np.logical_not(self == other)
+
+
+    def __add__(self, other) -> QuantityArray:
+        kind = _operand_kind[type(other)]
+        if kind == _QUANTITY or kind == _ARRAY:
+            if self._dimension is other._dimension:
+                return _NewQuantityArray(self._val + other._val, self._dimension)
+            raise ValueError("Quantities must be dimensionally equal")
+        if kind == _DEFER:
+            return NotImplemented
+        raise TypeError("Unable to convert %s to Quantity" % other)
+
+
+    def __radd__(self, other) -> QuantityArray:
+        kind = _operand_kind[type(other)]
+        if kind == _QUANTITY or kind == _ARRAY:
+            if self._dimension is other._dimension:
+                return _NewQuantityArray(other._val + self._val, self._dimension)
+            raise ValueError("Quantities must be dimensionally equal")
+        if kind == _DEFER:
+            return NotImplemented
+        raise TypeError("Unable to convert %s to Quantity" % other)
+
+
+    def __sub__(self, other) -> QuantityArray:
+        kind = _operand_kind[type(other)]
+        if kind == _QUANTITY or kind == _ARRAY:
+            if self._dimension is other._dimension:
+                return _NewQuantityArray(self._val - other._val, self._dimension)
+            raise ValueError("Quantities must be dimensionally equal")
+        if kind == _DEFER:
+            return NotImplemented
+        raise TypeError("Unable to convert %s to Quantity" % other)
+
+
+    def __rsub__(self, other) -> QuantityArray:
+        kind = _operand_kind[type(other)]
+        if kind == _QUANTITY or kind == _ARRAY:
+            if self._dimension is other._dimension:
+                return _NewQuantityArray(other._val - self._val, self._dimension)
+            raise ValueError("Quantities must be dimensionally equal")
+        if kind == _DEFER:
+            return NotImplemented
+        raise TypeError("Unable to convert %s to Quantity" % other)
+
+
+    def __mul__(self, other) -> QuantityArray:
+        kind = _operand_kind[type(other)]
+        if kind == _SCALAR or kind == _NUMPY_SCALAR:
+            return _NewQuantityArray(self._val * float(other), self._dimension)
+        if kind == _QUANTITY or kind == _ARRAY:
+            return _NewQuantityArray(self._val * other._val, self._dimension * other._dimension)
+        if kind == _VALUES:
+            return _NewQuantityArray(self._val * np.asarray(other, dtype=np.float64), self._dimension)
+
+        if kind == _DEFER:
+            return NotImplemented
+        raise TypeError(f"***Unable to multiply type {type(other)} of {other} to QuantityArray")
+
+
+    def __rmul__(self, other) -> QuantityArray:
+        return self.__mul__(other)
+
+
+    def __truediv__(self, other) -> QuantityArray:
+        kind = _operand_kind[type(other)]
+        if kind == _SCALAR or kind == _NUMPY_SCALAR:
+            return _NewQuantityArray(self._val / float(other), self._dimension)
+        if kind == _QUANTITY or kind == _ARRAY:
+            return _NewQuantityArray(self._val / other._val, self._dimension / other._dimension)
+        if kind == _VALUES:
+            return _NewQuantityArray(self._val / np.asarray(other, dtype=np.float64), self._dimension)
+
+        if kind == _DEFER:
+            return NotImplemented
+        raise TypeError("Unable to divide QuantityArray by %s" % other)
+
+
+    def __rtruediv__(self, other) -> QuantityArray:
+        kind = _operand_kind[type(other)]
+        if kind == _SCALAR or kind == _NUMPY_SCALAR:
+            return _NewQuantityArray(float(other) / self._val, self._dimension.power(-1))
+        if kind == _QUANTITY:
+            return _NewQuantityArray(other._val / self._val, other._dimension / self._dimension)
+        if kind == _VALUES:
+            return _NewQuantityArray(np.asarray(other, dtype=np.float64) / self._val, self._dimension.power(-1))
+        return other * self.power(-1)
+
+
+    def power(self, numer, denom = 1) -> QuantityArray:
+        v = self._val ** (numer / denom)
+        d = self._dimension.power(int(numer), int(denom))
+        return _NewQuantityArray(v, d)
+
+
+    def sqrt(self) -> QuantityArray:
+        return self.power(1, 2)
+
+
+    def squared(self) -> QuantityArray:
+        return self.power(2)
+
+
+    def cubed(self) -> QuantityArray:
+        return self.power(3)
+
+
+    def Value(self, unit : Unit = None) -> np.ndarray:
+        if (unit is None):
+            return self._val # base SI values
+        else:
+            return unit.Value(self)
+
+
+    def Format(self, unit : Unit = None, format_spec : str = '') -> str:
+        if (unit is None):
+            values = self._val
+            symbol = f'{self.Dimension}'
+        else:
+            if not self.Similar(unit):
+                raise ValueError(f'invalid unit conversion: {unit.Symbol}')
+            values = self.Value(unit)
+            symbol = unit.Symbol
+
+        if len(format_spec) == 0:
+            text = ', '.join(f'{v}' for v in values.tolist())
+        else:
+            text = ', '.join(f'{v:{format_spec}}' for v in values.tolist())
+        return f'[{text}] {symbol}'
+
+
+_new = object.__new__
+
+# fast internal constructors: no argument dispatch, the caller guarantees
+# that 'val' and 'dimension' are already of the right types
+def _NewQuantity(val, dimension : Dimension) -> Quantity:
+    qty = _new(Quantity)
+    qty._val = val
+    qty._dimension = dimension
+    return qty
+
+
+def _NewQuantityArray(val : np.ndarray, dimension : Dimension) -> QuantityArray:
+    qty = _new(QuantityArray)
+    qty._val = val
+    qty._dimension = dimension
+    return qty
+
+
+# Operand kinds for the arithmetic fast paths, keyed on the exact type of
+# the other operand.  Types not listed are classified on first use; any
+# NumPy scalar type (np.float32, np.int64, ...) is treated as a scalar.
+_SCALAR = 0
+_QUANTITY = 1
+_NUMPY_SCALAR = 2
+_ARRAY = 3          # QuantityArray
+_VALUES = 4         # ndarray or list of values
+_OTHER = 5
+_DEFER = 6          # Expression or DualQuantity, handled by its reflected operators
+
+class _OperandKinds(dict):
+    def __missing__(self, t):
+        if issubclass(t, np.generic) and issubclass(t, (np.number, np.bool_)):
+            kind = _NUMPY_SCALAR
+        elif t is not Unit and issubclass(t, (float, int)):
+            kind = _SCALAR
+        else:
+            kind = _OTHER
+        self[t] = kind
+        return kind
+
+_operand_kind = _OperandKinds({
+    float: _SCALAR,
+    int: _SCALAR,
+    Quantity: _QUANTITY,
+    QuantityArray: _ARRAY,
+    np.ndarray: _VALUES,
+    list: _VALUES,
+})
+
+_Dimensioned = (Quantity, QuantityArray)
+
+
+# NumPy protocols
+# np.sqrt(qa), np.maximum(q1, q2), np.sum(qa), np.interp(x, xp, fp) and
+# np.where(mask, qa, qb) run once over the SI values and carry the Dimension
+# through.  Plain numbers and ndarrays are dimensionless operands.  Scalar
+# results are Quantities, array results QuantityArrays, and comparisons and
+# index results are returned as plain NumPy values.
+
+def _Operand(x):
+    # (SI values, Dimension) of a ufunc or array function argument
+    if isinstance(x, _Dimensioned):
+        if type(x) is Unit and x._offset != 0.0:
+            raise ValueError(f'units with offsets can not be used in NumPy functions: {x.Symbol}')
+        return x._val, x._dimension
+    return x, Dimensionless
+
+
+def _Wrap(val, dimension : Dimension):
+    if np.ndim(val) == 0:
+        return _NewQuantity(float(val), dimension)
+    return _NewQuantityArray(np.ascontiguousarray(val, dtype=np.float64), dimension)
+
+
+def _EqualDimensions(dims) -> Dimension:
+    for d in dims[1:]:
+        if d is not dims[0]:
+            raise ValueError("Quantities must be dimensionally equal")
+    return dims[0]
+
+
+def _NoDimensions(dims) -> Dimension:
+    for d in dims:
+        if d is not Dimensionless:
+            raise ValueError("NumPy function requires dimensionless Quantities")
+    return Dimensionless
+
+
+def _RatioDimension(values, dims) -> Dimension:
+    # arctan2(y, x) of two lengths is an angle
+    _EqualDimensions(dims)
+    return Dimensionless
+
+
+def _PowerDimension(values, dims) -> Dimension:
+    if dims[1] is not Dimensionless or np.ndim(values[1]) != 0:
+        raise ValueError("the exponent of a Quantity must be a dimensionless scalar")
+    if dims[0] is Dimensionless:
+        return Dimensionless
+    exponent = fractions.Fraction(float(values[1])).limit_denominator(16)
+    if exponent != float(values[1]):
+        raise ValueError(f"not supported: Quantity raised to {values[1]}")
+    return dims[0].power(exponent.numerator, exponent.denominator)
+
+
+_same_dimension_ufuncs = (np.add, np.subtract, np.maximum, np.minimum, np.fmax, np.fmin,
+                          np.hypot, np.fmod, np.remainder, np.copysign,
+                          np.negative, np.positive, np.absolute, np.fabs,
+                          np.rint, np.floor, np.ceil, np.trunc, np.conjugate)
+
+_dimensionless_ufuncs = (np.exp, np.expm1, np.exp2, np.log, np.log10, np.log2, np.log1p,
+                         np.sin, np.cos, np.tan, np.arcsin, np.arccos, np.arctan,
+                         np.sinh, np.cosh, np.tanh, np.arcsinh, np.arccosh, np.arctanh,
+                         np.deg2rad, np.rad2deg)
+
+# ufunc -> rule(values, dims) returning the Dimension of the result
+_ufunc_dimensions = {
+    np.multiply: lambda values, dims: dims[0] * dims[1],
+    np.matmul: lambda values, dims: dims[0] * dims[1],
+    np.divide: lambda values, dims: dims[0] / dims[1],
+    np.reciprocal: lambda values, dims: dims[0].power(-1),
+    np.sqrt: lambda values, dims: dims[0].power(1, 2),
+    np.cbrt: lambda values, dims: dims[0].power(1, 3),
+    np.square: lambda values, dims: dims[0].power(2),
+    np.power: _PowerDimension,
+    np.float_power: _PowerDimension,
+    np.arctan2: _RatioDimension,
+}
+for _ufunc in _same_dimension_ufuncs:
+    _ufunc_dimensions[_ufunc] = lambda values, dims: _EqualDimensions(dims)
+for _ufunc in _dimensionless_ufuncs:
+    _ufunc_dimensions[_ufunc] = lambda values, dims: _NoDimensions(dims)
+
+# results are plain boolean or numeric arrays
+_comparison_ufuncs = (np.equal, np.not_equal, np.less, np.less_equal, np.greater, np.greater_equal)
+_plain_ufuncs = (np.isnan, np.isinf, np.isfinite, np.signbit, np.sign)
+
+
+# np.float64(2.0) * qty arrives here as a ufunc; the operators are faster
+_ufunc_operators = {
+    np.multiply: ('__mul__', '__rmul__'),
+    np.divide: ('__truediv__', '__rtruediv__'),
+}
+
+
+def _ArrayUfunc(ufunc, method, inputs, kwargs):
+    if 'out' in kwargs:
+        return NotImplemented
+
+    if method == '__call__' and len(kwargs) == 0:
+        operators = _ufunc_operators.get(ufunc)
+        if operators is not None:
+            a, b = inputs
+            if isinstance(a, _Dimensioned):
+                return getattr(a, operators[0])(b)
+            return getattr(b, operators[1])(a)
+
+    values = []
+    dims = []
+    for x in inputs:
+        v, d = _Operand(x)
+        values.append(v)
+        dims.append(d)
+
+    if ufunc in _comparison_ufuncs:
+        if method != '__call__':
+            return NotImplemented
+        if dims[0] is not dims[1]:
+            # same result as the comparison operators of dissimilar quantities
+            shape = np.broadcast_shapes(np.shape(values[0]), np.shape(values[1]))
+            return np.full(shape, ufunc is np.not_equal)
+        return ufunc(*values, **kwargs)
+
+    if ufunc in _plain_ufuncs:
+        return getattr(ufunc, method)(*values, **kwargs)
+
+    rule = _ufunc_dimensions.get(ufunc)
+    if rule is None:
+        return NotImplemented
+    if method == '__call__' or method == 'outer':
+        dimension = rule(values, dims)
+    elif (method == 'reduce' or method == 'accumulate') and ufunc in _same_dimension_ufuncs:
+        dimension = dims[0]
+    else:
+        return NotImplemented
+    return _Wrap(getattr(ufunc, method)(*values, **kwargs), dimension)
+
+
+# NumPy function -> implementation(func, *args, **kwargs)
+_array_functions = dict()
+
+def _Implements(*functions):
+    def register(implementation):
+        for func in functions:
+            _array_functions[func] = implementation
+        return implementation
+    return register
+
+
+def _ArrayFunction(func, args, kwargs):
+    implementation = _array_functions.get(func)
+    if implementation is None:
+        return NotImplemented
+    return implementation(func, *args, **kwargs)
+
+
+# functions of one array whose result has the Dimension of the array
+@_Implements(np.sum, np.mean, np.median, np.std, np.ptp, np.max, np.amax, np.min, np.amin,
+             np.nansum, np.nanmean, np.nanmax, np.nanmin, np.cumsum, np.diff, np.sort,
+             np.round, np.around, np.copy, np.ravel, np.reshape, np.transpose,
+             np.squeeze, np.atleast_1d)
+def _SameDimensionFunction(func, a, *args, **kwargs):
+    val, dim = _Operand(a)
+    return _Wrap(func(val, *args, **kwargs), dim)
+
+
+@_Implements(np.var)
+def _VarFunction(func, a, *args, **kwargs):
+    val, dim = _Operand(a)
+    return _Wrap(func(val, *args, **kwargs), dim.squared())
+
+
+# functions whose result is an index or a shape
+@_Implements(np.argmin, np.argmax, np.argsort, np.nonzero, np.shape, np.ndim, np.size)
+def _PlainFunction(func, a, *args, **kwargs):
+    return func(_Operand(a)[0], *args, **kwargs)
+
+
+@_Implements(np.concatenate, np.stack, np.hstack, np.vstack)
+def _JoinFunction(func, arrays, *args, **kwargs):
+    operands = [_Operand(a) for a in arrays]
+    dim = _EqualDimensions([d for v, d in operands])
+    return _Wrap(func([v for v, d in operands], *args, **kwargs), dim)
+
+
+@_Implements(np.clip)
+def _ClipFunction(func, a, a_min, a_max, *args, **kwargs):
+    operands = [_Operand(x) for x in (a, a_min, a_max)]
+    dim = _EqualDimensions([d for v, d in operands if v is not None])
+    return _Wrap(func(*[v for v, d in operands], *args, **kwargs), dim)
+
+
+@_Implements(np.where)
+def _WhereFunction(func, condition, *xy):
+    condition = _Operand(condition)[0]
+    if len(xy) == 0:
+        return func(condition)
+    (x, dx), (y, dy) = _Operand(xy[0]), _Operand(xy[1])
+    return _Wrap(func(condition, x, y), _EqualDimensions([dx, dy]))
+
+
+@_Implements(np.interp)
+def _InterpFunction(func, x, xp, fp, left = None, right = None, period = None):
+    (x, dx), (xp, dxp), (fp, dfp) = _Operand(x), _Operand(xp), _Operand(fp)
+    _EqualDimensions([dx, dxp])
+    if left is not None:
+        left, dl = _Operand(left)
+        _EqualDimensions([dfp, dl])
+    if right is not None:
+        right, dr = _Operand(right)
+        _EqualDimensions([dfp, dr])
+    if period is not None:
+        period, dp = _Operand(period)
+        _EqualDimensions([dx, dp])
+    return _Wrap(func(x, xp, fp, left, right, period), dfp)
+
+
+@_Implements(np.searchsorted)
+def _SearchSortedFunction(func, a, v, *args, **kwargs):
+    (a, da), (v, dv) = _Operand(a), _Operand(v)
+    _EqualDimensions([da, dv])
+    return func(a, v, *args, **kwargs)
+
+
+@_Implements(np.isclose, np.allclose)
+def _IsCloseFunction(func, a, b, rtol = 1.0e-05, atol = None, equal_nan = False):
+    # an atol Quantity must match a and b; a plain atol is in SI units
+    (a, da), (b, db) = _Operand(a), _Operand(b)
+    _EqualDimensions([da, db])
+    if atol is None:
+        atol = 0.0
+    else:
+        atol, dt = _Operand(atol)
+        if dt is not Dimensionless:
+            _EqualDimensions([da, dt])
+    return func(a, b, rtol=rtol, atol=atol, equal_nan=equal_nan)
+
+
+@_Implements(np.dot)
+def _DotFunction(func, a, b):
+    (a, da), (b, db) = _Operand(a), _Operand(b)
+    return _Wrap(func(a, b), da * db)
+
+
 class Unit(Quantity):
+    # A Unit stores its factor in the inherited _val/_dimension slots and its
+    # offset as a plain SI float; Factor and Offset build Quantities on demand.
+    __slots__ = ('_symbol', '_offset')
 
     def __init__(self, symbol : str, factor : Quantity, offset : Quantity = None):
         if factor.SIValue <= 0.0:
@@ -394,36 +1120,43 @@ class Unit(Quantity):
         else:
             self._symbol = symbol
         
-        self._factor = factor
+        self._val = factor.SIValue
+        self._dimension = factor.Dimension
         if offset is None:
-            self._offset = 0.0 * factor
+            self._offset = 0.0
         else:
-            self._offset = offset
+            self._offset = offset.SIValue
     
 
     @classmethod
     def Create(cls, symbol: str, dimension : Dimension, factor : float, offset : float = 0.0) -> Unit:
-        return Unit(symbol, Quantity.Create(factor, dimension), Quantity.Create(offset, dimension))
+        return Unit(symbol, _NewQuantity(factor, dimension), _NewQuantity(offset, dimension))
 
 
     def Value(self, qty : Quantity) -> float:
-        if (qty.Similar(self._factor)):
-            return (qty.SIValue - self._offset.SIValue) / self._factor.SIValue
+        if type(qty) is Quantity and (qty._dimension is self._dimension or _unchecked_mode.get()):
+            return (qty._val - self._offset) / self._val
+        if (qty.Similar(self)):
+            return (qty.SIValue - self._offset) / self._val
         else:
             raise ValueError(f'qty can not be expressed in {self._symbol} units')
 
 
     BaseTypeName = 'Unit'
 
+    # NumPy operators defer to Unit.__rmul__ so that offsets are applied:
+    # np.array([0.0, 150.0]) * psig
+    __array_ufunc__ = None
+
 
     @property
     def Factor(self) -> Quantity:
-        return self._factor
+        return _NewQuantity(self._val, self._dimension)
 
 
     @property
     def Offset(self) -> Quantity:
-        return self._offset
+        return _NewQuantity(self._offset, self._dimension)
 
 
     @property
@@ -438,14 +1171,14 @@ class Unit(Quantity):
 
     @property
     def Dimension(self) -> Dimension:
-        return self.Factor.Dimension
+        return self._dimension
 
 
     def __repr__(self):
-        if self._offset.SIValue == 0.0:
-            return f'Unit({self._symbol}, Dimension({self._factor.Dimension}), factor={self._factor.SIValue})'
+        if self._offset == 0.0:
+            return f'Unit({self._symbol}, Dimension({self._dimension}), factor={self._val})'
         else:
-            return f'Unit({self._symbol}, Dimension({self._factor.Dimension}), factor={self._factor.SIValue} offset={self._offset.SIValue})'
+            return f'Unit({self._symbol}, Dimension({self._dimension}), factor={self._val} offset={self._offset})'
 
 
     def __str__(self):
@@ -455,8 +1188,8 @@ class Unit(Quantity):
 
     def __eq__(self, other) -> bool:
         if type(other) == Unit:
-            if self.Factor == other.Factor:
-                if self.Offset == other.Offset:
+            if self._dimension == other._dimension:
+                if self._val == other._val and self._offset == other._offset:
                     return True
 
         return False
@@ -465,6 +1198,15 @@ class Unit(Quantity):
     # user_val = (base_val - offset) / factor) 
     # base_val = user_val * factor + offset
     def __mul__(self, other) -> Quantity:
+        if type(other) is float:
+            return _NewQuantity(other * self._val + self._offset, self._dimension)
+        kind = _operand_kind[type(other)]
+        if kind == _SCALAR:
+            return _NewQuantity(other * self._val + self._offset, self._dimension)
+        if kind == _NUMPY_SCALAR:
+            return _NewQuantity(float(other) * self._val + self._offset, self._dimension)
+        if kind == _DEFER:
+            return NotImplemented
         return other * self.Factor + self.Offset
             
 
@@ -473,42 +1215,42 @@ class Unit(Quantity):
             
 
     def __truediv__(self, other) -> Quantity:
-        if self._offset.SIValue == 0.0:
-            return self._factor / other
+        if self._offset == 0.0:
+            return self.Factor / other
         else:
             raise ValueError('division of Units with offsets is invalid')
 
 
     def __rtruediv__(self, other) -> Quantity:
-        if self._offset.SIValue == 0.0:
+        if self._offset == 0.0:
             return other / self.Factor
         else:
             raise ValueError('division by Units with offsets is invalid')
 
 
     def power(self, numer, denom = 1) -> Quantity:
-        if self._offset.SIValue == 0.0:
+        if self._offset == 0.0:
             return self.Factor.power(numer, denom)
         else:
             raise ValueError('power() is invalid with Units with offsets')
 
 
     def sqrt(self) -> Quantity:
-        if self._offset.SIValue == 0.0:
+        if self._offset == 0.0:
             return self.Factor.sqrt()
         else:
             raise ValueError('sqrt() is invalid with Units with offsets')
 
 
     def squared(self) -> Quantity:
-        if self._offset.SIValue == 0.0:
+        if self._offset == 0.0:
             return self.Factor.squared()
         else:
             raise ValueError('squared() is invalid with Units with offsets')
 
 
     def cubed(self) -> Quantity:
-        if self._offset.SIValue == 0.0:
+        if self._offset == 0.0:
             return self.Factor.cubed()
         else:
             raise ValueError('cubed() is invalid with Units with offsets')
@@ -646,7 +1388,1420 @@ class Unit(Quantity):
 # candela = Unit('cd', LuminousIntensity_dimension, 1.0)
 # dollar = Unit('$', Currency_dimension, 1.0)
 
+# Unchecked SI mode
+# For production runs of validated scripts:
+#   with Unchecked():
+#       S_act = B16_34_Bolted_Cover_Joint(...)
+# or SetUnchecked(True) for the rest of the current context.  Dimensions are
+# interned, so the checked fast paths above are already single identity
+# tests and there is nothing left to skip for speed: a validated script runs
+# at the same rate in either mode.  What the mode changes is the failure
+# path - a dimension mismatch in + - comparisons, Format() and Unit.Value()
+# uses the SI values as they are instead of raising.  The flag is a
+# ContextVar read only on that path, so it costs nothing when the dimensions
+# agree and each thread or asyncio task keeps its own setting.
+_unchecked_mode = contextvars.ContextVar('unit_of_measure_unchecked', default=False)
+
+
+def SetUnchecked(enabled : bool = True) -> bool:
+    # returns the previous setting so that callers can restore it
+    previous = _unchecked_mode.get()
+    _unchecked_mode.set(enabled)
+    return previous
+
+
+def IsUnchecked() -> bool:
+    return _unchecked_mode.get()
+
+
+@contextlib.contextmanager
+def Unchecked(enabled : bool = True):
+    token = _unchecked_mode.set(enabled)
+    try:
+        yield
+    finally:
+        _unchecked_mode.reset(token)
+
+
+# Unit-to-unit conversion plans
+# A conversion from one unit to another is an affine map on the user values:
+#   si_val = from_val * from_factor + from_offset
+#   to_val = (si_val - to_offset) / to_factor
+#          = from_val * scale + offset
+# so a plan is just (scale, offset), computed and dimension checked once.
+class UnitConverter:
+    __slots__ = ('_scale', '_offset', '_from_symbol', '_to_symbol')
+
+    def __init__(self, from_unit : Unit, to_unit : Unit):
+        if from_unit.Dimension is not to_unit.Dimension:
+            raise ValueError(f'{from_unit.Symbol} can not be expressed in {to_unit.Symbol} units')
+
+        self._scale = from_unit._val / to_unit._val
+        self._offset = (from_unit._offset - to_unit._offset) / to_unit._val
+        self._from_symbol = from_unit.Symbol
+        self._to_symbol = to_unit.Symbol
+
+
+    @property
+    def Scale(self) -> float:
+        return self._scale
+
+
+    @property
+    def Offset(self) -> float:
+        return self._offset
+
+
+    def __repr__(self) -> str:
+        return f'UnitConverter({self._from_symbol} -> {self._to_symbol}, scale={self._scale}, offset={self._offset})'
+
+
+    # values may be a float or an ndarray of values in from_unit
+    def __call__(self, values):
+        if type(values) is list:
+            values = np.asarray(values, dtype=np.float64)
+        if self._offset == 0.0:
+            return values * self._scale
+        return values * self._scale + self._offset
+
+
+# plans are cached on the numeric definition of the two units, and in front
+# of that on the identity of the two Unit objects.  An identity entry keeps
+# both Units alive so their ids can not be reused; the identity cache is
+# emptied when it reaches _converters_by_id_size entries, so Units made on
+# the fly (parse_unit, Unit.Create in a loop) are not held for good.
+_converters = dict()
+_converters_by_id = dict()
+_converters_by_id_size = 256
+
+def converter(from_unit : Unit, to_unit : Unit) -> UnitConverter:
+    entry = _converters_by_id.get((id(from_unit), id(to_unit)))
+    if entry is not None:
+        return entry[2]
+    key = (from_unit._val, from_unit._offset, from_unit._dimension,
+           to_unit._val, to_unit._offset, to_unit._dimension)
+    plan = _converters.get(key)
+    if plan is None:
+        plan = UnitConverter(from_unit, to_unit)
+        _converters[key] = plan
+    if len(_converters_by_id) >= _converters_by_id_size:
+        _converters_by_id.clear()
+    _converters_by_id[(id(from_unit), id(to_unit))] = (from_unit, to_unit, plan)
+    return plan
+
+
+# Conversion matrices
+# A ConversionMatrix holds the (scale, offset) pairs between every two units
+# of a catalog category, so a conversion is a table lookup and one
+# multiply-add.  NIST330 gives each category one as 'convert':
+#   un.Pressure.convert(values, un.Pressure.psig, un.Pressure.kPa)
+# Units can be given as Units, attribute names ('psig') or symbols.  The
+# tables are filled on the first conversion.  Units that are not in the
+# category fall back to converter(), with text read by parse_unit(); a
+# conversion between different dimensions raises ValueError.
+
+def _ParseCategoryUnit(text : str) -> Unit:
+    try:
+        return parse_unit(text)
+    except ValueError:
+        raise ValueError(f'unknown unit: {text}') from None
+
+
+class ConversionMatrix:
+    __slots__ = ('_units', '_rows', '_scale', '_offset', '_pairs', '_last')
+
+    def __init__(self, units : dict):
+        # units maps attribute names to Units; aliases of one Unit share a row.
+        # _rows is keyed on id(unit), attribute names and symbols.
+        self._units = []
+        self._rows = dict()
+        for name, unit in units.items():
+            if id(unit) not in self._rows:
+                self._rows[id(unit)] = len(self._units)
+                self._units.append(unit)
+            row = self._rows[id(unit)]
+            self._rows.setdefault(name, row)
+            self._rows.setdefault(unit._symbol, row)
+        self._scale = None
+        self._offset = None
+        self._pairs = None
+        self._last = (None, None, None)
+
+
+    @classmethod
+    def FromCategory(cls, category : type) -> ConversionMatrix:
+        return cls({name: unit for name, unit in vars(category).items() if type(unit) is Unit})
+
+
+    def _Build(self):
+        factors = np.array([unit._val for unit in self._units], dtype=np.float64)
+        offsets = np.array([unit._offset for unit in self._units], dtype=np.float64)
+        # value_to = value_from * scale[i, j] + offset[i, j]
+        self._scale = factors[:, np.newaxis] / factors[np.newaxis, :]
+        self._offset = (offsets[:, np.newaxis] - offsets[np.newaxis, :]) / factors[np.newaxis, :]
+        # the same table as Python floats for scalar conversions; None
+        # between units of different dimensions
+        dims = [unit._dimension for unit in self._units]
+        self._pairs = [[(s, o) if di is dj else None for s, o, dj in zip(srow, orow, dims)]
+                       for srow, orow, di in zip(self._scale.tolist(), self._offset.tolist(), dims)]
+
+
+    @property
+    def Units(self) -> list:
+        return list(self._units)
+
+
+    @property
+    def Scale(self) -> np.ndarray:
+        if self._pairs is None:
+            self._Build()
+        return self._scale
+
+
+    @property
+    def Offset(self) -> np.ndarray:
+        if self._pairs is None:
+            self._Build()
+        return self._offset
+
+
+    def __repr__(self) -> str:
+        symbols = ', '.join(unit._symbol for unit in self._units)
+        return f'ConversionMatrix({symbols})'
+
+
+    def __call__(self, values, from_unit, to_unit):
+        # values may be a float, a list or an ndarray of values in from_unit.
+        # The last pair is kept with its two units, so repeating a
+        # conversion costs two identity tests instead of the row lookups.
+        last = self._last
+        if last[0] is from_unit and last[1] is to_unit:
+            scale, offset = last[2]
+        else:
+            rows = self._rows
+            i = rows.get(from_unit if type(from_unit) is str else id(from_unit))
+            j = rows.get(to_unit if type(to_unit) is str else id(to_unit))
+            if i is None or j is None:
+                # converter() needs Units: names of this category come from its
+                # rows, other text from parse_unit()
+                if type(from_unit) is str:
+                    from_unit = self._units[i] if i is not None else _ParseCategoryUnit(from_unit)
+                if type(to_unit) is str:
+                    to_unit = self._units[j] if j is not None else _ParseCategoryUnit(to_unit)
+                return converter(from_unit, to_unit)(values)
+            if self._pairs is None:
+                self._Build()
+            pair = self._pairs[i][j]
+            if pair is None:
+                raise ValueError(f'{self._units[i]._symbol} can not be expressed in {self._units[j]._symbol} units')
+            self._last = (from_unit, to_unit, pair)
+            scale, offset = pair
+        if type(values) is list:
+            values = np.asarray(values, dtype=np.float64)
+        if offset == 0.0:
+            return values * scale
+        return values * scale + offset
+
+
+# Bulk formatting for reports
+# FormatColumn(qa, Pressure.psig, '0.1f') -> ['14.7 psig', '150.0 psig', ...]
+# The dimension is checked once and the whole column is converted with one
+# NumPy operation; qtys may be a QuantityArray or a list of Quantities.
+# An ndarray or a list of plain numbers is a dimensionless column.
+
+def _ColumnValues(qtys, unit : Unit) -> np.ndarray:
+    if type(qtys) is QuantityArray:
+        dimension = qtys._dimension
+        values = qtys._val
+    elif isinstance(qtys, np.ndarray) or (len(qtys) > 0 and not isinstance(qtys[0], _Dimensioned)):
+        values = np.asarray(qtys)
+        if values.dtype.kind not in 'biuf':
+            raise TypeError(f'a column must be a QuantityArray, Quantities or numbers, not {values.dtype} values')
+        dimension = Dimensionless
+        values = values.astype(np.float64, copy=False)
+    else:
+        if len(qtys) == 0:
+            return np.empty(0, dtype=np.float64)
+        dimension = qtys[0]._dimension
+        for q in qtys:
+            if not isinstance(q, _Dimensioned):
+                raise TypeError(f'a column must be a QuantityArray, Quantities or numbers, not a mix: {q!r}')
+            if q._dimension is not dimension:
+                raise ValueError(f'quantities in a column must have equal dimensions: {q}')
+        values = np.fromiter((q._val for q in qtys), dtype=np.float64, count=len(qtys))
+
+    if dimension is not unit._dimension:
+        raise ValueError(f'invalid unit conversion: {unit.Symbol}')
+    return (values - unit._offset) / unit._val
+
+
+def FormatColumn(qtys, unit : Unit, format_spec : str = '', symbol : bool = True) -> list:
+    # the strings match qty.Format(unit, format_spec) for each element
+    template = '{:' + format_spec + '}'
+    if symbol:
+        template += ' ' + unit.Symbol.replace('{', '{{').replace('}', '}}')
+    return list(map(template.format, _ColumnValues(qtys, unit).tolist()))
+
+
+def WriteColumn(file, heading : str, qtys, unit : Unit, format_spec : str = '', style : str = 'csv'):
+    # writes one column with the unit in the heading, e.g. 'P1 [psig]'
+    title = f'{heading} [{unit.Symbol}]'
+    cells = FormatColumn(qtys, unit, format_spec, symbol=False)
+    if style == 'csv':
+        file.write(title + '\n')
+        file.write('\n'.join(cells))
+    elif style == 'markdown':
+        file.write(f'| {title} |\n|---:|\n')
+        file.write('\n'.join(f'| {c} |' for c in cells))
+    else:
+        raise ValueError(f'unknown column style: {style}')
+    if len(cells) > 0:
+        file.write('\n')
+
+
+# Display unit systems
+# A UnitSystem names the display unit and format spec for each category of
+# quantity, e.g. {'Length': ('inch', '0.3f'), 'Pressure': ('psi', '0.0f')}.
+# On first use it is compiled into a Dimension -> (unit, spec) table, and a
+# Quantity is formatted from its SI value with one dict lookup and a
+# prepared '{:spec} symbol' template.  Units can be Units or text: 'inch' is
+# looked up as NIST330.Length.inch, building only that category, and other
+# text ('lbm/hr') goes through parse_unit().  Categories that share a Dimension (Pressure and
+# Stress) are told apart with category=.  Without it, the category named in
+# primary= is used, and a shared Dimension with no primary category raises
+# ValueError.  Dimensions that are not listed are shown in SI.  One
+# UnitSystem is passed to each report; nothing global changes.
+#   US.Format(t)                      '0.250 in'
+#   US.Format(S, 'Stress')            '20.000 ksi'
+#   metric_shop = SI.Derive('Metric shop', {'Length': ('mm', '0.2f')})
+
+def _CategoryUnit(category : str, attr : str) -> Unit:
+    # NIST330.Length.inch for ('Length', 'inch'), or None.  Only that one
+    # category is built, not the whole catalog that Registry() merges.
+    import NIST330
+    unit = getattr(getattr(NIST330, category, None), attr, None)
+    return unit if isinstance(unit, Unit) else None
+
+
+class UnitSystem:
+    __slots__ = ('_name', '_entries', '_primary', '_by_dimension', '_by_category', '_formats')
+
+    def __init__(self, name : str, entries : dict, base : UnitSystem = None, primary = None):
+        self._name = name
+        self._entries = dict() if base is None else dict(base._entries)
+        for category, entry in entries.items():
+            if type(entry) is not tuple:
+                entry = (entry, '')
+            self._entries[category] = entry
+        if primary is None:
+            primary = () if base is None else base._primary
+        self._primary = tuple(primary)
+        self._by_dimension = None
+        self._by_category = None
+        self._formats = None
+
+
+    @property
+    def Name(self) -> str:
+        return self._name
+
+
+    def __repr__(self) -> str:
+        return f'UnitSystem({self._name}, {len(self._entries)} categories)'
+
+
+    @property
+    def Primary(self) -> tuple:
+        return self._primary
+
+
+    def Derive(self, name : str, entries : dict, primary = None) -> UnitSystem:
+        # a copy of this system with some categories replaced or added
+        return UnitSystem(name, entries, self, primary)
+
+
+    def _Compile(self):
+        by_category = dict()
+        shared = dict()             # Dimension -> categories in entry order
+        for category, (unit, spec) in self._entries.items():
+            if type(unit) is str:
+                found = _CategoryUnit(category, unit)
+                unit = found if found is not None else parse_unit(unit)
+            by_category[category] = (unit, spec)
+            shared.setdefault(unit._dimension, []).append(category)
+
+        # None marks a Dimension that needs category=
+        by_dimension = dict()
+        for dimension, categories in shared.items():
+            if len(categories) > 1:
+                chosen = [c for c in categories if c in self._primary]
+                if len(chosen) > 1:
+                    raise ValueError(f'{self._name}: {" and ".join(chosen)} are both primary for {dimension}')
+                by_dimension[dimension] = by_category[chosen[0]] if chosen else None
+            else:
+                by_dimension[dimension] = by_category[categories[0]]
+
+        # (factor, offset, '{:spec} symbol', Dimension) by Dimension and by category
+        formats = dict()
+        for key, entry in itertools.chain(by_dimension.items(), by_category.items()):
+            if entry is not None:
+                unit, spec = entry
+                template = '{:' + spec + '} ' + unit._symbol.replace('{', '{{').replace('}', '}}')
+                formats[key] = (unit._val, unit._offset, template, unit._dimension)
+
+        self._by_category = by_category
+        self._by_dimension = by_dimension
+        self._formats = formats
+
+
+    def Lookup(self, x, category : str = None) -> tuple:
+        # (unit, format spec) for a Quantity, QuantityArray or Dimension;
+        # (None, '') when the system has no unit for it
+        if self._by_dimension is None:
+            self._Compile()
+        if category is not None:
+            entry = self._by_category.get(category)
+            if entry is None:
+                raise ValueError(f'{self._name} has no unit for {category}')
+            return entry
+        dimension = x if type(x) is Dimension else x._dimension
+        entry = self._by_dimension.get(dimension, (None, ''))
+        if entry is None:
+            categories = [c for c, (unit, spec) in self._by_category.items() if unit._dimension is dimension]
+            raise ValueError(f'{self._name}: {" and ".join(categories)} share {dimension}; pass category=')
+        return entry
+
+
+    def Unit(self, x, category : str = None) -> Unit:
+        return self.Lookup(x, category)[0]
+
+
+    def Value(self, qty, category : str = None):
+        unit = self.Lookup(qty, category)[0]
+        return qty.Value(unit)
+
+
+    def Format(self, qty, category : str = None, format_spec : str = None) -> str:
+        formats = self._formats
+        if formats is None:
+            self._Compile()
+            formats = self._formats
+        if format_spec is None and type(qty) is Quantity:
+            fmt = formats.get(qty._dimension if category is None else category)
+            if fmt is not None and fmt[3] is qty._dimension:
+                return fmt[2].format((qty._val - fmt[1]) / fmt[0])
+        unit, spec = self.Lookup(qty, category)
+        return qty.Format(unit, spec if format_spec is None else format_spec)
+
+
+    def FormatColumn(self, qtys, category : str = None, format_spec : str = None, symbol : bool = True) -> list:
+        first = qtys if type(qtys) is QuantityArray else qtys[0]
+        unit, spec = self.Lookup(first, category)
+        if unit is None:
+            raise ValueError(f'{self._name} has no unit for {first.Dimension}')
+        return FormatColumn(qtys, unit, spec if format_spec is None else format_spec, symbol)
+
+
+# Trace once, run raw
+# @TraceOnce on a pure arithmetic kernel (operators and np.sqrt & co., no
+# Value() or Format() calls) checks dimensions on the first call for each
+# signature of argument dimensions and records the dimensions of its
+# outputs.  Later calls with that signature run the kernel once on the raw
+# SI floats/ndarrays and only re-wrap the outputs in the recorded
+# dimensions.  A replay that raises, or returns a different kind of output
+# (a tuple of another length, an array for a scalar), switches that
+# signature back to checked and reruns the call with Quantities.
+# Only plain Quantity and QuantityArray arguments are replayed raw: a Unit
+# is more than its factor (psig and psia would share a plan), and a
+# DualQuantity or Expression would lose its derivatives or its graph, so
+# calls with those always run checked.
+#
+#   @TraceOnce
+#   def Thickness(d, P, S, C, E):
+#       return d * np.sqrt(C * P / S / E)
+
+_RAW = 0        # replay on SI values
+_CHECKED = 1    # always run with Quantities
+
+def _ArgumentKey(arg):
+    # QuantityArray arguments get their own plans: a kernel that runs on
+    # raw floats may still fail on raw arrays
+    t = type(arg)
+    if t is Quantity:
+        return arg._dimension
+    if isinstance(arg, _Dimensioned):
+        return (t, arg._dimension)
+    return t
+
+
+def _Replayable(arg) -> bool:
+    # Units, DualQuantities and Expressions carry more than an SI value
+    if isinstance(arg, (Quantity, QuantityArray, Expression)):
+        return type(arg) is Quantity or type(arg) is QuantityArray
+    return True
+
+
+def _RawArguments(args) -> list:
+    return [a._val if isinstance(a, _Dimensioned) else a for a in args]
+
+
+def _OutputDimensions(result):
+    # Dimension, None for a plain value, or a tuple of those
+    if isinstance(result, tuple):
+        return tuple(_OutputDimensions(r) for r in result)
+    if isinstance(result, _Dimensioned):
+        return result._dimension
+    return None
+
+
+def _RawResult(result):
+    # a raw kernel that multiplies by a Unit still returns SI values
+    if isinstance(result, tuple):
+        return tuple(_RawResult(r) for r in result)
+    if isinstance(result, _Dimensioned):
+        return result._val
+    return result
+
+
+def _WrapOutputs(result, dims):
+    if type(dims) is tuple:
+        return tuple(_WrapOutputs(r, d) for r, d in zip(result, dims))
+    if dims is None:
+        return result
+    if isinstance(result, float):
+        return _NewQuantity(float(result), dims)
+    return _Wrap(result, dims)
+
+
+def _OutputKinds(result):
+    # what a raw replay must return: float for a Quantity, ndarray for a
+    # QuantityArray, the same type for a plain value, or a tuple of those
+    if isinstance(result, tuple):
+        return tuple(_OutputKinds(r) for r in result)
+    if type(result) is QuantityArray:
+        return np.ndarray
+    if isinstance(result, Quantity):
+        return float
+    return type(result)
+
+
+def _MatchesKinds(raw, kinds) -> bool:
+    if type(kinds) is tuple:
+        return (isinstance(raw, tuple) and len(raw) == len(kinds)
+                and all(_MatchesKinds(r, k) for r, k in zip(raw, kinds)))
+    if kinds is float:
+        return np.ndim(raw) == 0 and not isinstance(raw, (str, bytes, bool, np.bool_))
+    if kinds is np.ndarray:
+        return isinstance(raw, np.ndarray) and raw.ndim > 0
+    return type(raw) is kinds
+
+
+def TraceOnce(func):
+    # signature of argument types and dimensions ->
+    # (_RAW, output dims, output kinds) or (_CHECKED, None, None)
+    plans = dict()
+
+    @functools.wraps(func)
+    def traced(*args, **kwargs):
+        key = tuple([_ArgumentKey(a) for a in args])
+        if kwargs:
+            key += tuple([(k, _ArgumentKey(v)) for k, v in sorted(kwargs.items())])
+
+        plan = plans.get(key)
+        if plan is not None:
+            if plan[0] == _RAW:
+                try:
+                    if kwargs:
+                        raw = func(*_RawArguments(args), **dict(zip(kwargs, _RawArguments(kwargs.values()))))
+                    else:
+                        raw = func(*_RawArguments(args))
+                    raw = _RawResult(raw)
+                    replayed = _MatchesKinds(raw, plan[2])
+                except Exception:
+                    replayed = False
+                if replayed:
+                    return _WrapOutputs(raw, plan[1])
+                plans[key] = (_CHECKED, None, None)
+            return func(*args, **kwargs)
+
+        result = func(*args, **kwargs)
+        if (all(_Replayable(a) for a in args)
+                and all(_Replayable(v) for v in kwargs.values())):
+            plans[key] = (_RAW, _OutputDimensions(result), _OutputKinds(result))
+        else:
+            plans[key] = (_CHECKED, None, None)
+        return result
+
+    traced.plans = plans
+    traced.checked = func
+    return traced
+
+
+# Lazy expressions
+# Lazy(qty) and Variable(name, dimension) start an Expression.  Operators on
+# an Expression build a DAG instead of computing, and each node resolves its
+# Dimension when it is built, so dimension errors still surface at the
+# operator that causes them.  Evaluation is then one pass over SI floats or
+# ndarrays, and Compile() turns the DAG into a Python/NumPy kernel that is
+# cached on the structure of the graph.
+#   temp = Variable('temp', Temperature.degK)
+#   u = Rc * temp * (tau * gammaTau - pi * gammaPi)
+#   u.Evaluate(temp=300.0 * degK)
+#   kernel = u.Compile(temp)
+#   kernel(np.linspace(300.0, 600.0, 1000) * degK)
+
+class Expression:
+    __slots__ = ('_op', '_args', '_param', '_dimension')
+
+    # NumPy operators defer to the reflected Expression operators
+    __array_ufunc__ = None
+
+    def __init__(self, op : str, args : tuple, param, dimension : Dimension):
+        self._op = op
+        self._args = args
+        self._param = param
+        self._dimension = dimension
+
+
+    BaseTypeName = 'Expression'
+
+
+    @property
+    def Dimension(self) -> Dimension:
+        return self._dimension
+
+
+    @property
+    def HasDimension(self) -> bool:
+        return True
+
+
+    @property
+    def SIValue(self):
+        return self.Evaluate().SIValue
+
+
+    def __repr__(self) -> str:
+        return f'Expression({self._Source()}, Dim({self._dimension}))'
+
+
+    def _Source(self) -> str:
+        if self._op == 'var':
+            return self._param
+        if self._op == 'const':
+            return 'const'
+        if self._op == 'neg':
+            return f'-{self._args[0]._Source()}'
+        if self._op == 'pow':
+            return f'({self._args[0]._Source()})^({self._param[0]}/{self._param[1]})'
+        return f'({self._args[0]._Source()} {_expression_operators[self._op]} {self._args[1]._Source()})'
+
+
+    def __add__(self, other) -> Expression:
+        other = _AsExpression(other)
+        if self._dimension is not other._dimension:
+            raise ValueError("Quantities must be dimensionally equal")
+        return Expression('add', (self, other), None, self._dimension)
+
+
+    def __radd__(self, other) -> Expression:
+        return _AsExpression(other).__add__(self)
+
+
+    def __sub__(self, other) -> Expression:
+        other = _AsExpression(other)
+        if self._dimension is not other._dimension:
+            raise ValueError("Quantities must be dimensionally equal")
+        return Expression('sub', (self, other), None, self._dimension)
+
+
+    def __rsub__(self, other) -> Expression:
+        return _AsExpression(other).__sub__(self)
+
+
+    def __mul__(self, other) -> Expression:
+        other = _AsExpression(other)
+        return Expression('mul', (self, other), None, self._dimension * other._dimension)
+
+
+    def __rmul__(self, other) -> Expression:
+        return _AsExpression(other).__mul__(self)
+
+
+    def __truediv__(self, other) -> Expression:
+        other = _AsExpression(other)
+        return Expression('div', (self, other), None, self._dimension / other._dimension)
+
+
+    def __rtruediv__(self, other) -> Expression:
+        return _AsExpression(other).__truediv__(self)
+
+
+    def __neg__(self) -> Expression:
+        return Expression('neg', (self,), None, self._dimension)
+
+
+    def __pow__(self, exponent : int) -> Expression:
+        if type(exponent) is not int:
+            raise TypeError("Only integer exponents are supported")
+        return self.power(exponent)
+
+
+    def power(self, numer, denom = 1) -> Expression:
+        d = self._dimension.power(int(numer), int(denom))
+        return Expression('pow', (self,), (int(numer), int(denom)), d)
+
+
+    def sqrt(self) -> Expression:
+        return self.power(1, 2)
+
+
+    def squared(self) -> Expression:
+        return self.power(2)
+
+
+    def cubed(self) -> Expression:
+        return self.power(3)
+
+
+    # values binds the Variables by name; Quantities are checked against the
+    # Variable's Dimension, plain floats and ndarrays are taken as SI values
+    def Evaluate(self, **values):
+        return _Wrap(self._Raw(dict(), values), self._dimension)
+
+
+    def _Raw(self, memo : dict, values : dict):
+        key = id(self)
+        if key in memo:
+            return memo[key]
+        op = self._op
+        if op == 'const':
+            result = self._param
+        elif op == 'var':
+            result = _VariableValue(self._param, self._dimension, values[self._param])
+        elif op == 'neg':
+            result = -self._args[0]._Raw(memo, values)
+        elif op == 'pow':
+            result = self._args[0]._Raw(memo, values) ** (self._param[0] / self._param[1])
+        else:
+            a = self._args[0]._Raw(memo, values)
+            b = self._args[1]._Raw(memo, values)
+            if op == 'add':
+                result = a + b
+            elif op == 'sub':
+                result = a - b
+            elif op == 'mul':
+                result = a * b
+            else:
+                result = a / b
+        memo[key] = result
+        return result
+
+
+    def Value(self, unit : Unit = None, **values):
+        return self.Evaluate(**values).Value(unit)
+
+
+    def Format(self, unit : Unit = None, format_spec : str = '', **values) -> str:
+        return self.Evaluate(**values).Format(unit, format_spec)
+
+
+    def Compile(self, *variables) -> CompiledExpression:
+        # variables are Variable Expressions or names, in argument order
+        names = [v._param if type(v) is Expression else v for v in variables]
+        dims = dict()
+        constants = []
+        lines = []
+        temps = dict()
+
+        def visit(node) -> str:
+            key = id(node)
+            if key in temps:
+                return temps[key]
+            if node._op == 'var':
+                if node._param not in names:
+                    raise ValueError(f'Variable {node._param} is not an argument of the kernel')
+                dims[node._param] = node._dimension
+                temps[key] = node._param
+                return node._param
+            if node._op == 'const':
+                name = f'c[{len(constants)}]'
+                constants.append(node._param)
+                temps[key] = name
+                return name
+            args = [visit(a) for a in node._args]
+            if node._op == 'neg':
+                text = f'-{args[0]}'
+            elif node._op == 'pow':
+                text = f'{args[0]} ** {node._param[0] / node._param[1]!r}'
+            else:
+                text = f'{args[0]} {_expression_operators[node._op]} {args[1]}'
+            name = f't{len(lines)}'
+            lines.append(f'    {name} = {text}')
+            temps[key] = name
+            return name
+
+        result = visit(self)
+        source = f'def kernel(c, {", ".join(names)}):\n' + '\n'.join(lines) + f'\n    return {result}\n'
+        function = _compiled_kernels.get(source)
+        if function is None:
+            scope = {'np': np}
+            exec(source, scope)
+            function = scope['kernel']
+            _compiled_kernels[source] = function
+        return CompiledExpression(function, tuple(constants), names,
+                                  [dims.get(n) for n in names], self._dimension)
+
+
+class CompiledExpression:
+    __slots__ = ('_function', '_constants', '_names', '_dimensions', '_dimension')
+
+    def __init__(self, function, constants : tuple, names : list, dimensions : list, dimension : Dimension):
+        self._function = function
+        self._constants = constants
+        self._names = names
+        self._dimensions = dimensions
+        self._dimension = dimension
+
+
+    @property
+    def Dimension(self) -> Dimension:
+        return self._dimension
+
+
+    def __repr__(self) -> str:
+        return f'CompiledExpression({", ".join(self._names)}) -> Dim({self._dimension})'
+
+
+    # Quantities and QuantityArrays are checked against the Variables,
+    # plain floats and ndarrays are taken as SI values
+    def __call__(self, *args, **kwargs):
+        if kwargs:
+            args = args + tuple(kwargs[n] for n in self._names[len(args):])
+        raw = [_VariableValue(n, d, a) for n, d, a in zip(self._names, self._dimensions, args)]
+        result = self._function(self._constants, *raw)
+        if isinstance(result, float):
+            return _NewQuantity(float(result), self._dimension)
+        return _Wrap(result, self._dimension)
+
+
+_expression_operators = {'add': '+', 'sub': '-', 'mul': '*', 'div': '/'}
+
+# generated kernel source -> function; graphs of the same shape share a kernel
+_compiled_kernels = dict()
+
+
+def _VariableValue(name : str, dimension : Dimension, value):
+    if isinstance(value, _Dimensioned):
+        if dimension is not None and value._dimension is not dimension:
+            raise ValueError(f'{name} must have dimension {dimension}, not {value._dimension}')
+        return value._val
+    return value
+
+
+def _AsExpression(x) -> Expression:
+    if type(x) is Expression:
+        return x
+    if isinstance(x, _Dimensioned):
+        if type(x) is Unit and x._offset != 0.0:
+            raise ValueError(f'units with offsets can not be combined: {x.Symbol}')
+        return Expression('const', (), x._val, x._dimension)
+    if isinstance(x, (list, np.ndarray)):
+        return Expression('const', (), np.asarray(x, dtype=np.float64), Dimensionless)
+    return Expression('const', (), float(x), Dimensionless)
+
+
+def Lazy(qty) -> Expression:
+    return _AsExpression(qty)
+
+
+def Variable(name : str, dimension) -> Expression:
+    # dimension may be a Dimension or anything with one, e.g. a Unit
+    if type(dimension) is not Dimension:
+        dimension = dimension.Dimension
+    return Expression('var', (), name, dimension)
+
+
+_operand_kind[Expression] = _DEFER
+
+
+# Forward-mode differentiation
+# Seed(P, 'P') marks an input for differentiation.  Arithmetic on the
+# resulting DualQuantity carries d(result)/d(input) along with the value, so
+# one evaluation returns the result and every seeded partial derivative.
+# Derivatives are kept as SI values; Derivative('P') returns one as a
+# Quantity of dimension dim(result) / dim(P).
+#   t = B31_3_Para304_1_2(Seed(P, 'P'), D, d, c, Seed(S, 'S'), E, W)
+#   dt_dP = t.Derivative('P')
+
+class DualQuantity(Quantity):
+    __slots__ = ('_grad', '_inputs')
+
+    @classmethod
+    def Create(cls, val, dimension : Dimension, grad : dict = None, inputs : dict = None) -> DualQuantity:
+        # grad: input name -> SI derivative, inputs: input name -> Dimension
+        return _NewDual(val, dimension, dict() if grad is None else grad, dict() if inputs is None else inputs)
+
+
+    BaseTypeName = 'DualQuantity'
+
+
+    def __repr__(self) -> str:
+        return f'DualQuantity({self._val}, Dim({self._dimension}), d/d({", ".join(self._inputs)}))'
+
+
+    @property
+    def Primal(self) -> Quantity:
+        # the value without its derivatives
+        return _Wrap(self._val, self._dimension)
+
+
+    def Derivative(self, name : str) -> Quantity:
+        # zero when the value does not depend on the input
+        if name not in self._inputs:
+            raise ValueError(f'{name} is not a seeded input')
+        return _Wrap(self._grad.get(name, 0.0), self._dimension / self._inputs[name])
+
+
+    @property
+    def Gradient(self) -> dict:
+        return {name: self.Derivative(name) for name in self._inputs}
+
+
+    def __add__(self, other) -> DualQuantity:
+        return _DualAdd(_DualParts(self), _DualParts(other), 1.0)
+
+
+    def __radd__(self, other) -> DualQuantity:
+        return _DualAdd(_DualParts(other), _DualParts(self), 1.0)
+
+
+    def __sub__(self, other) -> DualQuantity:
+        return _DualAdd(_DualParts(self), _DualParts(other), -1.0)
+
+
+    def __rsub__(self, other) -> DualQuantity:
+        return _DualAdd(_DualParts(other), _DualParts(self), -1.0)
+
+
+    def __mul__(self, other) -> DualQuantity:
+        return _DualMul(_DualParts(self), _DualParts(other))
+
+
+    def __rmul__(self, other) -> DualQuantity:
+        return _DualMul(_DualParts(other), _DualParts(self))
+
+
+    def __truediv__(self, other) -> DualQuantity:
+        return _DualDiv(_DualParts(self), _DualParts(other))
+
+
+    def __rtruediv__(self, other) -> DualQuantity:
+        return _DualDiv(_DualParts(other), _DualParts(self))
+
+
+    def __neg__(self) -> DualQuantity:
+        return _NewDual(-self._val, self._dimension, {k: -g for k, g in self._grad.items()}, self._inputs)
+
+
+    def __pos__(self) -> DualQuantity:
+        return self
+
+
+    def __pow__(self, exponent : int) -> DualQuantity:
+        if type(exponent) is not int:
+            raise TypeError("Only integer exponents are supported")
+        return self.power(exponent)
+
+
+    def power(self, numer, denom = 1) -> DualQuantity:
+        p = numer / denom
+        v = self._val ** p
+        if p < 1.0 and np.any(self._val == 0.0):
+            # the slope of x^p is unbounded at x = 0: the value is still 0
+            # (as for Quantity.sqrt) and the derivatives there are inf
+            with np.errstate(divide='ignore'):
+                scale = p * np.power(np.asarray(self._val, dtype=np.float64), p - 1.0)
+            if scale.ndim == 0:
+                scale = float(scale)
+        else:
+            scale = p * self._val ** (p - 1.0)
+        return _NewDual(v, self._dimension.power(int(numer), int(denom)),
+                        {k: scale * g for k, g in self._grad.items()}, self._inputs)
+
+
+    def sqrt(self) -> DualQuantity:
+        return self.power(1, 2)
+
+
+    def squared(self) -> DualQuantity:
+        return self.power(2)
+
+
+    def cubed(self) -> DualQuantity:
+        return self.power(3)
+
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if ufunc in _comparison_ufuncs or ufunc in _plain_ufuncs:
+            return _ArrayUfunc(ufunc, method, inputs, kwargs)
+        rule = _dual_ufuncs.get(ufunc)
+        if rule is None or method != '__call__' or kwargs:
+            return NotImplemented
+        return rule(*[_DualParts(x) for x in inputs])
+
+
+    # array functions would drop the derivatives
+    def __array_function__(self, func, types, args, kwargs):
+        return NotImplemented
+
+
+_no_derivatives = dict()
+
+def _NewDual(val, dimension : Dimension, grad : dict, inputs : dict) -> DualQuantity:
+    qty = _new(DualQuantity)
+    qty._val = val
+    qty._dimension = dimension
+    qty._grad = grad
+    qty._inputs = inputs
+    return qty
+
+
+def _DualParts(x) -> tuple:
+    # (SI value, Dimension, derivatives, input dimensions) of an operand
+    if type(x) is DualQuantity:
+        return x._val, x._dimension, x._grad, x._inputs
+    if isinstance(x, _Dimensioned):
+        if type(x) is Unit and x._offset != 0.0:
+            raise ValueError(f'units with offsets can not be combined: {x.Symbol}')
+        return x._val, x._dimension, _no_derivatives, _no_derivatives
+    if isinstance(x, (list, np.ndarray)):
+        return np.asarray(x, dtype=np.float64), Dimensionless, _no_derivatives, _no_derivatives
+    if _operand_kind[type(x)] in (_SCALAR, _NUMPY_SCALAR):
+        return float(x), Dimensionless, _no_derivatives, _no_derivatives
+    raise TypeError(f'Unable to combine {type(x)} with DualQuantity')
+
+
+def _MergeInputs(a : dict, b : dict) -> dict:
+    if a is b or len(b) == 0:
+        return a
+    if len(a) == 0:
+        return b
+    merged = dict(a)
+    merged.update(b)
+    return merged
+
+
+def _DualAdd(a, b, sign : float) -> DualQuantity:
+    va, da, ga, ia = a
+    vb, db, gb, ib = b
+    if da is not db:
+        raise ValueError("Quantities must be dimensionally equal")
+    grad = dict(ga)
+    for k, g in gb.items():
+        grad[k] = grad.get(k, 0.0) + sign * g
+    return _NewDual(va + sign * vb, da, grad, _MergeInputs(ia, ib))
+
+
+def _DualMul(a, b) -> DualQuantity:
+    va, da, ga, ia = a
+    vb, db, gb, ib = b
+    grad = {k: g * vb for k, g in ga.items()}
+    for k, g in gb.items():
+        grad[k] = grad.get(k, 0.0) + va * g
+    return _NewDual(va * vb, da * db, grad, _MergeInputs(ia, ib))
+
+
+def _DualDiv(a, b) -> DualQuantity:
+    # d(a/b) = da/b - a*db/b^2
+    va, da, ga, ia = a
+    vb, db, gb, ib = b
+    grad = {k: g / vb for k, g in ga.items()}
+    for k, g in gb.items():
+        grad[k] = grad.get(k, 0.0) - va * g / (vb * vb)
+    return _NewDual(va / vb, da / db, grad, _MergeInputs(ia, ib))
+
+
+def _DualFunction(a, f, df) -> DualQuantity:
+    # f(a) of a dimensionless operand, df is the derivative of f
+    va, da, ga, ia = a
+    _NoDimensions([da])
+    scale = df(va)
+    return _NewDual(f(va), Dimensionless, {k: scale * g for k, g in ga.items()}, ia)
+
+
+_dual_ufuncs = {
+    np.add: lambda a, b: _DualAdd(a, b, 1.0),
+    np.subtract: lambda a, b: _DualAdd(a, b, -1.0),
+    np.multiply: _DualMul,
+    np.divide: _DualDiv,
+    np.negative: lambda a: _DualMul(a, _DualParts(-1.0)),
+    np.sqrt: lambda a: _NewDual(a[0], a[1], a[2], a[3]).power(1, 2),
+    np.square: lambda a: _NewDual(a[0], a[1], a[2], a[3]).power(2),
+    np.exp: lambda a: _DualFunction(a, np.exp, np.exp),
+    np.log: lambda a: _DualFunction(a, np.log, lambda v: 1.0 / v),
+    np.sin: lambda a: _DualFunction(a, np.sin, np.cos),
+    np.cos: lambda a: _DualFunction(a, np.cos, lambda v: -np.sin(v)),
+}
+
+
+def Seed(qty, name : str) -> DualQuantity:
+    # qty as an input of the differentiation, d(qty)/d(name) = 1
+    val, dimension, grad, inputs = _DualParts(qty)
+    return _NewDual(val, dimension, {name: 1.0}, {name: dimension})
+
+
+_operand_kind[DualQuantity] = _DEFER
+
+
+# Bracketed root finding
+# Solve(f, target, lo, hi) finds x in [lo, hi] with f(x) = target, using the
+# Illinois variant of regula falsi on the SI values.  When target, lo or hi
+# is a QuantityArray, every element is an independent problem: f is called
+# with a QuantityArray of the unconverged elements only, so it must work
+# element-wise (operators, np.sqrt & co.).  The dimension of f(x) is checked
+# against target on the first evaluation.
+#   d = Solve(lambda d: OrificeSteamFlow(d, cd, p1, p2), mdot, 0.01 * inch, 10.0 * inch).Root
+
+class Solution:
+    __slots__ = ('Root', 'Converged', 'Iterations', 'Residual')
+
+    def __init__(self, root, converged, iterations, residual):
+        self.Root = root                # Quantity or QuantityArray, nan where not bracketed
+        self.Converged = converged      # bool or array of bool
+        self.Iterations = iterations    # int or array of int
+        self.Residual = residual        # f(Root) - target
+
+
+    def __repr__(self) -> str:
+        return f'Solution(Root={self.Root}, Converged={self.Converged}, Iterations={self.Iterations})'
+
+
+def Solve(f, target, lo, hi, rtol : float = 1.0e-12, xtol : Quantity = None, maxiter : int = 100) -> Solution:
+    xdim = _EqualDimensions([lo._dimension, hi._dimension])
+    target_val, ydim = _Operand(target)
+    vectorized = type(target) is QuantityArray or type(lo) is QuantityArray or type(hi) is QuantityArray
+    if not vectorized:
+        return _SolveScalar(f, float(target_val), ydim, float(lo._val), float(hi._val), xdim,
+                            rtol, 0.0 if xtol is None else xtol.Value(), maxiter)
+
+    a, b, t = np.broadcast_arrays(np.asarray(lo._val, dtype=np.float64), np.asarray(hi._val, dtype=np.float64),
+                                  np.asarray(target_val, dtype=np.float64))
+    a = a.astype(np.float64).ravel()
+    b = b.astype(np.float64).ravel()
+    t = t.astype(np.float64).ravel()
+    shape = np.broadcast_shapes(np.shape(lo._val), np.shape(hi._val), np.shape(target_val))
+    atol = 0.0
+    if xtol is not None:
+        _EqualDimensions([xdim, xtol._dimension])
+        atol = xtol._val
+
+    def F(x, index):
+        # f(x) - target for the elements in index
+        yval, dim = _Operand(f(_NewQuantityArray(x, xdim)))
+        if dim is not ydim:
+            raise ValueError(f'f(x) has dimension {dim}, the target has dimension {ydim}')
+        return np.asarray(yval, dtype=np.float64).ravel() - t[index]
+
+    n = a.size
+    everything = np.arange(n)
+    fa = F(a, everything)
+    fb = F(b, everything)
+
+    root = np.full(n, np.nan)
+    residual = np.full(n, np.nan)
+    iterations = np.zeros(n, dtype=int)
+    converged = np.zeros(n, dtype=bool)
+
+    # an end point that already solves the equation
+    for x, fx in ((a, fa), (b, fb)):
+        hit = (fx == 0.0) & ~converged
+        root[hit] = x[hit]
+        residual[hit] = 0.0
+        converged[hit] = True
+
+    active = np.flatnonzero(~converged & (np.sign(fa) != np.sign(fb)))
+    side = np.zeros(n, dtype=int)   # end point kept twice in a row: -1 for a, 1 for b
+
+    for iteration in range(1, maxiter + 1):
+        if active.size == 0:
+            break
+        ai, bi, fai, fbi = a[active], b[active], fa[active], fb[active]
+        c = (ai * fbi - bi * fai) / (fbi - fai)
+        fc = F(c, active)
+        iterations[active] = iteration
+
+        # the new point replaces the end point with the same sign; if the
+        # same end point is kept twice, halve its value (Illinois)
+        keep_b = np.sign(fc) == np.sign(fai)
+        a[active] = np.where(keep_b, c, ai)
+        fa[active] = np.where(keep_b, fc, fai)
+        b[active] = np.where(keep_b, bi, c)
+        fb[active] = np.where(keep_b, fbi, fc)
+
+        s = side[active]
+        halve_b = keep_b & (s == 1)
+        halve_a = ~keep_b & (s == -1)
+        fb[active[halve_b]] *= 0.5
+        fa[active[halve_a]] *= 0.5
+        side[active] = np.where(keep_b, 1, -1)
+
+        done = (fc == 0.0) | (np.abs(b[active] - a[active]) <= atol + rtol * np.abs(c))
+        root[active] = c
+        residual[active] = fc
+        converged[active[done]] = True
+        active = active[~done]
+
+    return Solution(_NewQuantityArray(root.reshape(shape), xdim), converged.reshape(shape),
+                    iterations.reshape(shape), _NewQuantityArray(residual.reshape(shape), ydim))
+
+
+def _SolveScalar(f, target, ydim, a, b, xdim, rtol, atol, maxiter) -> Solution:
+    # the same Illinois iteration as Solve() on plain floats
+    def F(x):
+        yval, dim = _Operand(f(_NewQuantity(x, xdim)))
+        if dim is not ydim:
+            raise ValueError(f'f(x) has dimension {dim}, the target has dimension {ydim}')
+        return float(yval) - target
+
+    fa = F(a)
+    fb = F(b)
+    if fa == 0.0 or fb == 0.0:
+        x = a if fa == 0.0 else b
+        return Solution(_NewQuantity(x, xdim), True, 0, _NewQuantity(0.0, ydim))
+    if (fa < 0.0) == (fb < 0.0):
+        return Solution(_NewQuantity(math.nan, xdim), False, 0, _NewQuantity(math.nan, ydim))
+
+    c = fc = math.nan
+    side = 0
+    for iteration in range(1, maxiter + 1):
+        c = (a * fb - b * fa) / (fb - fa)
+        fc = F(c)
+        if (fc < 0.0) == (fa < 0.0):
+            a, fa = c, fc
+            if side == 1:
+                fb *= 0.5
+            side = 1
+        else:
+            b, fb = c, fc
+            if side == -1:
+                fa *= 0.5
+            side = -1
+        if fc == 0.0 or abs(b - a) <= atol + rtol * abs(c):
+            return Solution(_NewQuantity(c, xdim), True, iteration, _NewQuantity(fc, ydim))
+    return Solution(_NewQuantity(c, xdim), False, maxiter, _NewQuantity(fc, ydim))
+
+
+# Interpolation tables
+# QuantityTable(axis, values) looks values up against a dimensioned axis with
+# a binary search (np.searchsorted) instead of scanning the rows.  The axis
+# must be strictly increasing or decreasing.  Lookups accept a Quantity or a
+# QuantityArray of the axis dimension and return a Quantity or QuantityArray
+# of the values dimension.
+#   method       'linear'  straight lines between rows
+#                'log'     straight lines in log(axis), log(values): power
+#                          laws between rows; axis and values must be > 0
+#                'cubic'   natural cubic spline through the rows
+#   out_of_range 'raise'   ValueError for points outside the axis
+#                'clamp'   the value at the nearest end of the axis
+#                'extrapolate' extend the first or last segment
+#                'nan'     nan for points outside the axis
+#   S = QuantityTable(np.array([100.0, 200.0, 300.0]) * degF,
+#                     np.array([20.0, 18.1, 17.0]) * ksi)(T)
+
+_table_methods = ('linear', 'log', 'cubic')
+_table_policies = ('raise', 'clamp', 'extrapolate', 'nan')
+
+def _TableColumn(x) -> tuple:
+    # (1-D float64 SI values, Dimension) of a table axis or values column
+    if type(x) is list or type(x) is tuple:
+        if len(x) > 0 and isinstance(x[0], Quantity):
+            x = QuantityArray(list(x))
+    val, dim = _Operand(x)
+    val = np.array(val, dtype=np.float64).ravel()
+    return val, dim
+
+
+class QuantityTable:
+    __slots__ = ('_x', '_y', '_xdim', '_ydim', '_method', '_out_of_range', '_u', '_v', '_d2', '_ul', '_vl', '_d2l')
+
+    def __init__(self, axis, values, method : str = 'linear', out_of_range : str = 'raise'):
+        if method not in _table_methods:
+            raise ValueError(f'method must be one of {_table_methods}: {method}')
+        if out_of_range not in _table_policies:
+            raise ValueError(f'out_of_range must be one of {_table_policies}: {out_of_range}')
+        x, self._xdim = _TableColumn(axis)
+        y, self._ydim = _TableColumn(values)
+        if x.size != y.size:
+            raise ValueError(f'the axis has {x.size} rows, the values have {y.size}')
+        if x.size < 2:
+            raise ValueError('a table needs at least two rows')
+        steps = np.diff(x)
+        if np.all(steps < 0.0):
+            x = x[::-1].copy()
+            y = y[::-1].copy()
+        elif not np.all(steps > 0.0):
+            raise ValueError('the table axis must be strictly increasing or decreasing')
+        self._x = x
+        self._y = y
+        self._method = method
+        self._out_of_range = out_of_range
+
+        # lookups interpolate v against u
+        if method == 'log':
+            if x[0] <= 0.0 or np.any(y <= 0.0):
+                raise ValueError("'log' tables need a positive axis and positive values")
+            self._u = np.log(x)
+            self._v = np.log(y)
+        else:
+            self._u = x
+            self._v = y
+        self._d2 = _SplineCurvature(self._u, self._v) if method == 'cubic' else np.zeros_like(x)
+
+        # plain float copies for scalar lookups
+        self._ul = self._u.tolist()
+        self._vl = self._v.tolist()
+        self._d2l = self._d2.tolist()
+
+
+    def __repr__(self) -> str:
+        return f'QuantityTable({len(self._ul)} rows, {self._xdim} -> {self._ydim}, {self._method}, {self._out_of_range})'
+
+
+    def __len__(self) -> int:
+        return len(self._ul)
+
+
+    @property
+    def Axis(self) -> QuantityArray:
+        return _NewQuantityArray(self._x, self._xdim)
+
+
+    @property
+    def Values(self) -> QuantityArray:
+        return _NewQuantityArray(self._y, self._ydim)
+
+
+    @property
+    def Method(self) -> str:
+        return self._method
+
+
+    @property
+    def OutOfRange(self) -> str:
+        return self._out_of_range
+
+
+    def _Points(self, x) -> tuple:
+        # (lookup points in u, True for a scalar lookup)
+        val, dim = _Operand(x)
+        if dim is not self._xdim:
+            raise ValueError(f'the lookup has dimension {dim}, the table axis has dimension {self._xdim}')
+        if np.ndim(val) == 0:
+            t = float(val)
+            if self._method == 'log':
+                t = math.log(t) if t > 0.0 else -math.inf
+            return t, True
+        t = np.asarray(val, dtype=np.float64)
+        if self._method == 'log':
+            with np.errstate(divide='ignore', invalid='ignore'):
+                t = np.where(t > 0.0, np.log(np.maximum(t, 0.0)), -np.inf)
+        return t, False
+
+
+    def Interval(self, x):
+        # row i with axis[i] <= x < axis[i+1]: -1 below the axis and
+        # len(table) - 1 at or above its last row
+        t, scalar = self._Points(x)
+        if scalar:
+            return bisect.bisect_right(self._ul, t) - 1
+        return np.searchsorted(self._u, t, side='right') - 1
+
+
+    def __call__(self, x):
+        t, scalar = self._Points(x)
+        if scalar:
+            return _NewQuantity(self._Scalar(t), self._ydim)
+        return _NewQuantityArray(self._Array(t), self._ydim)
+
+
+    def _Scalar(self, t : float) -> float:
+        u = self._ul
+        last = len(u) - 1
+        if t < u[0] or t > u[last]:
+            policy = self._out_of_range
+            if policy == 'raise':
+                raise ValueError(f'{self._Describe(t)} is outside the table axis')
+            if policy == 'nan':
+                return math.nan
+            if policy == 'clamp':
+                t = u[0] if t < u[0] else u[last]
+        i = min(max(bisect.bisect_right(u, t) - 1, 0), last - 1)
+        v = self._vl
+        h = u[i + 1] - u[i]
+        a = (u[i + 1] - t) / h
+        b = 1.0 - a
+        y = a * v[i] + b * v[i + 1]
+        if self._method == 'cubic':
+            d2 = self._d2l
+            y += ((a * a * a - a) * d2[i] + (b * b * b - b) * d2[i + 1]) * (h * h) / 6.0
+        elif self._method == 'log':
+            y = math.exp(y)
+        return y
+
+
+    def _Array(self, t : np.ndarray) -> np.ndarray:
+        u = self._u
+        outside = (t < u[0]) | (t > u[-1])
+        policy = self._out_of_range
+        if policy == 'raise' and np.any(outside):
+            first = t.ravel()[np.flatnonzero(outside.ravel())[0]]
+            raise ValueError(f'{self._Describe(first)} is outside the table axis')
+        if policy == 'clamp':
+            t = np.clip(t, u[0], u[-1])
+        i = np.clip(np.searchsorted(u, t, side='right') - 1, 0, u.size - 2)
+        v = self._v
+        h = u[i + 1] - u[i]
+        a = (u[i + 1] - t) / h
+        b = 1.0 - a
+        y = a * v[i] + b * v[i + 1]
+        if self._method == 'cubic':
+            d2 = self._d2
+            y += ((a * a * a - a) * d2[i] + (b * b * b - b) * d2[i + 1]) * (h * h) / 6.0
+        elif self._method == 'log':
+            y = np.exp(y)
+        if policy == 'nan':
+            y = np.where(outside, np.nan, y)
+        return np.ascontiguousarray(y, dtype=np.float64)
+
+
+    def _Describe(self, t : float) -> str:
+        x = math.exp(t) if self._method == 'log' else t
+        return f'{x:g} {self._xdim}'
+
+
+def _SplineCurvature(u : np.ndarray, v : np.ndarray) -> np.ndarray:
+    # second derivatives of the natural cubic spline through (u, v)
+    n = u.size
+    d2 = np.zeros(n)
+    if n < 3:
+        return d2
+    h = np.diff(u)
+    slope = np.diff(v) / h
+    m = n - 2
+    A = np.zeros((m, m))
+    idx = np.arange(m)
+    A[idx, idx] = 2.0 * (h[:-1] + h[1:])
+    A[idx[1:], idx[:-1]] = h[1:-1]
+    A[idx[:-1], idx[1:]] = h[1:-1]
+    d2[1:-1] = np.linalg.solve(A, 6.0 * np.diff(slope))
+    return d2
+
+
 import xml.etree.ElementTree as ET
+import hashlib
+import os
+import zipfile
 
 def parseExp(exptxt):
     result = [0] * 8
@@ -680,26 +2835,569 @@ def parseExp(exptxt):
 # Alt 230 = µ - micron - 19
 # Alt 234 = Ω - Omega - Ohm
 # Alt 248 = ° - degree - angle, temperature
+#
+# The parsed registry is cached in a compiled snapshot next to the .xml file
+# ('UnitsOfMeasure.xml.snapshot.npz') holding the symbols, factors, offsets
+# and packed Dimension codes.  The snapshot is keyed on the .xml file's
+# modification time and SHA-256 hash and is rebuilt when either is stale,
+# so later loads skip the XML parsing entirely.
+
+_snapshot_version = 1
 
-def LoadUnits(filename):
+def _SnapshotPath(filename) -> str:
+    return os.fspath(filename) + '.snapshot.npz'
+
+
+def _FileHash(filename) -> str:
+    with open(filename, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _ParseUnitsXml(filename):
     tree = ET.parse(filename)
-    root = tree.getroot()
-    unitList = root.get('UnitsOfMeasure')
 
-    ud = dict()
+    symbols = []
+    factors = []
+    offsets = []
+    codes = []
 
     for u in tree.findall('Unit'):
-        symbol = u.find('Symbol').text
-        factor = float(u.find('Factor').text)
-        offset = float(u.find('Offset').text)
-        exponents = u.find('Exponents').text
-        explist = parseExp(exponents)
-        newUnit = Unit(symbol, Quantity(factor, explist), Quantity(offset, explist))
+        symbols.append(u.find('Symbol').text)
+        factors.append(float(u.find('Factor').text))
+        offsets.append(float(u.find('Offset').text))
+        codes.append(parseExp(u.find('Exponents').text).Code)
+
+    return (np.array(symbols, dtype=str), np.array(factors, dtype=np.float64),
+            np.array(offsets, dtype=np.float64), np.array(codes, dtype=np.int64))
+
+
+def _LoadSnapshot(filename):
+    path = _SnapshotPath(filename)
+    sha256 = None
+    try:
+        with np.load(path, allow_pickle=False) as snap:
+            if int(snap['version']) != _snapshot_version:
+                return None
+            if int(snap['mtime_ns']) != os.stat(filename).st_mtime_ns:
+                sha256 = _FileHash(filename)
+                if str(snap['sha256']) != sha256:
+                    return None
+            arrays = snap['symbols'], snap['factors'], snap['offsets'], snap['codes']
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        return None
+    if sha256 is not None:
+        # touched but unchanged (copy, checkout): record the new mtime so
+        # the next load does not hash the file again
+        _SaveSnapshot(filename, *arrays, sha256=sha256)
+    return arrays
+
+
+def _SaveSnapshot(filename, symbols, factors, offsets, codes, sha256 : str = None):
+    path = _SnapshotPath(filename)
+    temp = f'{path}.{os.getpid()}.tmp'
+    if sha256 is None:
+        sha256 = _FileHash(filename)
+    try:
+        with open(temp, 'wb') as f:
+            np.savez(f, version=_snapshot_version, mtime_ns=os.stat(filename).st_mtime_ns,
+                     sha256=sha256, symbols=symbols, factors=factors,
+                     offsets=offsets, codes=codes)
+        os.replace(temp, path)
+    except OSError:
+        # a read-only folder just means every load parses the .xml file
+        if os.path.exists(temp):
+            os.remove(temp)
+
+
+def LoadUnits(filename, use_snapshot : bool = True):
+    arrays = None
+    if use_snapshot:
+        arrays = _LoadSnapshot(filename)
+    if arrays is None:
+        arrays = _ParseUnitsXml(filename)
+        if use_snapshot:
+            _SaveSnapshot(filename, *arrays)
+
+    ud = dict()
+
+    symbols, factors, offsets, codes = arrays
+    for symbol, factor, offset, code in zip(symbols.tolist(), factors.tolist(), offsets.tolist(), codes.tolist()):
+        newUnit = Unit.Create(symbol, Dimension.FromCode(code), factor, offset)
         ud[symbol] = newUnit
-    
+
+    # make the units available to Registry() and parse_unit()
+    _loaded_units[filename] = ud
+    if _registry is not None:
+        _registry.AddUnits(ud, filename)
+    parse_unit.cache_clear()
+
     return ud
 
 
+# Unit registry
+# Registry() merges the NIST330 catalog, the units read by LoadUnits() and the
+# SI base symbols of Dimension.symbol into one UnitRegistry.  Units are found
+# by symbol ('psig'), by alias ('Pressure.psig' or 'psig'), and by Dimension
+# for listing the units a quantity can be displayed in.
+# The first unit registered under a symbol or alias keeps it.  A later unit
+# with a different definition under the same name is not silently dropped:
+# it is listed in Collisions, e.g. ('g', Mass.g, Acceleration.g, 'NIST330').
+# Within the catalog, units of a single SI base dimension are registered
+# first, so they win a shared symbol or attribute name: Mass.g over
+# Acceleration.g, Length.mil over Angle.mil, Time.min over Angle.min.
+
+_loaded_units = dict()      # filename -> units returned by LoadUnits()
+_registry = None
+
+def _BaseDimension(dimension : Dimension) -> bool:
+    # kg, m, s, A, K, mol, cd or $ to the first power
+    return sorted(dimension.Exponents) == [0] * (BaseQuantity._Count.value - 1) + [1]
+
+
+def _CatalogUnits():
+    # yields (category name, attribute name, Unit) for every unit in NIST330;
+    # getattr builds the categories that have not been used yet
+    import NIST330
+    for name in NIST330.__all__:
+        category = getattr(NIST330, name)
+        if isinstance(category, type) and category.__module__ == NIST330.__name__:
+            for attr, unit in vars(category).items():
+                if type(unit) is Unit:
+                    yield name, attr, unit
+
+
+class UnitRegistry:
+    def __init__(self):
+        self._symbols = dict()
+        self._aliases = dict()
+        self._dimensions = dict()
+        self._collisions = []
+
+
+    @staticmethod
+    def SameDefinition(a : Unit, b : Unit) -> bool:
+        # catalogs round their factors differently, so compare to 1e-9
+        return (a._dimension is b._dimension
+                and math.isclose(a._val, b._val, rel_tol=1.0e-9)
+                and math.isclose(a._offset, b._offset, rel_tol=1.0e-9))
+
+
+    def _Insert(self, table : dict, name : str, unit : Unit, source : str):
+        kept = table.get(name)
+        if kept is None:
+            table[name] = unit
+        elif kept is not unit and not UnitRegistry.SameDefinition(kept, unit):
+            self._collisions.append((name, kept, unit, source))
+
+
+    def Add(self, unit : Unit, aliases = (), source : str = ''):
+        self._Insert(self._symbols, unit._symbol, unit, source)
+        for alias in aliases:
+            if alias != unit._symbol:
+                self._Insert(self._aliases, alias, unit, source)
+
+        units = self._dimensions.setdefault(unit._dimension, [])
+        for u in units:
+            if UnitRegistry.SameDefinition(u, unit):
+                return
+        units.append(unit)
+
+
+    def AddUnits(self, units : dict, source : str = ''):
+        for unit in units.values():
+            self.Add(unit, source=source)
+
+
+    def Find(self, name : str) -> Unit:
+        # returns None if name is neither a symbol nor an alias
+        unit = self._symbols.get(name)
+        if unit is None:
+            unit = self._aliases.get(name)
+        return unit
+
+
+    def __getitem__(self, name : str) -> Unit:
+        unit = self.Find(name)
+        if unit is None:
+            raise KeyError(name)
+        return unit
+
+
+    def __contains__(self, name : str) -> bool:
+        return self.Find(name) is not None
+
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+
+    def Compatible(self, dimension) -> list:
+        # units that can express a Dimension, Quantity, QuantityArray or Unit
+        if type(dimension) is not Dimension:
+            dimension = dimension.Dimension
+        return list(self._dimensions.get(dimension, ()))
+
+
+    @property
+    def Symbols(self) -> list:
+        return list(self._symbols)
+
+
+    @property
+    def Collisions(self) -> list:
+        # (name, kept Unit, rejected Unit, source of the rejected Unit)
+        return list(self._collisions)
+
+
+def Registry() -> UnitRegistry:
+    global _registry
+    if _registry is None:
+        registry = UnitRegistry()
+
+        catalog = list(_CatalogUnits())
+        catalog.sort(key=lambda c: not _BaseDimension(c[2]._dimension))
+        for name, attr, unit in catalog:
+            registry.Add(unit, (f'{name}.{attr}', attr), 'NIST330')
+
+        for filename, units in _loaded_units.items():
+            registry.AddUnits(units, filename)
+
+        for d in range(BaseQuantity._Count.value):
+            exp = [0] * BaseQuantity._Count.value
+            exp[d] = 1
+            symbol = Dimension.symbol[d]
+            aliases = (symbol, '°K') if symbol == 'K' else (symbol,)
+            registry.Add(Unit.Create(symbol, Dimension(exp), 1.0), aliases, 'SI base')
+
+        _registry = registry
+    return _registry
+
+
+# Unit expression parsing
+# parse_unit('lbm/hr'), parse_unit('kJ/kg·°K'), parse_unit('ft^3/min')
+# Symbols and aliases are resolved with Registry().
+# Everything after a '/' is in the denominator, so 'Btu/lbm·°F' is
+# Btu / (lbm·°F); parentheses group, and '^' takes an integer exponent.
+
+def _LookupSymbol(symbol : str) -> Unit:
+    unit = Registry().Find(symbol)
+    if unit is None:
+        raise ValueError(f'unknown unit symbol: {symbol}')
+    return unit
+
+
+class _UnitParser:
+    _operators = '*·/^()'
+
+    def __init__(self, text : str):
+        self._tokens = []
+        token = ''
+        for c in text:
+            if c in _UnitParser._operators or c.isspace():
+                if len(token) > 0:
+                    self._tokens.append(token)
+                    token = ''
+                if not c.isspace():
+                    self._tokens.append(c)
+            else:
+                token += c
+        if len(token) > 0:
+            self._tokens.append(token)
+        self._pos = 0
+        self._text = text
+
+
+    def _peek(self) -> str:
+        if self._pos < len(self._tokens):
+            return self._tokens[self._pos]
+        return None
+
+
+    def _next(self) -> str:
+        token = self._peek()
+        if token is None:
+            raise ValueError(f'unexpected end of unit expression: {self._text}')
+        self._pos += 1
+        return token
+
+
+    def Parse(self) -> Quantity:
+        result = self._expression()
+        if self._peek() is not None:
+            raise ValueError(f'unexpected "{self._peek()}" in unit expression: {self._text}')
+        return result
+
+
+    # expression := product ('/' product)*
+    def _expression(self) -> Quantity:
+        result = self._product()
+        while self._peek() == '/':
+            self._next()
+            result = result / self._product()
+        return result
+
+
+    # product := power (('*' | '·') power)*
+    def _product(self) -> Quantity:
+        result = self._power()
+        while self._peek() == '*' or self._peek() == '·':
+            self._next()
+            result = result * self._power()
+        return result
+
+
+    # power := atom ('^' integer)?
+    def _power(self) -> Quantity:
+        result = self._atom()
+        if self._peek() == '^':
+            self._next()
+            token = self._next()
+            try:
+                exponent = int(token)
+            except ValueError:
+                raise ValueError(f'exponent must be an integer: {token}')
+            result = result.power(exponent)
+        return result
+
+
+    # atom := number | symbol | '(' expression ')'
+    def _atom(self) -> Quantity:
+        token = self._next()
+        if token == '(':
+            result = self._expression()
+            if self._next() != ')':
+                raise ValueError(f'missing ")" in unit expression: {self._text}')
+            return result
+        if token in _UnitParser._operators:
+            raise ValueError(f'unexpected "{token}" in unit expression: {self._text}')
+        try:
+            value = float(token)
+        except ValueError:
+            value = None
+        if value is not None:
+            # float() also reads 'nan' and 'inf'
+            if not math.isfinite(value) or value <= 0.0:
+                raise ValueError(f'factor must be finite and positive: {token}')
+            return _NewQuantity(value, Dimensionless)
+        unit = _LookupSymbol(token)
+        if unit.Offset.SIValue != 0.0:
+            raise ValueError(f'units with offsets can not be combined: {token}')
+        return unit.Factor
+
+
+@functools.lru_cache(maxsize=512)
+def parse_unit(text : str) -> Unit:
+    text = text.strip()
+    try:
+        return _LookupSymbol(text)
+    except ValueError:
+        pass
+    factor = _UnitParser(text).Parse()
+    # products of finite factors can still overflow
+    if not math.isfinite(factor._val):
+        raise ValueError(f'factor must be finite and positive: {text}')
+    return Unit(text, factor)
+
+
+import csv
+import itertools
+
+# Unit-annotated CSV files
+# Columns are headed 'name [unit]', e.g. 'P1 [psig]', 'T1 [°F]', 'dia [in]';
+# the unit is parsed once per file with parse_unit().  A column without a
+# '[unit]' is dimensionless.  ReadColumns() reads chunk_rows rows at a time
+# and yields {name: QuantityArray} with each column converted to SI in one
+# step, so files of any size are processed in bounded memory.  Empty cells
+# read as nan.
+#   for chunk in ReadColumns('run12.csv', columns=['P1', 'T1']):
+#       rho = Density(chunk['P1'], chunk['T1'])
+#       WriteColumns(out, {'rho': rho}, {'rho': 'lbm/ft^3'}, '.4f', header=first)
+
+def _ParseHeading(heading : str) -> tuple:
+    # 'P1 [psig]' -> ('P1', psig Unit); 'count' -> ('count', None)
+    text = heading.strip()
+    if text.endswith(']') and '[' in text:
+        start = text.rindex('[')
+        return text[:start].strip(), parse_unit(text[start + 1:-1])
+    return text, None
+
+
+# the unit of columns without a '[unit]' heading
+_plain_numbers = Unit('', _NewQuantity(1.0, Dimensionless))
+
+
+def _CellValues(name : str, cells : list) -> np.ndarray:
+    try:
+        return np.array(cells, dtype=np.float64)
+    except ValueError:
+        pass
+    try:
+        return np.array([c if c.strip() != '' else 'nan' for c in cells], dtype=np.float64)
+    except ValueError as e:
+        raise ValueError(f'column {name} is not numeric: {e}') from None
+
+
+def ReadColumns(file, chunk_rows : int = 65536, columns = None, delimiter : str = ','):
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, newline='', encoding='utf-8') as f:
+            yield from ReadColumns(f, chunk_rows, columns, delimiter)
+        return
+
+    reader = csv.reader(file, delimiter=delimiter)
+    headings = next(reader, None)
+    if headings is None:
+        return
+    parsed = [_ParseHeading(h) for h in headings]
+    names = [name for name, unit in parsed]
+    if columns is None:
+        columns = names
+    selected = []
+    for name in columns:
+        if name not in names:
+            raise ValueError(f'no column named {name} in the file')
+        column = names.index(name)
+        unit = parsed[column][1]
+        if unit is None:
+            selected.append((name, column, 1.0, 0.0, Dimensionless))
+        else:
+            selected.append((name, column, unit._val, unit._offset, unit._dimension))
+
+    while True:
+        rows = list(itertools.islice(reader, chunk_rows))
+        if len(rows) == 0:
+            return
+        chunk = {}
+        for name, column, factor, offset, dimension in selected:
+            values = _CellValues(name, [row[column] if column < len(row) else '' for row in rows])
+            if factor != 1.0:
+                values *= factor
+            if offset != 0.0:
+                values += offset
+            chunk[name] = _NewQuantityArray(values, dimension)
+        yield chunk
+
+
+def WriteColumns(file, columns : dict, units : dict, format_spec = '', header : bool = True, delimiter : str = ','):
+    # columns maps a name to a QuantityArray or a list of Quantities and units
+    # maps the name to a Unit or unit text; dimensionless columns, which may
+    # also be plain numbers, may be left out of units.  All columns must have
+    # the same length.  format_spec is one spec for all columns or a dict by name.
+    # header = False appends rows to a file that already has its headings.
+    headings = []
+    cells = []
+    for name, qtys in columns.items():
+        unit = units.get(name)
+        spec = format_spec.get(name, '') if isinstance(format_spec, dict) else format_spec
+        if unit is None:
+            unit = _plain_numbers
+            headings.append(name)
+        else:
+            if isinstance(unit, str):
+                unit = parse_unit(unit)
+            headings.append(f'{name} [{unit.Symbol}]')
+        cells.append(FormatColumn(qtys, unit, spec, symbol=False))
+
+    # zip() would silently drop the rows past the shortest column
+    lengths = {len(c) for c in cells}
+    if len(lengths) > 1:
+        counts = ', '.join(f'{name}: {len(c)}' for name, c in zip(columns, cells))
+        raise ValueError(f'columns must have equal lengths: {counts}')
+
+    writer = csv.writer(file, delimiter=delimiter, lineterminator='\n')
+    if header:
+        writer.writerow(headings)
+    writer.writerows(zip(*cells))
+
+
+import struct
+
+# Binary quantity files
+# SaveQuantity() writes a Quantity or QuantityArray as a small header
+# followed by the raw little-endian float64 SI values; LoadQuantity() maps
+# the values back with np.memmap, so large arrays are shared between
+# processes without copying or parsing.  The header holds the packed
+# Dimension code, the shape and the display unit (symbol, factor and offset,
+# so units that are not in the registry still load).
+#   SaveQuantity('sweep.uoq', pressures, psig)
+#   pressures, unit = LoadQuantity('sweep.uoq')
+#
+# header: magic 'UOMQ', version u2, ndim u2, Dimension code u8,
+#         unit factor f8, unit offset f8, symbol length u4, 4 spare bytes,
+#         ndim * shape i8, symbol utf-8, zero padding to a multiple of 64
+
+_quantity_magic = b'UOMQ'
+_quantity_version = 1
+_quantity_header = struct.Struct('<4sHHQddI4x')
+_quantity_align = 64
+
+def SaveQuantity(filename, qty, unit : Unit = None):
+    if not isinstance(qty, _Dimensioned):
+        raise TypeError(f'only Quantities and QuantityArrays can be saved: {type(qty).__name__}')
+    values, dimension = _Operand(qty)
+    values = np.asarray(values, dtype='<f8')
+    if unit is None:
+        symbol, factor, offset = b'', 1.0, 0.0
+    else:
+        if unit._dimension is not dimension:
+            raise ValueError(f'invalid unit conversion: {unit.Symbol}')
+        symbol, factor, offset = unit.Symbol.encode('utf-8'), unit._val, unit._offset
+
+    header = _quantity_header.pack(_quantity_magic, _quantity_version, values.ndim, dimension._code,
+                                   factor, offset, len(symbol))
+    header += struct.pack(f'<{values.ndim}q', *values.shape) + symbol
+    header += b'\0' * (-len(header) % _quantity_align)
+
+    # written under a temporary name so readers never map a partial file
+    temp = f'{os.fspath(filename)}.{os.getpid()}.tmp'
+    try:
+        with open(temp, 'wb') as f:
+            f.write(header)
+            values.tofile(f)
+        os.replace(temp, filename)
+    finally:
+        if os.path.exists(temp):
+            os.remove(temp)
+
+
+def LoadQuantity(filename, mmap : bool = True) -> tuple:
+    # (Quantity or QuantityArray, display Unit or None); with mmap the array
+    # is a read-only view of the file
+    with open(filename, 'rb') as f:
+        fixed = f.read(_quantity_header.size)
+        if len(fixed) < _quantity_header.size:
+            raise ValueError(f'not a quantity file: {filename}')
+        magic, version, ndim, code, factor, offset, length = _quantity_header.unpack(fixed)
+        if magic != _quantity_magic:
+            raise ValueError(f'not a quantity file: {filename}')
+        if version != _quantity_version:
+            raise ValueError(f'unsupported quantity file version {version}: {filename}')
+        shape = struct.unpack(f'<{ndim}q', f.read(8 * ndim))
+        symbol = f.read(length).decode('utf-8')
+        data_offset = _quantity_header.size + 8 * ndim + length
+        data_offset += -data_offset % _quantity_align
+        count = math.prod(shape)
+        if not mmap or count == 0 or ndim == 0:
+            f.seek(data_offset)
+            values = np.fromfile(f, dtype='<f8', count=count).reshape(shape)
+
+    dimension = Dimension.FromCode(code)
+    if ndim == 0:
+        qty = _NewQuantity(float(values), dimension)
+    else:
+        if mmap and count > 0:
+            values = np.memmap(filename, dtype='<f8', mode='r', offset=data_offset, shape=shape).view(np.ndarray)
+        qty = _NewQuantityArray(values, dimension)
+
+    unit = None
+    if length > 0:
+        # the registry's unit when it matches the saved definition
+        unit = Unit.Create(symbol, dimension, factor, offset)
+        known = Registry().Find(symbol)
+        if known is not None and UnitRegistry.SameDefinition(known, unit):
+            unit = known
+    return qty, unit
+
+
 # qtynan = np.nan * unitless
 
 
@@ -712,6 +3410,122 @@ if __name__ == '__main__':
     # Unit u1 = value, offset, dimension, symbol
     # su1 = u1.Format(Unit, fmt) returns string of Value formatted
 
+    # numeric checks of the fast paths against the checked Quantity path;
+    # the units are built here because Registry() would import a second
+    # copy of this module through NIST330
+    def close(a, b, rtol = 1.0e-12) -> bool:
+        if isinstance(a, _Dimensioned):
+            a = a._val
+        if isinstance(b, _Dimensioned):
+            b = b._val
+        return bool(np.allclose(a, b, rtol=rtol, atol=0.0))
+
+
+    def check():
+        m = Unit.Create('m', Length_dimension, 1.0)
+        pa = Unit.Create('Pa', Dimension([1, -1, -2, 0, 0, 0, 0, 0]), 1.0)
+        psia = Unit('psia', 6894.75729317 * pa)
+        psig = Unit('psig', 6894.75729317 * pa, 101325.0 * pa)
+
+        # TraceOnce: replayed calls agree with the kernel run on Quantities,
+        # and Unit arguments, which may carry an offset, stay checked
+        @TraceOnce
+        def Thickness(d, P, S):
+            return d * np.sqrt(P / S)
+
+        for d in (0.5 * m, np.linspace(0.1, 1.0, 5) * m):
+            for P in (100.0, 250.0):
+                t = Thickness(d, P * psia, 20000.0 * psia)
+                assert close(t, Thickness.checked(d, P * psia, 20000.0 * psia))
+        assert all(plan[0] == _RAW for plan in Thickness.plans.values())
+
+        @TraceOnce
+        def Reading(x, unit):
+            return x * unit
+
+        assert close(Reading(10.0, psia).Value(psia), 10.0)
+        assert close(Reading(10.0, psig).Value(psig), 10.0)
+        assert all(plan[0] == _CHECKED for plan in Reading.plans.values())
+
+        # a seeded input keeps its derivative on every call, not only the first
+        seeded = [Thickness(0.5 * m, Seed(250.0 * psia, 'P'), 20000.0 * psia) for k in range(3)]
+        assert all(type(t) is DualQuantity and t.Derivative('P')._val != 0.0 for t in seeded)
+
+        # Expression: Evaluate() and the compiled kernel agree with eager
+        # Quantities on scalars and arrays
+        kelvin = Unit.Create('K', Temperature_dimension, 1.0)
+        Rc = Quantity.Create(461.526, Dimension([0, 2, -2, 0, -1, 0, 0, 0]))
+        tau, pi, gammaPi, gammaPiPi, gammaTauTau, gammaPiTau = 2.4, 0.18, 0.126, -0.0063, -1.05, 0.071
+
+        def Speed(temp):
+            denom = (gammaPi - tau * gammaPiTau) ** 2 / (tau ** 2 * gammaTauTau) - gammaPiPi
+            return (Rc * temp * gammaPi ** 2 / denom + Rc * temp * (tau * gammaPi - pi * gammaPi)).sqrt()
+
+        temp = Variable('temp', kelvin)
+        speed = Speed(temp)
+        kernel = speed.Compile(temp)
+        temps = np.linspace(300.0, 600.0, 7)
+        eager = [Speed(t * kelvin)._val for t in temps]
+        assert speed.Dimension is Speed(300.0 * kelvin).Dimension
+        assert close(speed.Evaluate(temp=300.0 * kelvin), eager[0])
+        assert close(kernel(300.0 * kelvin), eager[0])
+        assert close(kernel(temps * kelvin), eager)
+
+        # DualQuantity: derivatives of Thickness against the closed form
+        # d * sqrt(P / S) -> dt/dP = t / 2P, dt/dS = -t / 2S
+        d, P, S = 0.5 * m, 250.0 * psia, 20000.0 * psia
+        t = Thickness.checked(d, Seed(P, 'P'), Seed(S, 'S'))
+        assert close(t.Primal, Thickness.checked(d, P, S))
+        assert close(t.Derivative('P'), t.Primal / (2.0 * P))
+        assert close(t.Derivative('S'), t.Primal / (-2.0 * S))
+        root = Seed((0.0 * m) * (1.0 * m), 'A').sqrt()
+        assert root._val == 0.0 and root.Derivative('A')._val == math.inf
+
+        # Solve: invert Thickness for d, scalar and element-wise, against
+        # d = t / sqrt(P / S)
+        target = 0.05 * m
+        found = Solve(lambda d: Thickness(d, P, S), target, 0.01 * m, 10.0 * m)
+        assert found.Converged and close(found.Root, target._val / math.sqrt(P._val / S._val), 1.0e-10)
+        targets = np.array([0.02, 0.05, 0.2]) * m
+        found = Solve(lambda d: Thickness(d, P, S), targets, 0.01 * m, 10.0 * m)
+        assert np.all(found.Converged)
+        assert close(found.Root, targets._val / math.sqrt(P._val / S._val), 1.0e-10)
+
+        # QuantityTable: scalar and array lookups agree with np.interp, a
+        # power law and a straight line, which each method reproduces exactly
+        axis = np.array([1.0, 2.0, 4.0, 8.0, 16.0])
+        points = np.array([1.0, 1.5, 3.0, 7.9, 16.0])
+        tables = [(QuantityTable(axis * m, (axis ** 2 + 1.0) * pa), np.interp(points, axis, axis ** 2 + 1.0)),
+                  (QuantityTable(axis * m, 3.0 * axis ** 1.5 * pa, 'log'), 3.0 * points ** 1.5),
+                  (QuantityTable(axis * m, (2.0 * axis + 1.0) * pa, 'cubic'), 2.0 * points + 1.0)]
+        for table, expected in tables:
+            assert close(table(points * m), expected)
+            assert close([table(x * m)._val for x in points], expected)
+        line = QuantityTable(axis * m, (2.0 * axis + 1.0) * pa, 'linear', 'extrapolate')
+        assert close(line(20.0 * m), 41.0) and close(line(np.array([0.0, 20.0]) * m), [1.0, 41.0])
+        assert close(QuantityTable(axis * m, axis * pa, 'linear', 'clamp')(np.array([0.5, 20.0]) * m), [1.0, 16.0])
+        assert math.isnan(QuantityTable(axis * m, axis * pa, 'linear', 'nan')(20.0 * m)._val)
+
+        # Unchecked: the flag belongs to the current context, so a thread
+        # started inside Unchecked() still raises on a mismatch
+        def Mismatch() -> bool:
+            try:
+                (1.0 * m) + (1.0 * pa)
+                return True
+            except ValueError:
+                return False
+
+        import threading
+        with Unchecked():
+            assert Mismatch() and (2.0 * m).Format(pa) == '2.0 Pa'
+            other = []
+            worker = threading.Thread(target=lambda: other.append(Mismatch()))
+            worker.start()
+            worker.join()
+            assert other == [False]
+        assert not Mismatch() and not IsUnchecked()
+
+
     def main():
         unitless = Unit(' ', Quantity.Create(1.0, Dimensionless))
 
@@ -751,4 +3565,5 @@ if __name__ == '__main__':
         print(q1)
 
 
+    check()
     main()
\ No newline at end of file
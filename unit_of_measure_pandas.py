@@ -0,0 +1,479 @@
+# pandas support for unit_of_measure.
+#
+# Importing this module registers a QuantityDtype extension type and a 'qty'
+# Series accessor.  A Quantity column is stored as one float64 array of SI
+# values; the Dimension is part of the dtype ('Quantity[kg/m*s^2]'), so
+# arithmetic, reductions, groupby, concat and take run on the float array
+# instead of on an object column of Quantity instances.
+#
+#   import unit_of_measure_pandas
+#   df = pd.DataFrame({'p1': QuantitySeries(pressures), 'p2': QuantitySeries([14.7, 15.2], 'psia')})
+#   df.p1.qty.to(Pressure.psia)         # float Series in psia
+#   df.groupby('run').p1.mean()         # Quantity column
+#   df.p1 * 2.0 - df.p2                 # Quantity column, dimensions checked
+#
+# groupby reductions forward the float64 SI values to pandas' own masked
+# Float64 array through the private _groupby_op hook.  _groupby_op is not
+# part of the pandas extension API, so its signature can change in any
+# release: the one used here is that of pandas 2.1 through 3.0
+# (_groupby_versions), and _groupby_versions must be re-checked whenever
+# pandas is upgraded.  With other pandas versions the hook is not installed,
+# a warning is issued once at import, and groupby takes pandas' generic
+# per-group path, which is slower and does not support std.
+
+import numbers
+import re
+import warnings
+
+import numpy as np
+import pandas as pd
+from pandas.api.extensions import (ExtensionArray, ExtensionDtype, register_extension_dtype,
+                                   register_series_accessor, take)
+
+import unit_of_measure as um
+
+
+@register_extension_dtype
+class QuantityDtype(ExtensionDtype):
+    type = um.Quantity
+    kind = 'O'
+    _metadata = ('dimension',)
+
+    def __init__(self, dimension : um.Dimension = um.Dimensionless):
+        self.dimension = dimension
+
+
+    @property
+    def name(self) -> str:
+        return f'Quantity[{self.dimension}]'
+
+
+    @property
+    def na_value(self) -> um.Quantity:
+        return um.Quantity.Create(np.nan, self.dimension)
+
+
+    @classmethod
+    def construct_array_type(cls):
+        return QuantityExtensionArray
+
+
+    @classmethod
+    def construct_from_string(cls, string):
+        # 'Quantity' and the names of Dimensions that are already in use
+        if not isinstance(string, str):
+            raise TypeError(f"'construct_from_string' expects a string, got {type(string)}")
+        if string == 'Quantity':
+            return cls()
+        if string.startswith('Quantity[') and string.endswith(']'):
+            text = string[len('Quantity['):-1]
+            for dimension in list(um.Dimension._interned.values()):
+                if str(dimension) == text:
+                    return cls(dimension)
+        raise TypeError(f"Cannot construct a 'QuantityDtype' from '{string}'")
+
+
+    def __repr__(self) -> str:
+        return self.name
+
+
+# reductions that keep the column's Dimension; 'var' squares it
+_same_dimension = ('sum', 'min', 'max', 'mean', 'median', 'std', 'sem', 'first', 'last',
+                   'cumsum', 'cummin', 'cummax', 'shift')
+_plain_results = ('count', 'any', 'all', 'rank', 'idxmin', 'idxmax', 'size', 'nunique')
+
+def _ResultDimension(how : str, dimension : um.Dimension) -> um.Dimension:
+    # Dimension of a reduction result, None for plain numbers
+    if how in _same_dimension:
+        return dimension
+    if how in _plain_results:
+        return None
+    if how == 'var':
+        return dimension * dimension
+    if dimension is um.Dimensionless:
+        return dimension
+    raise TypeError(f"'{how}' is not supported for Quantities of dimension {dimension}")
+
+
+class QuantityExtensionArray(ExtensionArray):
+    # _data: 1-D float64 SI values; missing values are nan
+    __array_priority__ = 1000
+
+    def __init__(self, values, dtype : QuantityDtype = None, copy : bool = False):
+        if isinstance(values, QuantityExtensionArray):
+            data, dimension = values._data, values._dtype.dimension
+        elif isinstance(values, um.QuantityArray):
+            data, dimension = values._val, values._dimension
+        elif isinstance(values, um.Quantity):
+            data, dimension = np.array([values._val]), values._dimension
+        else:
+            # plain numbers are SI values of dtype's Dimension
+            data = values
+            dimension = um.Dimensionless if dtype is None else dtype.dimension
+        if dtype is not None and dtype.dimension is not dimension:
+            raise ValueError(f'values of dimension {dimension} can not be stored as {dtype}')
+        data = np.array(data, dtype=np.float64, copy=copy or None).ravel()
+        self._data = data
+        self._dtype = QuantityDtype(dimension) if dtype is None else dtype
+
+
+    @classmethod
+    def _from_sequence(cls, scalars, *, dtype = None, copy : bool = False):
+        if isinstance(dtype, str):
+            dtype = QuantityDtype.construct_from_string(dtype)
+        if isinstance(scalars, (QuantityExtensionArray, um.QuantityArray)):
+            return cls(scalars, dtype, copy)
+        scalars = list(scalars)
+        dimension = None if dtype is None else dtype.dimension
+        values = np.empty(len(scalars), dtype=np.float64)
+        for i, x in enumerate(scalars):
+            if isinstance(x, um.Quantity):
+                if dimension is None:
+                    dimension = x._dimension
+                elif x._dimension is not dimension:
+                    raise ValueError(f'quantities in a column must have equal dimensions: {x}')
+                values[i] = x._val
+            elif x is None or x is pd.NA or (isinstance(x, numbers.Real) and np.isnan(x)):
+                values[i] = np.nan
+            elif isinstance(x, numbers.Real) and dtype is not None:
+                values[i] = x
+            else:
+                raise TypeError(f'a Quantity column can not hold {x!r}')
+        if dimension is None:
+            dimension = um.Dimensionless
+        return cls(values, QuantityDtype(dimension) if dtype is None else dtype)
+
+
+    @classmethod
+    def _from_factorized(cls, values, original):
+        return cls(values, original._dtype)
+
+
+    @classmethod
+    def _concat_same_type(cls, to_concat):
+        dtype = to_concat[0]._dtype
+        for array in to_concat:
+            if array._dtype.dimension is not dtype.dimension:
+                raise ValueError('quantities in a column must have equal dimensions')
+        return cls(np.concatenate([array._data for array in to_concat]), dtype)
+
+
+    @property
+    def dtype(self) -> QuantityDtype:
+        return self._dtype
+
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes
+
+
+    def __len__(self) -> int:
+        return self._data.size
+
+
+    def __getitem__(self, item):
+        if isinstance(item, numbers.Integral):
+            return um.Quantity.Create(float(self._data[item]), self._dtype.dimension)
+        item = pd.api.indexers.check_array_indexer(self, item)
+        return type(self)(self._data[item], self._dtype)
+
+
+    def __setitem__(self, key, value):
+        key = pd.api.indexers.check_array_indexer(self, key)
+        self._data[key] = self._Values(value)
+
+
+    def __iter__(self):
+        dimension = self._dtype.dimension
+        for v in self._data.tolist():
+            yield um.Quantity.Create(v, dimension)
+
+
+    def __array__(self, dtype = None, copy = None):
+        # object array of Quantities, as an object column would hold
+        if dtype is not None and np.dtype(dtype) != object:
+            raise TypeError(f'a Quantity column can not be converted to {dtype}; use .qty.to(unit)')
+        return np.array(list(self), dtype=object)
+
+
+    def _Values(self, other):
+        # SI values of an operand with this column's Dimension; a missing
+        # value (None, nan, pd.NA) fits any column
+        values, dimension = self._Operand(other)
+        if dimension is None or (np.ndim(values) == 0 and dimension is um.Dimensionless and np.isnan(values)):
+            return np.nan
+        if dimension is not self._dtype.dimension:
+            raise ValueError(f'values of dimension {dimension} can not be stored as {self._dtype}')
+        return values
+
+
+    @staticmethod
+    def _Operand(other):
+        # (SI values, Dimension) of an arithmetic operand
+        if isinstance(other, QuantityExtensionArray):
+            return other._data, other._dtype.dimension
+        if isinstance(other, (um.Quantity, um.QuantityArray)):
+            if type(other) is um.Unit and other._offset != 0.0:
+                raise ValueError(f'units with offsets can not be used in columns: {other.Symbol}')
+            return other._val, other._dimension
+        if isinstance(other, (list, tuple)) and len(other) > 0 and isinstance(other[0], um.Quantity):
+            qa = um.QuantityArray(list(other))
+            return qa._val, qa._dimension
+        if other is None or other is pd.NA:
+            return np.nan, None
+        return np.asarray(other, dtype=np.float64), um.Dimensionless
+
+
+    def isna(self) -> np.ndarray:
+        return np.isnan(self._data)
+
+
+    def take(self, indices, allow_fill : bool = False, fill_value = None):
+        if allow_fill:
+            fill_value = np.nan if fill_value is None else float(self._Values(fill_value))
+        data = take(self._data, indices, allow_fill=allow_fill, fill_value=fill_value)
+        return type(self)(data, self._dtype)
+
+
+    def copy(self):
+        return type(self)(self._data.copy(), self._dtype)
+
+
+    def unique(self):
+        return type(self)(pd.unique(self._data), self._dtype)
+
+
+    def value_counts(self, dropna : bool = True) -> pd.Series:
+        counts = pd.Series(self._data).value_counts(dropna=dropna)
+        index = pd.Index(type(self)(counts.index.to_numpy(dtype=np.float64), self._dtype))
+        return pd.Series(counts.to_numpy(), index=index, name='count')
+
+
+    def _values_for_factorize(self):
+        return self._data, np.nan
+
+
+    def _values_for_argsort(self) -> np.ndarray:
+        return self._data
+
+
+    def astype(self, dtype, copy : bool = True):
+        if isinstance(dtype, QuantityDtype):
+            if dtype.dimension is not self._dtype.dimension:
+                raise ValueError(f'values of dimension {self._dtype.dimension} can not be stored as {dtype}')
+            return self.copy() if copy else self
+        dtype = pd.api.types.pandas_dtype(dtype)
+        if dtype == object:
+            return np.array(list(self), dtype=object)
+        if self._dtype.dimension is um.Dimensionless:
+            return np.array(self._data, dtype=dtype, copy=copy)
+        if pd.api.types.is_string_dtype(dtype):
+            return pd.array([str(q) for q in self], dtype=dtype)
+        raise TypeError(f'a Quantity column can not be converted to {dtype}; use .qty.to(unit)')
+
+
+    def _formatter(self, boxed : bool = False):
+        return str
+
+
+    # arithmetic: the SI arrays are combined once and the Dimension is
+    # carried by the dtype, with the same rules as Quantity
+    def _Arithmetic(self, other, op, reflected : bool = False):
+        if isinstance(other, (pd.Series, pd.Index, pd.DataFrame)):
+            return NotImplemented
+        values, dimension = self._Operand(other)
+        a = (self._data, self._dtype.dimension)
+        b = (values, dimension if dimension is not None else self._dtype.dimension)
+        if reflected:
+            a, b = b, a
+        if op == '+' or op == '-':
+            if a[1] is not b[1]:
+                raise ValueError('Quantities must be dimensionally equal')
+            return type(self)(a[0] + b[0] if op == '+' else a[0] - b[0], QuantityDtype(a[1]))
+        if op == '*':
+            return type(self)(a[0] * b[0], QuantityDtype(a[1] * b[1]))
+        return type(self)(a[0] / b[0], QuantityDtype(a[1] / b[1]))
+
+
+    def __add__(self, other):
+        return self._Arithmetic(other, '+')
+
+
+    def __radd__(self, other):
+        return self._Arithmetic(other, '+', True)
+
+
+    def __sub__(self, other):
+        return self._Arithmetic(other, '-')
+
+
+    def __rsub__(self, other):
+        return self._Arithmetic(other, '-', True)
+
+
+    def __mul__(self, other):
+        return self._Arithmetic(other, '*')
+
+
+    def __rmul__(self, other):
+        return self._Arithmetic(other, '*', True)
+
+
+    def __truediv__(self, other):
+        return self._Arithmetic(other, '/')
+
+
+    def __rtruediv__(self, other):
+        return self._Arithmetic(other, '/', True)
+
+
+    def __neg__(self):
+        return type(self)(-self._data, self._dtype)
+
+
+    def __pos__(self):
+        return self.copy()
+
+
+    def __abs__(self):
+        return type(self)(np.abs(self._data), self._dtype)
+
+
+    def _Compare(self, other, op):
+        if isinstance(other, (pd.Series, pd.Index, pd.DataFrame)):
+            return NotImplemented
+        values, dimension = self._Operand(other)
+        if dimension is None:
+            return np.zeros(len(self), dtype=bool) if op != np.not_equal else np.ones(len(self), dtype=bool)
+        if dimension is not self._dtype.dimension:
+            if op is np.equal:
+                return np.zeros(len(self), dtype=bool)
+            if op is np.not_equal:
+                return np.ones(len(self), dtype=bool)
+            raise ValueError('Quantities must be dimensionally equal')
+        return op(self._data, values)
+
+
+    def __eq__(self, other):
+        return self._Compare(other, np.equal)
+
+
+    def __ne__(self, other):
+        return self._Compare(other, np.not_equal)
+
+
+    def __lt__(self, other):
+        return self._Compare(other, np.less)
+
+
+    def __le__(self, other):
+        return self._Compare(other, np.less_equal)
+
+
+    def __gt__(self, other):
+        return self._Compare(other, np.greater)
+
+
+    def __ge__(self, other):
+        return self._Compare(other, np.greater_equal)
+
+
+    def _reduce(self, name : str, *, skipna : bool = True, keepdims : bool = False, **kwargs):
+        dimension = _ResultDimension(name, self._dtype.dimension)
+        data = self._data[~np.isnan(self._data)] if skipna else self._data
+        if name in ('std', 'var', 'sem'):
+            ddof = kwargs.get('ddof', 1)
+            if name == 'sem':
+                result = np.std(data, ddof=ddof) / np.sqrt(data.size) if data.size > ddof else np.nan
+            else:
+                result = getattr(np, name)(data, ddof=ddof) if data.size > ddof else np.nan
+        elif name in ('min', 'max', 'mean', 'median') and data.size == 0:
+            result = np.nan
+        elif name in ('sum', 'prod', 'min', 'max', 'mean', 'median', 'any', 'all'):
+            result = getattr(np, name)(data)
+        else:
+            raise TypeError(f"'{name}' is not supported for Quantity columns")
+        if dimension is None:
+            return result
+        if name == 'prod' and dimension is not um.Dimensionless:
+            raise TypeError(f"'prod' is not supported for Quantities of dimension {dimension}")
+        if keepdims:
+            return type(self)(np.array([result]), QuantityDtype(dimension))
+        return um.Quantity.Create(float(result), dimension)
+
+
+    # removed below for pandas versions outside _groupby_versions
+    def _groupby_op(self, *, how : str, has_dropped_na : bool, min_count : int, ngroups : int, ids, **kwargs):
+        # groupby runs on the float64 SI values; the result gets its Dimension back
+        dimension = _ResultDimension(how, self._dtype.dimension)
+        result = pd.array(self._data, dtype='Float64')._groupby_op(
+            how=how, has_dropped_na=has_dropped_na, min_count=min_count, ngroups=ngroups, ids=ids, **kwargs)
+        if dimension is None:
+            return result
+        return type(self)(result.to_numpy(dtype=np.float64, na_value=np.nan), QuantityDtype(dimension))
+
+
+# [first, last) pandas (major, minor) versions with the _groupby_op signature above
+_groupby_versions = ((2, 1), (3, 1))
+
+def _PandasVersion() -> tuple:
+    match = re.match(r'(\d+)\.(\d+)', pd.__version__)
+    return (int(match.group(1)), int(match.group(2))) if match else (0, 0)
+
+
+if not _groupby_versions[0] <= _PandasVersion() < _groupby_versions[1]:
+    del QuantityExtensionArray._groupby_op
+    warnings.warn(f'pandas {pd.__version__} is outside the versions tested with the private _groupby_op hook; '
+                  'Quantity groupby falls back to the generic per-group path', RuntimeWarning, stacklevel=2)
+
+
+def _AsUnit(unit) -> um.Unit:
+    return um.parse_unit(unit) if isinstance(unit, str) else unit
+
+
+@register_series_accessor('qty')
+class QuantityAccessor:
+    # series.qty.to(unit), series.qty.format(unit, spec), series.qty.dimension
+    def __init__(self, series : pd.Series):
+        if not isinstance(series.dtype, QuantityDtype):
+            raise AttributeError("the 'qty' accessor is only available for Quantity columns")
+        self._series = series
+
+
+    @property
+    def dimension(self) -> um.Dimension:
+        return self._series.dtype.dimension
+
+
+    @property
+    def array(self) -> um.QuantityArray:
+        array = self._series.array
+        return um._NewQuantityArray(np.ascontiguousarray(array._data), array._dtype.dimension)
+
+
+    def to(self, unit) -> pd.Series:
+        # float Series of the values in 'unit'
+        unit = _AsUnit(unit)
+        if unit._dimension is not self.dimension:
+            raise ValueError(f'invalid unit conversion: {unit.Symbol}')
+        values = (self._series.array._data - unit._offset) / unit._val
+        return pd.Series(values, index=self._series.index, name=self._series.name)
+
+
+    def format(self, unit, format_spec : str = '', symbol : bool = True) -> pd.Series:
+        unit = _AsUnit(unit)
+        text = um.FormatColumn(self.array, unit, format_spec, symbol)
+        return pd.Series(text, index=self._series.index, name=self._series.name, dtype=object)
+
+
+def QuantitySeries(qtys, unit = None, index = None, name = None) -> pd.Series:
+    # a Quantity column from a QuantityArray, a list of Quantities, or plain
+    # numbers in 'unit': QuantitySeries([100.0, 120.0], 'psig')
+    if unit is not None:
+        unit = _AsUnit(unit)
+        values = np.asarray(qtys, dtype=np.float64) * unit._val + unit._offset
+        array = QuantityExtensionArray(values, QuantityDtype(unit._dimension))
+    else:
+        array = QuantityExtensionArray._from_sequence(qtys)
+    return pd.Series(array, index=index, name=name)